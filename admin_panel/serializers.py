@@ -35,7 +35,7 @@ class AdminUserSerializer(serializers.ModelSerializer):
     
     def get_total_spent(self, obj):
         from django.db.models import Sum
-        result = Expense.objects.filter(created_by=obj).aggregate(total=Sum("amount"))
+        result = Expense.objects.filter(created_by=obj).aggregate(total=Sum("amount_base"))
         return result["total"] or 0
 
 
@@ -108,7 +108,7 @@ class SystemCategorySerializer(serializers.ModelSerializer):
     
     def get_total_amount(self, obj):
         from django.db.models import Sum
-        result = obj.expenses.aggregate(total=Sum("amount"))
+        result = obj.expenses.aggregate(total=Sum("amount_base"))
         return result["total"] or 0
 
 
@@ -7,6 +7,7 @@ from rest_framework.routers import SimpleRouter
 from .views import (
     admin_dashboard_stats,
     system_health,
+    report_cache_stats,
     AdminUserViewSet,
     SystemCategoryViewSet,
     SystemIncomeSourceViewSet,
@@ -28,6 +29,7 @@ urlpatterns = [
     # Dashboard & Analytics
     path("dashboard/", admin_dashboard_stats, name="admin-dashboard"),
     path("health/", system_health, name="system-health"),
+    path("report-cache/", report_cache_stats, name="report-cache-stats"),
     
     # Reports
     path("reports/overview/", admin_reports_overview, name="admin-reports-overview"),
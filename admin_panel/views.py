@@ -6,6 +6,7 @@ from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
+from django.db import transaction
 from django.db.models import Sum, Count, Avg, F, Q
 from django.db.models.functions import TruncMonth, TruncDate
 from django.utils import timezone
@@ -15,9 +16,12 @@ from rest_framework.response import Response
 
 from budgets.models import Budget, Income, IncomeSource, MonthlyBudget
 from categories.models import Category
+from core.fastlist import FastListMixin
 from core.models import Notification, NotificationType
 from core.permissions import IsAdminRole, IsUserOrAdminRole
+from core.reportcache import cache_report, get_report_cache
 from expenses.models import Expense
+from sync.services import notification_changes, record_changes
 from users.roles import ROLE_ADMIN, ROLE_USER
 
 from .serializers import (
@@ -39,6 +43,7 @@ User = get_user_model()
 
 @api_view(["GET"])
 @permission_classes([IsUserOrAdminRole, IsAdminRole])
+@cache_report("admin-dashboard")
 def admin_dashboard_stats(request):
     """Comprehensive admin dashboard statistics"""
     today = date.today()
@@ -57,14 +62,14 @@ def admin_dashboard_stats(request):
     
     # Expense statistics
     total_expenses = Expense.objects.aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id")
     )
     
     this_month_expenses = Expense.objects.filter(
         date__gte=month_start
     ).aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id")
     )
     
@@ -72,7 +77,7 @@ def admin_dashboard_stats(request):
         date__gte=last_month_start,
         date__lt=month_start
     ).aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id")
     )
     
@@ -94,15 +99,15 @@ def admin_dashboard_stats(request):
     top_categories = Expense.objects.values(
         "category__id", "category__name", "category__icon", "category__color_token"
     ).annotate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id"),
-        avg_amount=Avg("amount")
+        avg_amount=Avg("amount_base")
     ).order_by("-total")[:10]
     
     # Top spenders
     top_spenders = User.objects.annotate(
         expense_count=Count("expenses_expense_created"),
-        total_spent=Sum("expenses_expense_created__amount")
+        total_spent=Sum("expenses_expense_created__amount_base")
     ).filter(
         total_spent__isnull=False
     ).values(
@@ -116,7 +121,7 @@ def admin_dashboard_stats(request):
     ).annotate(
         day=TruncDate("date")
     ).values("day").annotate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id")
     ).order_by("day")
     
@@ -127,7 +132,7 @@ def admin_dashboard_stats(request):
     ).annotate(
         month=TruncMonth("date")
     ).values("month").annotate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id"),
         unique_users=Count("created_by", distinct=True)
     ).order_by("month")
@@ -198,6 +203,16 @@ def system_health(request):
     })
 
 
+@api_view(["GET", "DELETE"])
+@permission_classes([IsUserOrAdminRole, IsAdminRole])
+def report_cache_stats(request):
+    """Report cache hit/miss counters for this worker process (DELETE resets them and empties its LRU)"""
+    report_cache = get_report_cache()
+    if request.method == "DELETE":
+        report_cache.clear()
+    return Response(report_cache.stats())
+
+
 # ==================== User Management ====================
 
 class AdminUserViewSet(viewsets.ModelViewSet):
@@ -315,12 +330,12 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         expenses = Expense.objects.filter(created_by=user)
         
         total_expenses = expenses.aggregate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         )
         
         this_month = expenses.filter(date__gte=month_start).aggregate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         )
         
@@ -328,7 +343,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         by_category = expenses.values(
             "category__name"
         ).annotate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         ).order_by("-total")[:5]
         
@@ -371,9 +386,9 @@ class SystemCategoryViewSet(viewsets.ModelViewSet):
         
         expenses = Expense.objects.filter(category=category)
         stats = expenses.aggregate(
-            total_amount=Sum("amount"),
+            total_amount=Sum("amount_base"),
             total_count=Count("id"),
-            avg_amount=Avg("amount"),
+            avg_amount=Avg("amount_base"),
             unique_users=Count("created_by", distinct=True)
         )
         
@@ -381,7 +396,7 @@ class SystemCategoryViewSet(viewsets.ModelViewSet):
         monthly = expenses.annotate(
             month=TruncMonth("date")
         ).values("month").annotate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         ).order_by("-month")[:6]
         
@@ -451,7 +466,7 @@ class SystemIncomeSourceViewSet(viewsets.ModelViewSet):
 
 # ==================== Expense Management (Admin View) ====================
 
-class AdminExpenseViewSet(viewsets.ReadOnlyModelViewSet):
+class AdminExpenseViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     """Admin view of all expenses across users"""
     permission_classes = [IsUserOrAdminRole, IsAdminRole]
     serializer_class = AdminExpenseSerializer
@@ -487,27 +502,28 @@ class AdminExpenseViewSet(viewsets.ReadOnlyModelViewSet):
         return qs
     
     @action(detail=False, methods=["get"])
+    @cache_report("admin-expenses-summary")
     def summary(self, request):
         """Get expenses summary across all users"""
         qs = self.get_queryset()
         
         summary = qs.aggregate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id"),
-            avg=Avg("amount")
+            avg=Avg("amount_base")
         )
         
         by_user = qs.values(
             "created_by__id", "created_by__username"
         ).annotate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         ).order_by("-total")[:10]
         
         by_category = qs.values(
             "category__id", "category__name"
         ).annotate(
-            total=Sum("amount"),
+            total=Sum("amount_base"),
             count=Count("id")
         ).order_by("-total")[:10]
         
@@ -547,7 +563,10 @@ def broadcast_notification(request):
             data={"admin_broadcast": True, "sent_by": request.user.username},
         ))
     
-    Notification.objects.bulk_create(notifications)
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications)
+        # bulk_create sends no post_save; log the rows for mobile sync explicitly.
+        record_changes(notification_changes((n.pk, n.user_id) for n in notifications))
     
     return Response({
         "message": f"Notification sent to {len(notifications)} users",
@@ -583,6 +602,7 @@ def notification_stats(request):
 
 @api_view(["GET"])
 @permission_classes([IsUserOrAdminRole, IsAdminRole])
+@cache_report("admin-reports-overview")
 def admin_reports_overview(request):
     """Get comprehensive reports overview for admin"""
     today = date.today()
@@ -591,16 +611,16 @@ def admin_reports_overview(request):
     
     # This month's stats
     this_month = Expense.objects.filter(date__gte=month_start).aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id"),
-        avg=Avg("amount")
+        avg=Avg("amount_base")
     )
     
     # This year's stats
     this_year = Expense.objects.filter(date__gte=year_start).aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id"),
-        avg=Avg("amount")
+        avg=Avg("amount_base")
     )
     
     # User engagement
@@ -639,7 +659,7 @@ def export_users_report(request):
     """Export users report data"""
     users = User.objects.annotate(
         expense_count=Count("expenses_expense_created"),
-        total_spent=Sum("expenses_expense_created__amount")
+        total_spent=Sum("expenses_expense_created__amount_base")
     ).values(
         "id", "username", "email", "is_active", "date_joined",
         "last_login", "expense_count", "total_spent"
@@ -672,7 +692,7 @@ def export_expenses_report(request):
     ).order_by("-date")
     
     summary = qs.aggregate(
-        total=Sum("amount"),
+        total=Sum("amount_base"),
         count=Count("id")
     )
     
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from budgets.models import Budget, Income, IncomeSource, MonthlyBudget
+from budgets.models import Budget, Income, IncomeSource, MonthEndSnapshot, MonthlyBudget
 
 
 @admin.register(IncomeSource)
@@ -27,3 +27,11 @@ class MonthlyBudgetAdmin(admin.ModelAdmin):
 class BudgetAdmin(admin.ModelAdmin):
 	list_display = ("month", "scope", "category", "amount", "allocation_percentage", "created_by", "warn_threshold")
 	list_filter = ("scope", "month")
+
+
+@admin.register(MonthEndSnapshot)
+class MonthEndSnapshotAdmin(admin.ModelAdmin):
+	list_display = ("month", "user", "version", "summary_version", "computed_at")
+	list_filter = ("month",)
+	readonly_fields = ("summary", "version", "summary_version", "computed_at")
+
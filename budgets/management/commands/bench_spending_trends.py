@@ -0,0 +1,161 @@
+"""
+Benchmark get_spending_trends against the previous implementation, which
+loaded every Expense in the window and bucketed it in Python.
+"""
+import calendar
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from budgets.services import get_spending_trends
+from expenses.models import Expense
+from reports.services import rebuild_rollups
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_spending_trends(*, owner, days: int = 30):
+    """The raw-expense implementation, kept here only for comparison."""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=days)
+    expenses = Expense.objects.filter(created_by=owner, date__gte=start_date, date__lte=end_date).order_by("date")
+    if not expenses.exists():
+        return {"has_data": False}
+
+    daily_spending = {}
+    for expense in expenses:
+        day_str = expense.date.isoformat()
+        daily_spending[day_str] = daily_spending.get(day_str, Decimal("0")) + expense.amount
+    days_with_data = len(daily_spending)
+    if days_with_data < 7:
+        return {"has_data": False}
+
+    total_spent = sum(daily_spending.values())
+    avg_daily = total_spent / Decimal(days_with_data)
+
+    weekly_spending = {}
+    for expense in expenses:
+        week_key = (expense.date - timedelta(days=expense.date.weekday())).isoformat()
+        weekly_spending[week_key] = weekly_spending.get(week_key, Decimal("0")) + expense.amount
+
+    recent_total = Expense.objects.filter(
+        created_by=owner, date__gte=end_date - timedelta(days=6), date__lte=end_date
+    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+    previous_total = Expense.objects.filter(
+        created_by=owner, date__gte=end_date - timedelta(days=13), date__lte=end_date - timedelta(days=7)
+    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+    list(expenses.values("category__name", "category_id").annotate(total=Sum("amount")).order_by("-total")[:5])
+
+    month_start = date(end_date.year, end_date.month, 1)
+    days_remaining = calendar.monthrange(end_date.year, end_date.month)[1] - ((end_date - month_start).days + 1)
+    month_spending = Expense.objects.filter(
+        created_by=owner, date__gte=month_start, date__lte=end_date
+    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+
+    return {
+        "has_data": True,
+        "totals": {"total_spent": float(total_spent), "average_daily": float(avg_daily)},
+        "velocity": {"recent_7_days": float(recent_total), "previous_7_days": float(previous_total)},
+        "projection": {
+            "month_to_date": float(month_spending),
+            "projected_month_total": float(month_spending + avg_daily * days_remaining),
+        },
+        "daily_spending": {k: float(v) for k, v in sorted(daily_spending.items())},
+        "weekly_spending": {k: float(v) for k, v in sorted(weekly_spending.items())},
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare legacy vs rollup-based get_spending_trends (time, queries, peak memory)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to benchmark against (uses existing data)")
+        parser.add_argument(
+            "--seed-expenses",
+            type=int,
+            default=0,
+            help="Create a throwaway user with this many expenses; everything is rolled back afterwards",
+        )
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not options["user"] and not options["seed_expenses"]:
+            raise CommandError("Pass --user or --seed-expenses")
+
+        try:
+            with transaction.atomic():
+                if options["seed_expenses"]:
+                    owner = self._seed(options["seed_expenses"], options["days"])
+                else:
+                    owner = User.objects.filter(username=options["user"]).first()
+                    if owner is None:
+                        raise CommandError(f"User '{options['user']}' not found")
+                self._run(owner, options["days"], options["iterations"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count: int, days: int):
+        owner = User.objects.create(username=f"bench-trends-{random.randint(0, 10**9)}", is_active=False)
+        today = date.today()
+        rng = random.Random(42)
+        batch = [
+            Expense(
+                created_by=owner,
+                amount=Decimal(rng.randint(100, 500000)) / 100,
+                date=today - timedelta(days=rng.randint(0, days)),
+                description="bench",
+            )
+            for _ in range(count)
+        ]
+        Expense.objects.bulk_create(batch, batch_size=5000)
+        rebuild_rollups(user_ids=[owner.pk])
+        self.stdout.write(f"Seeded {count} expenses over {days} days")
+        return owner
+
+    def _measure(self, label, fn, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as ctx:
+            result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        best = min(timings) * 1000
+        self.stdout.write(
+            f"{label:<8} best {best:8.1f} ms  avg {sum(timings) / len(timings) * 1000:8.1f} ms  "
+            f"queries {len(ctx.captured_queries):3d}  peak mem {peak / 1024:8.0f} KiB"
+        )
+        return result, best
+
+    def _run(self, owner, days, iterations):
+        legacy, legacy_ms = self._measure(
+            "legacy", lambda: legacy_spending_trends(owner=owner, days=days), iterations
+        )
+        current, current_ms = self._measure(
+            "rollup", lambda: get_spending_trends(owner=owner, days=days), iterations
+        )
+
+        for section in ("daily_spending", "weekly_spending", "totals"):
+            if legacy.get(section) != current.get(section):
+                self.stdout.write(self.style.ERROR(f"Mismatch in {section}"))
+        if current_ms:
+            self.stdout.write(self.style.SUCCESS(f"Speedup: {legacy_ms / current_ms:.1f}x"))
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from budgets.models import normalize_month
+from budgets.services import close_month, is_closed_month, refresh_changed_month_end_snapshots
+
+
+class Command(BaseCommand):
+    help = "Freeze month-end summaries of a closed month and recompute snapshots touched by late writes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="Month to close (YYYY-MM-01); defaults to the previous month")
+        parser.add_argument("--user", type=int, action="append", dest="users", help="Only this user id (repeatable)")
+        parser.add_argument(
+            "--changed-only",
+            action="store_true",
+            help="Only recompute existing snapshots that late writes moved on",
+        )
+
+    def handle(self, *args, **options):
+        if not options["changed_only"]:
+            if options["month"]:
+                month = parse_date(options["month"])
+                if month is None:
+                    raise CommandError("--month must be YYYY-MM-01")
+                month = normalize_month(month)
+            else:
+                month = normalize_month(normalize_month(timezone.localdate()) - timedelta(days=1))
+            if not is_closed_month(month):
+                raise CommandError(f"{month.isoformat()} is not closed yet")
+
+            written = close_month(month=month, user_ids=options["users"])
+            self.stdout.write(f"Closed {month.isoformat()}: {written} snapshots")
+
+        refreshed = refresh_changed_month_end_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {refreshed} snapshots changed by late writes"))
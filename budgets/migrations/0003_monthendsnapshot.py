@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0002_budget_allocation_percentage_incomesource_income_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthEndSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of month, e.g. 2026-01-01')),
+                ('summary', models.JSONField(blank=True, null=True)),
+                ('version', models.PositiveIntegerField(default=0, help_text='Late writes to the month so far')),
+                ('summary_version', models.PositiveIntegerField(blank=True, help_text='`version` the summary was computed at', null=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='month_end_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month'), name='uniq_monthend_user_month')],
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from datetime import date
 from decimal import Decimal
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 
@@ -164,3 +165,35 @@ class Budget(OwnedModel):
 
 	def __str__(self) -> str:
 		return f"{self.month} {self.scope} {self.amount}"
+
+
+class MonthEndSnapshot(models.Model):
+	"""Frozen month-end summary of a closed month (see budgets.services.get_month_end_summary).
+
+	Filled by `close_months`. A late write touching the month bumps `version`;
+	the summary is current only while `summary_version` matches it, otherwise
+	the next read or close run recomputes it.
+	"""
+	user = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="month_end_snapshots",
+	)
+	month = models.DateField(help_text="First day of month, e.g. 2026-01-01")
+	summary = models.JSONField(null=True, blank=True)
+	version = models.PositiveIntegerField(default=0, help_text="Late writes to the month so far")
+	summary_version = models.PositiveIntegerField(null=True, blank=True, help_text="`version` the summary was computed at")
+	computed_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["user", "month"], name="uniq_monthend_user_month"),
+		]
+		ordering = ["-month"]
+
+	@property
+	def is_current(self) -> bool:
+		return self.summary is not None and self.summary_version == self.version
+
+	def __str__(self) -> str:
+		return f"{self.user_id} {self.month} v{self.version}"
@@ -2,14 +2,21 @@ from __future__ import annotations
 
 import calendar
 from dataclasses import dataclass
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, List
 
-from django.db.models import Sum, Avg
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import CharField, DecimalField, Exists, F, IntegerField, OuterRef, Q, Sum, Value
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from budgets.models import Budget, BudgetScope, Income, MonthEndSnapshot, MonthlyBudget, normalize_month
+from core.versions import get_data_versions
+from reports.services import spending_rollups
 
-from budgets.models import Budget, BudgetScope, Income, MonthlyBudget, normalize_month
-from expenses.models import Expense
 
 
 @dataclass(frozen=True)
@@ -33,6 +40,11 @@ class BudgetWarning:
     budget_amount: Decimal
 
 
+def _as_date(value) -> date:
+    # TruncWeek yields a datetime on some backends even for DateFields
+    return value.date() if isinstance(value, datetime) else value
+
+
 def month_bounds(month: date) -> tuple[date, date]:
     month = normalize_month(month)
     last_day = calendar.monthrange(month.year, month.month)[1]
@@ -70,46 +82,196 @@ def _status(*, spent: Decimal, budget_amount: Decimal | None, warn_threshold: De
     )
 
 
-def compute_budget_status_for_month(*, owner, month: date):
-    start, end = month_bounds(month)
+@dataclass(frozen=True)
+class SnapshotBudget:
+    budget_id: int
+    category_id: int | None
+    category_name: str | None
+    amount: Decimal
+    warn_threshold: Decimal | None
 
-    totals = (
-        Expense.objects.filter(created_by=owner, date__gte=start, date__lte=end)
-        .values("category_id")
-        .annotate(total=Sum("amount"))
-    )
 
-    spent_by_category: dict[int | None, Decimal] = {}
-    for row in totals:
-        spent_by_category[row["category_id"]] = row["total"] or Decimal("0")
+@dataclass(frozen=True)
+class BudgetSnapshot:
+    """Everything the status and warnings endpoints need for one user-month."""
+    month: date
+    monthly_budget_id: int | None
+    monthly_budget_amount: Decimal | None
+    overall_budget: SnapshotBudget | None
+    category_budgets: tuple[SnapshotBudget, ...]
+    spent_by_category: dict[int | None, Decimal]
+
+    @property
+    def total_spent(self) -> Decimal:
+        return sum(self.spent_by_category.values(), Decimal("0"))
+
+
+_SNAPSHOT_COLUMNS = ("snapshot_month", "kind", "ref_id", "ref_category_id", "ref_category_name", "value", "threshold")
+
+
+def _snapshot_rows(*, owner, start: date, end: date):
+    """Spend per (month, category), budgets and monthly budgets for [start, end] as one UNION ALL query."""
+    null_int = Value(None, output_field=IntegerField())
+    null_text = Value(None, output_field=CharField())
+    null_decimal = Value(None, output_field=DecimalField(max_digits=12, decimal_places=3))
+
+    spend = (
+        spending_rollups(owner=owner, start=start, end=end)
+        .annotate(snapshot_month=TruncMonth("date"))
+        .values("snapshot_month", "category_id")
+        .annotate(
+            kind=Value("spend", output_field=CharField()),
+            ref_id=null_int,
+            ref_category_id=F("category_id"),
+            ref_category_name=null_text,
+            value=Sum("total_base"),
+            threshold=null_decimal,
+        )
+        .values_list(*_SNAPSHOT_COLUMNS)
+    )
+    budgets = (
+        Budget.objects.filter(created_by=owner, month__gte=start, month__lte=end)
+        .order_by()
+        .annotate(
+            snapshot_month=F("month"),
+            kind=F("scope"),
+            ref_id=F("id"),
+            ref_category_id=F("category_id"),
+            ref_category_name=F("category__name"),
+            value=F("amount"),
+            threshold=F("warn_threshold"),
+        )
+        .values_list(*_SNAPSHOT_COLUMNS)
+    )
+    monthly = (
+        MonthlyBudget.objects.filter(created_by=owner, month__gte=start, month__lte=end)
+        .order_by()
+        .annotate(
+            snapshot_month=F("month"),
+            kind=Value("monthly", output_field=CharField()),
+            ref_id=F("id"),
+            ref_category_id=null_int,
+            ref_category_name=null_text,
+            value=F("total_budget"),
+            threshold=null_decimal,
+        )
+        .values_list(*_SNAPSHOT_COLUMNS)
+    )
+    return spend.union(budgets, monthly, all=True)
+
+
+def month_range(start_month: date, end_month: date) -> list[date]:
+    """First days of every month from `start_month` through `end_month`."""
+    months = []
+    month = normalize_month(start_month)
+    end_month = normalize_month(end_month)
+    while month <= end_month:
+        months.append(month)
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return months
+
+
+def build_budget_snapshots(*, owner, start_month: date, end_month: date) -> dict[date, BudgetSnapshot]:
+    """Snapshots for every month from `start_month` through `end_month`, from a single query."""
+    months = month_range(start_month, end_month)
+    if not months:
+        return {}
+    parts = {
+        month: {"spent": {}, "monthly": (None, None), "overall": None, "categories": []} for month in months
+    }
+    rows = _snapshot_rows(owner=owner, start=months[0], end=month_bounds(months[-1])[1])
+    for month, kind, ref_id, category_id, category_name, value, threshold in rows:
+        part = parts[normalize_month(_as_date(month))]
+        if kind == "spend":
+            part["spent"][category_id] = value or Decimal("0")
+        elif kind == "monthly":
+            part["monthly"] = (ref_id, value)
+        else:
+            budget = SnapshotBudget(
+                budget_id=ref_id,
+                category_id=category_id,
+                category_name=category_name,
+                amount=value,
+                warn_threshold=threshold,
+            )
+            if kind == BudgetScope.OVERALL:
+                part["overall"] = budget
+            else:
+                part["categories"].append(budget)
 
-    overall_spent = sum(spent_by_category.values(), Decimal("0"))
+    return {
+        month: BudgetSnapshot(
+            month=month,
+            monthly_budget_id=part["monthly"][0],
+            monthly_budget_amount=part["monthly"][1],
+            overall_budget=part["overall"],
+            category_budgets=tuple(sorted(part["categories"], key=lambda b: b.budget_id)),
+            spent_by_category=part["spent"],
+        )
+        for month, part in parts.items()
+    }
 
-    overall_budget = Budget.objects.filter(
-        created_by=owner, month=start, scope=BudgetScope.OVERALL
-    ).first()
 
-    category_budgets = list(
-        Budget.objects.filter(created_by=owner, month=start, scope=BudgetScope.CATEGORY).select_related(
-            "category"
+def build_budget_snapshot(*, owner, month: date) -> BudgetSnapshot:
+    month = normalize_month(month)
+    return build_budget_snapshots(owner=owner, start_month=month, end_month=month)[month]
+
+
+def _snapshot_cache_key(owner_id: int, month: date, versions: tuple[int, int]) -> str:
+    # Keyed on the committed data versions: every write a snapshot depends on
+    # (expenses, budgets, category names, incl. system ones) moves one, so no
+    # worker reads a snapshot built before it, whatever the cache backend.
+    user_version, global_version = versions
+    return f"budget-snapshot:{user_version}:{global_version}:{owner_id}:{normalize_month(month).isoformat()}"
+
+
+def get_budget_snapshot(*, owner, month: date) -> BudgetSnapshot:
+    key = _snapshot_cache_key(owner.pk, month, get_data_versions(owner.pk))
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_budget_snapshot(owner=owner, month=month)
+        cache.set(key, snapshot, getattr(settings, "BUDGET_SNAPSHOT_CACHE_SECONDS", 300))
+    return snapshot
+
+
+def get_budget_snapshots(*, owner, start_month: date, end_month: date) -> dict[date, BudgetSnapshot]:
+    """Cached snapshots for a range of months; the missing ones are built together in one query."""
+    months = month_range(start_month, end_month)
+    versions = get_data_versions(owner.pk)
+    keys = {month: _snapshot_cache_key(owner.pk, month, versions) for month in months}
+    cached = cache.get_many(list(keys.values()))
+    snapshots = {month: cached[key] for month, key in keys.items() if key in cached}
+    missing = [month for month in months if month not in snapshots]
+    if missing:
+        built = build_budget_snapshots(owner=owner, start_month=missing[0], end_month=missing[-1])
+        fresh = {month: built[month] for month in missing}
+        cache.set_many(
+            {keys[month]: snapshot for month, snapshot in fresh.items()},
+            getattr(settings, "BUDGET_SNAPSHOT_CACHE_SECONDS", 300),
         )
-    )
+        snapshots.update(fresh)
+    return {month: snapshots[month] for month in months}
+
+
+def compute_budget_status_for_month(*, owner, month: date):
+    snapshot = get_budget_snapshot(owner=owner, month=month)
+    overall_budget = snapshot.overall_budget
 
     overall_usage = _status(
-        spent=overall_spent,
+        spent=snapshot.total_spent,
         budget_amount=(overall_budget.amount if overall_budget else None),
         warn_threshold=(overall_budget.warn_threshold if overall_budget else None),
     )
 
     category_usages = []
-    for budget in category_budgets:
-        spent = spent_by_category.get(budget.category_id, Decimal("0"))
+    for budget in snapshot.category_budgets:
+        spent = snapshot.spent_by_category.get(budget.category_id, Decimal("0"))
         usage = _status(spent=spent, budget_amount=budget.amount, warn_threshold=budget.warn_threshold)
         category_usages.append(
             {
-                "budget_id": budget.id,
+                "budget_id": budget.budget_id,
                 "category_id": budget.category_id,
-                "category_name": getattr(budget.category, "name", None),
+                "category_name": budget.category_name,
                 "budget_amount": usage.budget_amount,
                 "spent": usage.spent,
                 "remaining": usage.remaining,
@@ -119,9 +281,9 @@ def compute_budget_status_for_month(*, owner, month: date):
         )
 
     return {
-        "month": start,
+        "month": snapshot.month,
         "overall": {
-            "budget_id": overall_budget.id if overall_budget else None,
+            "budget_id": overall_budget.budget_id if overall_budget else None,
             "budget_amount": overall_usage.budget_amount,
             "spent": overall_usage.spent,
             "remaining": overall_usage.remaining,
@@ -132,36 +294,83 @@ def compute_budget_status_for_month(*, owner, month: date):
     }
 
 
+def compute_budget_status_range(*, owner, start_month: date, end_month: date) -> Dict[str, Any]:
+    """
+    Budget status for every month in [start_month, end_month] as a month x category matrix.
+    Each category row and the overall row carry one entry per month in `months`;
+    months without a budget for the category have null budget/percent and status "no_budget".
+    """
+    snapshots = get_budget_snapshots(owner=owner, start_month=start_month, end_month=end_month)
+    months = list(snapshots)
+
+    categories: dict[int, dict[str, Any]] = {}
+    for snapshot in snapshots.values():
+        for budget in snapshot.category_budgets:
+            categories.setdefault(budget.category_id, {"category_id": budget.category_id})[
+                "category_name"
+            ] = budget.category_name
+
+    def row() -> dict[str, list]:
+        return {"budget_amount": [], "spent": [], "percent_used": [], "status": []}
+
+    def append(target: dict[str, list], usage: BudgetUsage) -> None:
+        target["budget_amount"].append(usage.budget_amount)
+        target["spent"].append(usage.spent)
+        target["percent_used"].append(usage.percent_used)
+        target["status"].append(usage.status)
+
+    overall = row()
+    rows = {category_id: {**meta, **row()} for category_id, meta in sorted(categories.items())}
+    for snapshot in snapshots.values():
+        overall_budget = snapshot.overall_budget
+        append(
+            overall,
+            _status(
+                spent=snapshot.total_spent,
+                budget_amount=(overall_budget.amount if overall_budget else None),
+                warn_threshold=(overall_budget.warn_threshold if overall_budget else None),
+            ),
+        )
+        budgets = {budget.category_id: budget for budget in snapshot.category_budgets}
+        for category_id, category_row in rows.items():
+            budget = budgets.get(category_id)
+            append(
+                category_row,
+                _status(
+                    spent=snapshot.spent_by_category.get(category_id, Decimal("0")),
+                    budget_amount=(budget.amount if budget else None),
+                    warn_threshold=(budget.warn_threshold if budget else None),
+                ),
+            )
+
+    return {
+        "start_month": months[0] if months else normalize_month(start_month),
+        "end_month": months[-1] if months else normalize_month(end_month),
+        "months": months,
+        "overall": overall,
+        "categories": list(rows.values()),
+    }
+
+
 def get_budget_warnings(*, owner, month: date) -> List[Dict[str, Any]]:
     """
     Get budget warnings for a user for a specific month.
     Returns warnings for categories near/over limit and overall budget near/over limit.
     """
-    start, end = month_bounds(month)
+    snapshot = get_budget_snapshot(owner=owner, month=month)
     warnings = []
 
-    # Get overall budget (either MonthlyBudget or Budget with scope=overall)
-    monthly_budget = MonthlyBudget.objects.filter(
-        created_by=owner, month=start
-    ).first()
-    
-    overall_budget = Budget.objects.filter(
-        created_by=owner, month=start, scope=BudgetScope.OVERALL
-    ).first()
-
+    # Overall budget is the MonthlyBudget if set, else the Budget with scope=overall
     total_budget_amount = None
     warn_threshold = Decimal("0.8")
     
-    if monthly_budget:
-        total_budget_amount = monthly_budget.total_budget
-    elif overall_budget:
-        total_budget_amount = overall_budget.amount
-        warn_threshold = overall_budget.warn_threshold or Decimal("0.8")
-
-    # Calculate total spending
-    total_spent = Expense.objects.filter(
-        created_by=owner, date__gte=start, date__lte=end
-    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+    if snapshot.monthly_budget_id is not None:
+        total_budget_amount = snapshot.monthly_budget_amount
+    elif snapshot.overall_budget:
+        total_budget_amount = snapshot.overall_budget.amount
+        warn_threshold = snapshot.overall_budget.warn_threshold or Decimal("0.8")
+
+    total_spent = snapshot.total_spent
 
     # Check overall budget
     if total_budget_amount and total_budget_amount > 0:
@@ -191,21 +400,11 @@ def get_budget_warnings(*, owner, month: date) -> List[Dict[str, Any]]:
             })
 
     # Check category budgets
-    category_budgets = Budget.objects.filter(
-        created_by=owner, month=start, scope=BudgetScope.CATEGORY
-    ).select_related("category")
-
-    category_spending = dict(
-        Expense.objects.filter(
-            created_by=owner, date__gte=start, date__lte=end, category__isnull=False
-        ).values("category_id").annotate(total=Sum("amount")).values_list("category_id", "total")
-    )
-
-    for budget in category_budgets:
-        spent = category_spending.get(budget.category_id, Decimal("0"))
+    for budget in snapshot.category_budgets:
+        spent = snapshot.spent_by_category.get(budget.category_id, Decimal("0"))
         if budget.amount and budget.amount > 0:
             percent_used = spent / budget.amount
-            cat_name = budget.category.name if budget.category else "Unknown"
+            cat_name = budget.category_name or "Unknown"
             
             if percent_used >= 1:
                 warnings.append({
@@ -240,25 +439,54 @@ def get_spending_trends(*, owner, days: int = 30) -> Dict[str, Any]:
     """
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
-    
-    expenses = Expense.objects.filter(
-        created_by=owner,
-        date__gte=start_date,
-        date__lte=end_date
-    ).order_by("date")
-    
-    if not expenses.exists():
+
+    # Velocity compares the recent 7 days with the 7 before them
+    recent_start = end_date - timedelta(days=6)
+    previous_start = end_date - timedelta(days=13)
+    previous_end = end_date - timedelta(days=7)
+
+    today = end_date
+    month_start = date(today.year, today.month, 1)
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    days_passed = (today - month_start).days + 1
+    days_remaining = days_in_month - days_passed
+
+    # One grouped pass over the daily rollups covers the trend window, both
+    # velocity windows and month-to-date via conditional aggregation; Python
+    # only folds at most one row per day.
+    scan_start = min(start_date, previous_start, month_start)
+    rows = (
+        spending_rollups(owner=owner, start=scan_start, end=end_date)
+        .values("date")
+        .annotate(
+            week=TruncWeek("date"),
+            window_total=Sum("total_base", filter=Q(date__gte=start_date)),
+            recent_total=Sum("total_base", filter=Q(date__gte=recent_start)),
+            previous_total=Sum("total_base", filter=Q(date__gte=previous_start, date__lte=previous_end)),
+            month_total=Sum("total_base", filter=Q(date__gte=month_start)),
+        )
+        .order_by("date")
+    )
+
+    daily_spending: dict[str, Decimal] = {}
+    weekly_spending: dict[str, Decimal] = {}
+    recent_total = previous_total = month_spending = Decimal("0")
+    for row in rows:
+        recent_total += row["recent_total"] or Decimal("0")
+        previous_total += row["previous_total"] or Decimal("0")
+        month_spending += row["month_total"] or Decimal("0")
+        if row["window_total"] is None:
+            continue
+        daily_spending[row["date"].isoformat()] = row["window_total"]
+        week_key = _as_date(row["week"]).isoformat()
+        weekly_spending[week_key] = weekly_spending.get(week_key, Decimal("0")) + row["window_total"]
+
+    if not daily_spending:
         return {
             "has_data": False,
             "message": "No spending data available for trend analysis",
         }
-    
-    # Daily totals
-    daily_spending = {}
-    for expense in expenses:
-        day_str = expense.date.isoformat()
-        daily_spending[day_str] = daily_spending.get(day_str, Decimal("0")) + expense.amount
-    
+
     days_with_data = len(daily_spending)
     if days_with_data < 7:
         return {
@@ -266,35 +494,11 @@ def get_spending_trends(*, owner, days: int = 30) -> Dict[str, Any]:
             "days_available": days_with_data,
             "message": f"Need at least 7 days of data for trend analysis. Currently have {days_with_data} days.",
         }
-    
+
     # Calculate statistics
     total_spent = sum(daily_spending.values())
     avg_daily = total_spent / Decimal(days_with_data)
-    
-    # Weekly breakdown
-    weekly_spending = {}
-    for expense in expenses:
-        week_start = expense.date - timedelta(days=expense.date.weekday())
-        week_key = week_start.isoformat()
-        weekly_spending[week_key] = weekly_spending.get(week_key, Decimal("0")) + expense.amount
-    
-    # Spending velocity (recent 7 days vs previous 7 days)
-    recent_start = end_date - timedelta(days=6)
-    previous_start = end_date - timedelta(days=13)
-    previous_end = end_date - timedelta(days=7)
-    
-    recent_total = Expense.objects.filter(
-        created_by=owner,
-        date__gte=recent_start,
-        date__lte=end_date
-    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-    
-    previous_total = Expense.objects.filter(
-        created_by=owner,
-        date__gte=previous_start,
-        date__lte=previous_end
-    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-    
+
     velocity_change = None
     velocity_trend = "stable"
     if previous_total > 0:
@@ -303,27 +507,15 @@ def get_spending_trends(*, owner, days: int = 30) -> Dict[str, Any]:
             velocity_trend = "increasing"
         elif velocity_change < -10:
             velocity_trend = "decreasing"
-    
+
     # Category trends
     category_trends = list(
-        expenses.values("category__name", "category_id")
-        .annotate(total=Sum("amount"))
+        spending_rollups(owner=owner, start=start_date, end=end_date)
+        .values("category__name", "category_id")
+        .annotate(total=Sum("total_base"))
         .order_by("-total")[:5]
     )
-    
-    # Projection for rest of month
-    today = date.today()
-    month_start = date(today.year, today.month, 1)
-    days_in_month = calendar.monthrange(today.year, today.month)[1]
-    days_passed = (today - month_start).days + 1
-    days_remaining = days_in_month - days_passed
-    
-    month_spending = Expense.objects.filter(
-        created_by=owner,
-        date__gte=month_start,
-        date__lte=today
-    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
-    
+
     projected_month_total = month_spending + (avg_daily * days_remaining)
     
     return {
@@ -377,16 +569,16 @@ def generate_month_end_summary(*, owner, month: date) -> Dict[str, Any]:
     budget_amount = monthly_budget.total_budget if monthly_budget else total_income
     
     # Total spending
-    total_spent = Expense.objects.filter(
-        created_by=owner, date__gte=start, date__lte=end
-    ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+    total_spent = spending_rollups(
+        owner=owner, start=start, end=end
+    ).aggregate(total=Sum("total_base"))["total"] or Decimal("0")
     
     # Category breakdown
     category_spending = list(
-        Expense.objects.filter(
-            created_by=owner, date__gte=start, date__lte=end
+        spending_rollups(
+            owner=owner, start=start, end=end
         ).values("category__name", "category_id")
-        .annotate(total=Sum("amount"))
+        .annotate(total=Sum("total_base"))
         .order_by("-total")
     )
     
@@ -448,3 +640,108 @@ def generate_month_end_summary(*, owner, month: date) -> Dict[str, Any]:
             "percent_used": float((total_spent / budget_amount) * 100) if budget_amount and budget_amount > 0 else None,
         },
     }
+
+
+# ---- frozen month-end summaries ----
+
+
+def is_closed_month(month: date, *, today: date | None = None) -> bool:
+    return normalize_month(month) < normalize_month(today or timezone.localdate())
+
+
+def get_month_end_summary(*, owner, month: date) -> Dict[str, Any]:
+    """
+    Month-end summary; closed months are served from their MonthEndSnapshot row
+    (one indexed lookup) and only recomputed when a late write moved them on.
+    """
+    month = normalize_month(month)
+    if not is_closed_month(month):
+        return generate_month_end_summary(owner=owner, month=month)
+    snapshot = MonthEndSnapshot.objects.filter(user=owner, month=month).first()
+    if snapshot is not None and snapshot.is_current:
+        return snapshot.summary
+    return refresh_month_end_snapshot(owner=owner, month=month)
+
+
+def refresh_month_end_snapshot(*, owner, month: date) -> Dict[str, Any]:
+    """(Re)compute and store the summary of a closed month."""
+    month = normalize_month(month)
+    MonthEndSnapshot.objects.bulk_create([MonthEndSnapshot(user=owner, month=month)], ignore_conflicts=True)
+    # Read the version before the data: a write landing while we compute moves
+    # `version` past the one stored with the summary, so it is recomputed next time.
+    version = MonthEndSnapshot.objects.filter(user=owner, month=month).values_list("version", flat=True).get()
+    summary = generate_month_end_summary(owner=owner, month=month)
+    MonthEndSnapshot.objects.filter(user=owner, month=month).update(
+        summary=summary, summary_version=version, computed_at=timezone.now()
+    )
+    return summary
+
+
+def mark_month_end_snapshots_changed(owner_months: Iterable[tuple[int, date]]) -> None:
+    """Late-write hook: move the snapshots of the closed months among `(user id, month)` pairs."""
+    today = timezone.localdate()
+    pairs = {
+        (user_id, normalize_month(month))
+        for user_id, month in owner_months
+        if user_id is not None and is_closed_month(month, today=today)
+    }
+    if not pairs:
+        return
+    match = Q()
+    for user_id, month in pairs:
+        match |= Q(user_id=user_id, month=month)
+    MonthEndSnapshot.objects.filter(match).update(version=F("version") + 1)
+
+
+def mark_category_month_end_snapshots_changed(category_id: int) -> None:
+    """Category rename/delete hook: move the closed-month snapshots that list the category.
+
+    Summaries store each category's name, and list only categories with spending that month.
+    """
+    listed = (
+        spending_rollups()
+        .filter(user_id=OuterRef("user_id"), category_id=category_id)
+        .annotate(rollup_month=TruncMonth("date"))
+        .filter(rollup_month=OuterRef("month"))
+    )
+    MonthEndSnapshot.objects.filter(month__lt=normalize_month(timezone.localdate())).filter(Exists(listed)).update(
+        version=F("version") + 1
+    )
+
+
+def close_month(*, month: date, user_ids: Iterable[int] | None = None) -> int:
+    """Snapshot `month` for every user with data in it (or just `user_ids`). Returns snapshots written."""
+    month = normalize_month(month)
+    if not is_closed_month(month):
+        raise ValueError(f"{month.isoformat()} is not closed yet")
+    start, end = month_bounds(month)
+    if user_ids is None:
+        owners = (
+            spending_rollups(start=start, end=end).values_list("user_id").distinct()
+            .union(
+                Income.objects.filter(month=month).order_by().values_list("created_by_id"),
+                MonthlyBudget.objects.filter(month=month).order_by().values_list("created_by_id"),
+                Budget.objects.filter(month=month).order_by().values_list("created_by_id"),
+            )
+        )
+        user_ids = [user_id for (user_id,) in owners]
+    written = 0
+    for owner in get_user_model().objects.filter(pk__in=list(user_ids)).order_by("pk").iterator():
+        refresh_month_end_snapshot(owner=owner, month=month)
+        written += 1
+    return written
+
+
+def refresh_changed_month_end_snapshots() -> int:
+    """Recompute every snapshot a late write moved on since it was computed."""
+    changed = (
+        MonthEndSnapshot.objects.filter(Q(summary_version__isnull=True) | ~Q(summary_version=F("version")))
+        .select_related("user")
+        .order_by("month", "user_id")
+    )
+    written = 0
+    for snapshot in changed.iterator():
+        refresh_month_end_snapshot(owner=snapshot.user, month=snapshot.month)
+        written += 1
+    return written
+
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from budgets.models import Budget, Income, IncomeSource, MonthlyBudget, normalize_month
+from budgets.services import mark_category_month_end_snapshots_changed, mark_month_end_snapshots_changed
+from categories.models import Category
+from core.versions import bump_data_versions
+from expenses.signals import expenses_changed
+
+
+@receiver(expenses_changed)
+def _expenses_changed(sender, removed, added, **kwargs):
+	owner_months = {(expense.created_by_id, normalize_month(expense.date)) for expense in [*removed, *added]}
+	mark_month_end_snapshots_changed(owner_months)
+
+
+@receiver(pre_save, sender=Budget)
+@receiver(pre_save, sender=MonthlyBudget)
+@receiver(pre_save, sender=Income)
+def _remember_previous_month(sender, instance, **kwargs):
+	instance._previous_month = None
+	if instance.pk and not instance._state.adding:
+		instance._previous_month = sender.objects.filter(pk=instance.pk).values_list("month", flat=True).first()
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_save, sender=MonthlyBudget)
+@receiver(post_save, sender=Income)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=MonthlyBudget)
+@receiver(post_delete, sender=Income)
+def _month_end_inputs_changed(sender, instance, **kwargs):
+	months = {instance.month, getattr(instance, "_previous_month", None)} - {None}
+	mark_month_end_snapshots_changed((instance.created_by_id, month) for month in months)
+
+
+# Frozen month-end summaries carry category names. Deleting a category
+# cascades to its rollups, so find the affected snapshots before that.
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def _category_month_end_changed(sender, instance, created=False, **kwargs):
+	if not created:
+		mark_category_month_end_snapshots_changed(instance.pk)
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_save, sender=MonthlyBudget)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=IncomeSource)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=MonthlyBudget)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=IncomeSource)
+def _bump_data_versions(sender, instance, **kwargs):
+	if getattr(instance, "is_system", False):
+		bump_data_versions(include_global=True)
+	else:
+		bump_data_versions(user_ids=[instance.created_by_id])
@@ -2,6 +2,7 @@ from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from budgets.views import (
+    BudgetStatusRangeView,
     BudgetStatusView,
     BudgetViewSet,
     BudgetWarningsView,
@@ -18,6 +19,7 @@ router.register(r"allocations", BudgetViewSet, basename="budget")
 
 urlpatterns = [
     path("status/", BudgetStatusView.as_view(), name="budget-status"),
+    path("status/range/", BudgetStatusRangeView.as_view(), name="budget-status-range"),
     path("warnings/", BudgetWarningsView.as_view(), name="budget-warnings"),
 ]
 
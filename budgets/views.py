@@ -15,15 +15,23 @@ from budgets.serializers import (
     IncomeSourceSerializer,
     MonthlyBudgetSerializer,
 )
-from budgets.services import compute_budget_status_for_month, get_budget_warnings
+from budgets.services import (
+    compute_budget_status_for_month,
+    compute_budget_status_range,
+    get_budget_warnings,
+    month_range,
+)
+from core.conditional import ConditionalGetMixin
+from core.fieldsets import SparseFieldsetMixin
 from core.permissions import IsUserOrAdminRole
 from core.rbac import is_admin
 
 
-class IncomeSourceViewSet(viewsets.ModelViewSet):
+class IncomeSourceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """CRUD for income sources"""
     serializer_class = IncomeSourceSerializer
     permission_classes = [IsUserOrAdminRole]
+    conditional_for_admins = True
 
     def get_queryset(self):
         user = self.request.user
@@ -53,10 +61,11 @@ class IncomeFilter(django_filters.FilterSet):
         fields = ["month", "source"]
 
 
-class IncomeViewSet(viewsets.ModelViewSet):
+class IncomeViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """CRUD for monthly income entries"""
     serializer_class = IncomeSerializer
     permission_classes = [IsUserOrAdminRole]
+    conditional_for_admins = True
     filterset_class = IncomeFilter
     ordering_fields = ["month", "amount", "created_at"]
     ordering = ["-month", "-created_at"]
@@ -95,10 +104,11 @@ class IncomeViewSet(viewsets.ModelViewSet):
         })
 
 
-class MonthlyBudgetViewSet(viewsets.ModelViewSet):
+class MonthlyBudgetViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """CRUD for monthly budget (adjustable total)"""
     serializer_class = MonthlyBudgetSerializer
     permission_classes = [IsUserOrAdminRole]
+    conditional_for_admins = True
     ordering = ["-month"]
 
     def get_queryset(self):
@@ -188,7 +198,7 @@ class BudgetFilter(django_filters.FilterSet):
 		fields = ["month", "scope", "category"]
 
 
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
 	serializer_class = BudgetSerializer
 	permission_classes = [IsUserOrAdminRole]
 	queryset = Budget.objects.select_related("category").all()
@@ -276,8 +286,9 @@ class BudgetViewSet(viewsets.ModelViewSet):
 		return Response({"category_ids": list(allocations)})
 
 
-class BudgetStatusView(generics.GenericAPIView):
+class BudgetStatusView(ConditionalGetMixin, generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
+	conditional_for_admins = True
 
 	def get(self, request, *args, **kwargs):
 		month_param = request.query_params.get("month")
@@ -290,9 +301,34 @@ class BudgetStatusView(generics.GenericAPIView):
 		return Response(payload)
 
 
-class BudgetWarningsView(generics.GenericAPIView):
+class BudgetStatusRangeView(ConditionalGetMixin, generics.GenericAPIView):
+	"""Budget status for a range of months as a month x category matrix (year views)"""
+	permission_classes = [IsUserOrAdminRole]
+	conditional_for_admins = True
+	max_months = 24
+
+	def get(self, request, *args, **kwargs):
+		bounds = {}
+		for param in ("start_month", "end_month"):
+			value = request.query_params.get(param)
+			parsed = parse_date(value) if value else None
+			if not parsed:
+				return Response({"detail": f"{param} query param required (YYYY-MM-01)"}, status=400)
+			bounds[param] = normalize_month(parsed)
+
+		if bounds["start_month"] > bounds["end_month"]:
+			return Response({"detail": "start_month must not be after end_month"}, status=400)
+		if len(month_range(bounds["start_month"], bounds["end_month"])) > self.max_months:
+			return Response({"detail": f"Range cannot exceed {self.max_months} months"}, status=400)
+
+		payload = compute_budget_status_range(owner=request.user, **bounds)
+		return Response(payload)
+
+
+class BudgetWarningsView(ConditionalGetMixin, generics.GenericAPIView):
 	"""Get budget warnings for login notifications"""
 	permission_classes = [IsUserOrAdminRole]
+	conditional_for_admins = True
 
 	def get(self, request, *args, **kwargs):
 		month_param = request.query_params.get("month")
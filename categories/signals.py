@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from categories.models import Category
+from core.versions import bump_data_versions
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def _bump_data_versions(sender, instance: Category, **kwargs):
+	if instance.is_system:
+		bump_data_versions(include_global=True)
+	else:
+		bump_data_versions(user_ids=[instance.created_by_id])
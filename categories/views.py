@@ -3,11 +3,12 @@ from rest_framework import serializers, viewsets
 
 from categories.models import Category
 from categories.serializers import CategorySerializer
+from core.conditional import ConditionalGetMixin
 from core.permissions import IsUserOrAdminRole
 from core.rbac import is_admin
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
 	serializer_class = CategorySerializer
 	permission_classes = [IsUserOrAdminRole]
 	queryset = Category.objects.all()
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third-party
     'rest_framework',
@@ -58,6 +59,8 @@ INSTALLED_APPS = [
     'export_api',
     'ai',
     'admin_panel',
+    'sync',
+    'recurring',
 ]
 
 MIDDLEWARE = [
@@ -107,6 +110,27 @@ DATABASES = {
 }
 
 
+# Cache
+# LocMemCache is per-process; multi-worker deployments should point CACHE_BACKEND
+# at a shared backend (e.g. django.core.cache.backends.db.DatabaseCache) so that
+# workers share cached results. Correctness does not depend on it: cached entries
+# are keyed on committed data versions (core/versions.py), never deleted on write.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'expense-tracker'),
+    }
+}
+# Optional shared tier for cached report results (core/reportcache.py), e.g.
+# REPORT_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache with
+# REPORT_CACHE_LOCATION=/var/tmp/expense-reports, or the DatabaseCache backend.
+if os.getenv('REPORT_CACHE_BACKEND'):
+    CACHES['reports'] = {
+        'BACKEND': os.getenv('REPORT_CACHE_BACKEND'),
+        'LOCATION': os.getenv('REPORT_CACHE_LOCATION', 'expense-tracker-reports'),
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -187,6 +211,29 @@ CORS_ALLOW_HEADERS = [
 
 # Domain settings
 EXPENSE_EDIT_WINDOW_HOURS = 72
+EXPENSE_BULK_MAX_ITEMS = 1000
+# "flag" returns `possible_duplicate_of` on creates; "reject" answers 409 (per request: `?on_duplicate=`).
+EXPENSE_DUPLICATE_MODE = "flag"
+# Currency reports and budgets are kept in; other currencies convert at FxRate rates (load_fx_rates).
+BASE_CURRENCY = os.getenv('BASE_CURRENCY', 'BDT')
+FX_RATE_CACHE_SECONDS = 600
+# date,currency,rate CSV the expenses 0008 migration loads first, to convert existing non-base expenses.
+FX_BOOTSTRAP_RATES = os.getenv('FX_BOOTSTRAP_RATES')
+# `archive_expenses` moves expenses older than this many months to compressed per-user-year archives.
+EXPENSE_ARCHIVE_AFTER_MONTHS = 24
+BUDGET_SNAPSHOT_CACHE_SECONDS = 300
+# Report results: per-process LRU size, lifetime in both tiers, and the shared tier's CACHES alias (None = LRU only).
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv('REPORT_CACHE_MAX_ENTRIES', '512'))
+REPORT_CACHE_SECONDS = 300
+REPORT_CACHE_ALIAS = 'reports' if 'reports' in CACHES else None
+# Mobile delta sync: change log history kept (older cursors must reset) and entries per response.
+SYNC_LOG_RETENTION_DAYS = 30
+SYNC_PAGE_SIZE = 500
+# Authorized file downloads (receipts) are handed to the front web server:
+# "x-accel" for nginx (FILE_ACCEL_PREFIX is an `internal` location aliased to
+# MEDIA_ROOT), "x-sendfile" for Apache/lighttpd, unset to stream from Django.
+FILE_SENDFILE_BACKEND = os.getenv('FILE_SENDFILE_BACKEND') or None
+FILE_ACCEL_PREFIX = os.getenv('FILE_ACCEL_PREFIX', '/protected-media/')
 
 
 # AI (future)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.rbac import is_admin
+from core.versions import get_data_versions
+
+
+class _NotModified(Exception):
+	def __init__(self, etag: str):
+		self.etag = etag
+
+
+class ConditionalGetMixin:
+	"""ETag / If-None-Match for GET endpoints that only show the caller's own data.
+
+	The ETag is derived from the caller's data version (plus the global one
+	for shared rows), the full URL and today's date, so a matching request is
+	answered with 304 after authentication without running the view's queries.
+
+	Admin requests may span other users' data and are always served in full,
+	unless the view sets `conditional_for_admins` because it only ever shows
+	the caller's own data.
+	"""
+
+	conditional_for_admins = False
+
+	def initial(self, request, *args, **kwargs):
+		super().initial(request, *args, **kwargs)
+		self._etag = None
+		if request.method not in ("GET", "HEAD"):
+			return
+		if not self.conditional_for_admins and is_admin(request.user):
+			return
+		self._etag = self._compute_etag(request)
+		if self._etag_matches(request, self._etag):
+			raise _NotModified(self._etag)
+
+	def handle_exception(self, exc):
+		if isinstance(exc, _NotModified):
+			response = Response(status=status.HTTP_304_NOT_MODIFIED)
+			self._add_validators(response, exc.etag)
+			return response
+		return super().handle_exception(exc)
+
+	def finalize_response(self, request, response, *args, **kwargs):
+		response = super().finalize_response(request, response, *args, **kwargs)
+		etag = getattr(self, "_etag", None)
+		if etag and response.status_code == status.HTTP_200_OK and not response.has_header("ETag"):
+			self._add_validators(response, etag)
+		return response
+
+	@staticmethod
+	def _compute_etag(request) -> str:
+		user_version, global_version = get_data_versions(request.user.pk)
+		parts = (
+			request.user.pk,
+			user_version,
+			global_version,
+			# Several payloads depend on "today" (trends, days remaining).
+			timezone.localdate().isoformat(),
+			request.get_full_path(),
+			request.META.get("HTTP_ACCEPT", ""),
+		)
+		digest = hashlib.sha1(":".join(map(str, parts)).encode("utf-8")).hexdigest()
+		return f'W/"{digest}"'
+
+	@staticmethod
+	def _etag_matches(request, etag: str) -> bool:
+		header = request.META.get("HTTP_IF_NONE_MATCH")
+		if not header:
+			return False
+		candidates = parse_etags(header)
+		# If-None-Match uses the weak comparison.
+		return "*" in candidates or etag.removeprefix("W/") in {tag.removeprefix("W/") for tag in candidates}
+
+	@staticmethod
+	def _add_validators(response, etag: str) -> None:
+		response["ETag"] = etag
+		# Revalidate on every use; the payload is per user.
+		patch_cache_control(response, private=True, no_cache=True)
+		patch_vary_headers(response, ("Authorization",))
@@ -0,0 +1,278 @@
+"""
+Fast path for large read-only list responses.
+
+A `RowConverter` is built once per response from the (possibly pruned)
+serializer: it works out which database column each field reads and how the
+field renders the raw value. Rows are then fetched with `.values_list()` --
+no model instances, no per-field `get_attribute()` -- and turned into the
+same dicts the serializer would produce, so the rendered JSON is
+byte-identical.
+
+Serializers the converter can't trace to columns (method fields, nested
+serializers, properties, a custom `to_representation`) get no converter, and
+`FastListMixin` falls back to the regular serializer for them.
+"""
+from __future__ import annotations
+
+import datetime
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.relations import PKOnlyObject
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+_SKIP = object()
+
+# Serializer fields that render a column value as is when it already has the right type.
+_PASSTHROUGH = (
+	(serializers.CharField, (models.CharField, models.TextField)),
+	(serializers.IntegerField, (models.IntegerField,)),
+	(serializers.BooleanField, (models.BooleanField,)),
+)
+
+# Fields whose rendering depends on more than the column value.
+_UNSUPPORTED = (
+	serializers.BaseSerializer,
+	serializers.ManyRelatedField,
+	serializers.SerializerMethodField,
+	serializers.HiddenField,
+	serializers.ModelField,
+	serializers.ListField,
+	serializers.DictField,
+)
+
+
+class RowConverter:
+	"""Turns `.values_list()` rows into a serializer's representation.
+
+	`plan` holds `(key, column index, converter, guard index, value when the
+	guard is null)` per output field, in serializer order; a row costs one
+	pass over it plus one call per field that needs converting.
+	"""
+
+	def __init__(self, columns: list[str], plan: list[tuple]):
+		self.columns = columns
+		self.plan = plan
+
+	@classmethod
+	def compile(cls, serializer) -> RowConverter | None:
+		"""Converter for `serializer`'s model serializer, or None if it needs the slow path."""
+		if isinstance(serializer, serializers.ListSerializer):
+			serializer = serializer.child
+		if not isinstance(serializer, serializers.ModelSerializer):
+			return None
+		if type(serializer).to_representation is not serializers.Serializer.to_representation:
+			return None
+
+		opts = serializer.Meta.model._meta
+		columns: list[str] = []
+		plan = []
+		for field in serializer._readable_fields:
+			step = _compile_field(field, opts, serializer.context)
+			if step is None:
+				return None
+			column, guard, convert, missing = step
+			plan.append(
+				(field.field_name, _index(columns, column), convert, None if guard is None else _index(columns, guard), missing)
+			)
+		return cls(columns, plan)
+
+	def convert(self, row) -> dict:
+		item = {}
+		for key, index, convert, guard, missing in self.plan:
+			if guard is not None and row[guard] is None:
+				# The relation the source goes through is empty.
+				if missing is not _SKIP:
+					item[key] = missing() if callable(missing) else missing
+				continue
+			value = row[index]
+			item[key] = value if value is None or convert is None else convert(value)
+		return item
+
+	def values(self, queryset, extra: tuple[str, ...] = ()):
+		"""`queryset` as named rows holding the converter's columns plus `extra`.
+
+		Rows are named tuples so paginators can read ordering keys off them.
+		"""
+		columns = list(self.columns)
+		for name in ("id", *extra):
+			_index(columns, name)
+		return queryset.values_list(*columns, named=True)
+
+	def convert_many(self, rows) -> list[dict]:
+		convert = self.convert
+		return [convert(row) for row in rows]
+
+
+def _index(columns: list[str], name: str) -> int:
+	if name not in columns:
+		columns.append(name)
+	return columns.index(name)
+
+
+def _compile_field(field, opts, context):
+	"""`(column, guard column, converter, value when the guard is null)` for one field.
+
+	A `None` converter means the column value is rendered as is.
+	"""
+	if isinstance(field, _UNSUPPORTED) or field.source == "*":
+		return None
+	if isinstance(field, serializers.RelatedField) and not isinstance(field, serializers.PrimaryKeyRelatedField):
+		return None
+
+	path = field.source_attrs
+	try:
+		model_field = opts.get_field(path[0])
+	except FieldDoesNotExist:
+		return None
+	if not model_field.concrete or model_field.many_to_many:
+		return None
+
+	if isinstance(field, serializers.PrimaryKeyRelatedField):
+		# Rendered from the local `<name>_id` column, like DRF's pk-only optimisation.
+		if len(path) != 1 or not model_field.many_to_one or field.pk_field is not None:
+			return None
+		if not model_field.target_field.primary_key:
+			return None
+		if type(field).to_representation is serializers.PrimaryKeyRelatedField.to_representation:
+			return path[0], None, None, None
+		return path[0], None, lambda pk: field.to_representation(PKOnlyObject(pk)), None
+
+	if len(path) == 1:
+		if model_field.is_relation:
+			return None
+		if isinstance(field, serializers.FileField):
+			if not isinstance(model_field, models.FileField):
+				return None
+			return path[0], None, _file_converter(field, model_field, context), None
+		return path[0], None, _value_converter(field, model_field), None
+
+	if len(path) != 2 or not model_field.many_to_one:
+		return None
+	try:
+		target = model_field.related_model._meta.get_field(path[1])
+	except FieldDoesNotExist:
+		return None
+	if not target.concrete or target.is_relation or isinstance(field, serializers.FileField):
+		return None
+
+	# With the relation empty DRF falls back to the field's default, null, or
+	# leaves the key out -- in that order.
+	guard, missing = None, None
+	if model_field.null:
+		guard = path[0]
+		if field.default is not empty:
+			missing = field.get_default
+		elif field.allow_null:
+			missing = None
+		elif not field.required:
+			missing = _SKIP
+		else:
+			return None
+	return f"{path[0]}__{path[1]}", guard, _value_converter(field, target), missing
+
+
+def _value_converter(field, model_field):
+	representation = type(field).to_representation
+	for field_class, column_classes in _PASSTHROUGH:
+		if representation is field_class.to_representation:
+			if isinstance(model_field, column_classes):
+				return None
+			break
+
+	if representation is serializers.DecimalField.to_representation:
+		return _decimal_converter(field) or field.to_representation
+	if representation is serializers.DateTimeField.to_representation:
+		return _datetime_converter(field) or field.to_representation
+	if representation is serializers.DateField.to_representation and isinstance(model_field, models.DateField):
+		if not isinstance(model_field, models.DateTimeField) and _is_iso(field, api_settings.DATE_FORMAT):
+			return datetime.date.isoformat
+	return field.to_representation
+
+
+def _is_iso(field, default_format) -> bool:
+	output_format = getattr(field, "format", default_format)
+	return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+
+def _decimal_converter(field):
+	"""`DecimalField.to_representation` with the quantizing context built once."""
+	coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+	if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+		return None
+	exponent = decimal.Decimal(".1") ** field.decimal_places
+	rounding = field.rounding
+	context = decimal.getcontext().copy()
+	if field.max_digits is not None:
+		context.prec = field.max_digits
+
+	def convert(value):
+		if not isinstance(value, decimal.Decimal):
+			value = decimal.Decimal(str(value).strip())
+		return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+
+	return convert
+
+
+def _datetime_converter(field):
+	"""`DateTimeField.to_representation` with the output timezone resolved once."""
+	if type(field).enforce_timezone is not serializers.DateTimeField.enforce_timezone:
+		return None
+	if not _is_iso(field, api_settings.DATETIME_FORMAT):
+		return None
+	field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+	if field_timezone is None:
+		return None
+	fallback = field.to_representation
+
+	def convert(value):
+		if value.tzinfo is None:
+			return fallback(value)
+		value = value.astimezone(field_timezone).isoformat()
+		return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+	return convert
+
+
+def _file_converter(field, model_field, context):
+	use_url = getattr(field, "use_url", True)
+	storage = model_field.storage
+	request = context.get("request")
+
+	def convert(name):
+		if not name:
+			return None
+		if not use_url:
+			return name
+		url = storage.url(name)
+		return request.build_absolute_uri(url) if request is not None else url
+
+	return convert
+
+
+class FastListMixin:
+	"""Serve `list()` through a `RowConverter` when the serializer compiles to one."""
+
+	def list(self, request, *args, **kwargs):
+		converter = RowConverter.compile(self.get_serializer())
+		if converter is None:
+			return super().list(request, *args, **kwargs)
+
+		queryset = self.filter_queryset(self.get_queryset())
+		rows = converter.values(queryset, extra=self._fast_list_ordering(queryset))
+		page = self.paginate_queryset(rows)
+		if page is not None:
+			return self.get_paginated_response(converter.convert_many(page))
+		return Response(converter.convert_many(rows))
+
+	def _fast_list_ordering(self, queryset) -> tuple[str, ...]:
+		# Paginators read their ordering key off each row.
+		names = [name for name in queryset.query.order_by if isinstance(name, str) and name != "?"]
+		default = getattr(self.paginator, "default_ordering", None)
+		if isinstance(default, str):
+			names.append(default)
+		return tuple(name.lstrip("-") for name in names)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsetMixin:
+	"""`?fields=a,b` / `?omit=c` for read requests on a serializer-backed view.
+
+	Unrequested serializer fields are dropped, and the queryset is narrowed to
+	match: `.only()` the columns the remaining fields read, and only the
+	`select_related` joins they traverse. Fields whose source can't be traced
+	to model columns (methods, properties, `*`) leave the queryset as is.
+	"""
+
+	fields_query_param = "fields"
+	omit_query_param = "omit"
+
+	def get_serializer(self, *args, **kwargs):
+		serializer = super().get_serializer(*args, **kwargs)
+		selected = self.get_sparse_fieldset()
+		if selected is not None:
+			target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+			for name in list(target.fields):
+				if name not in selected:
+					target.fields.pop(name)
+		return serializer
+
+	def filter_queryset(self, queryset):
+		queryset = super().filter_queryset(queryset)
+		if self.get_sparse_fieldset() is None:
+			return queryset
+		return narrow_queryset(queryset, self.get_serializer().fields.values())
+
+	def get_sparse_fieldset(self) -> set[str] | None:
+		"""Names of the serializer fields to render, or None for all of them."""
+		if hasattr(self, "_sparse_fieldset"):
+			return self._sparse_fieldset
+
+		self._sparse_fieldset = None
+		request = self.request
+		params = request.query_params
+		if request.method not in SAFE_METHODS or not (
+			params.get(self.fields_query_param) or params.get(self.omit_query_param)
+		):
+			return None
+
+		available = list(super().get_serializer().fields)
+		requested = _split(params.get(self.fields_query_param))
+		omitted = _split(params.get(self.omit_query_param))
+		unknown = (requested | omitted) - set(available)
+		if unknown:
+			raise serializers.ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}"})
+
+		selected = (requested or set(available)) - omitted
+		self._sparse_fieldset = selected
+		return selected
+
+
+def _split(raw: str | None) -> set[str]:
+	return {name.strip() for name in (raw or "").split(",") if name.strip()}
+
+
+def narrow_queryset(queryset, fields):
+	"""`.only()` / `select_related()` a queryset down to what `fields` read."""
+	opts = queryset.model._meta
+	columns = {opts.pk.name}
+	joins = set()
+
+	for field in fields:
+		if field.source == "*":
+			return queryset
+		path = field.source_attrs
+		try:
+			model_field = opts.get_field(path[0])
+		except FieldDoesNotExist:
+			return queryset
+		if not model_field.concrete or model_field.many_to_many:
+			return queryset
+
+		if isinstance(field, serializers.BaseSerializer):
+			# A nested serializer renders the whole related row.
+			if len(path) != 1 or not model_field.is_relation:
+				return queryset
+			columns.add(path[0])
+			joins.add(path[0])
+		elif len(path) == 1:
+			# A relation by itself renders its key, which is the local `<name>_id` column.
+			columns.add(path[0])
+		elif len(path) == 2 and model_field.is_relation:
+			try:
+				model_field.related_model._meta.get_field(path[1])
+			except FieldDoesNotExist:
+				return queryset
+			columns.add(f"{path[0]}__{path[1]}")
+			joins.add(path[0])
+		else:
+			return queryset
+
+	# Keep the ordering columns loaded; keyset pagination reads them off each row.
+	for expression in queryset.query.order_by:
+		if isinstance(expression, str):
+			name = expression.lstrip("-")
+			if name in queryset.query.annotations:
+				continue
+			try:
+				columns.add(opts.get_field(name).name)
+			except FieldDoesNotExist:
+				pass
+
+	queryset = queryset.select_related(None)
+	if joins:
+		queryset = queryset.select_related(*joins)
+	return queryset.only(*columns)
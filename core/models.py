@@ -21,6 +21,20 @@ class OwnedModel(TimeStampedModel):
 		abstract = True
 
 
+class DataVersion(models.Model):
+	"""Write counter per user, plus one global counter for shared (system) rows.
+
+	Bumped whenever a user's data changes; read endpoints derive their ETags
+	and report cache keys from it (see core/versions.py). An 'all-users' row
+	versions results that span every user.
+	"""
+	key = models.CharField(max_length=32, primary_key=True, help_text="'user:<id>' or 'global'")
+	version = models.PositiveBigIntegerField(default=0)
+
+	def __str__(self) -> str:
+		return f"{self.key}={self.version}"
+
+
 class NotificationType(models.TextChoices):
 	CATEGORY_WARNING = "category_warning", "Category Budget Warning"
 	CATEGORY_EXCEEDED = "category_exceeded", "Category Budget Exceeded"
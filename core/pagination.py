@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+	"""Cursor pagination over a `(key, id)` pair.
+
+	The page position is the key value and id of the boundary row, so every
+	page is a bounded index range scan (no OFFSET) and rows inserted while a
+	client is paging never shift or duplicate results.
+
+	The key is the first field the queryset is ordered by (after filtering),
+	as long as it is listed in `keyset_fields`; otherwise `default_ordering`
+	is used. Ties are always broken by `id` in the same direction.
+
+	`extra_rows` (objects with the key attribute and `pk`, e.g. archived
+	expenses) are merged into the pages by the same position. It may be a
+	callable taking `after` (the cursor's (key, id) or None), `descending`
+	and `limit`, returning at most `limit` rows past `after` in scan order,
+	so a source can read only what the page needs.
+	"""
+
+	page_size = 50
+	max_page_size = 200
+	page_size_query_param = "page_size"
+	cursor_query_param = "cursor"
+	invalid_cursor_message = "Invalid cursor"
+	default_ordering = "-date"
+	keyset_fields: tuple[str, ...] = ("date",)
+
+	def paginate_queryset(self, queryset, request, view=None, *, extra_rows=()):
+		self.request = request
+		self.base_url = request.build_absolute_uri()
+		self.page_size = self.get_page_size(request)
+
+		key = self.get_ordering(queryset)
+		self.key_field = key.lstrip("-")
+		self.descending = key.startswith("-")
+
+		cursor = self.decode_cursor(request)
+		reverse = bool(cursor and cursor.get("r"))
+
+		# Walking backwards flips the scan direction; the page is reversed afterwards.
+		scan_descending = self.descending != reverse
+		prefix = "-" if scan_descending else ""
+		queryset = queryset.order_by(f"{prefix}{self.key_field}", f"{prefix}id")
+
+		if cursor:
+			value = self.to_python(queryset, cursor["k"])
+			lookup = "lt" if scan_descending else "gt"
+			queryset = queryset.filter(
+				Q(**{f"{self.key_field}__{lookup}": value})
+				| Q(**{self.key_field: value, f"id__{lookup}": cursor["i"]})
+			)
+
+		rows = list(queryset[: self.page_size + 1])
+		if callable(extra_rows):
+			extra_rows = extra_rows(
+				after=(value, cursor["i"]) if cursor else None,
+				descending=scan_descending,
+				limit=self.page_size + 1,
+			)
+		if extra_rows:
+			def position(row):
+				return (getattr(row, self.key_field), row.pk)
+
+			if cursor:
+				boundary = (value, cursor["i"])
+				extra_rows = [
+					row for row in extra_rows if (position(row) < boundary if scan_descending else position(row) > boundary)
+				]
+			rows = sorted([*rows, *extra_rows], key=position, reverse=scan_descending)[: self.page_size + 1]
+		has_more = len(rows) > self.page_size
+		rows = rows[: self.page_size]
+		if reverse:
+			rows.reverse()
+
+		self.has_next = has_more if not reverse else bool(cursor)
+		self.has_previous = bool(cursor) if not reverse else has_more
+		self.page = rows
+		return rows
+
+	def get_paginated_response(self, data):
+		return Response(
+			{
+				"next": self.get_next_link(),
+				"previous": self.get_previous_link(),
+				"results": data,
+			}
+		)
+
+	def get_paginated_response_schema(self, schema):
+		return {
+			"type": "object",
+			"required": ["results"],
+			"properties": {
+				"next": {"type": "string", "nullable": True, "format": "uri"},
+				"previous": {"type": "string", "nullable": True, "format": "uri"},
+				"results": schema,
+			},
+		}
+
+	def get_page_size(self, request) -> int:
+		raw = request.query_params.get(self.page_size_query_param)
+		if raw:
+			try:
+				size = int(raw)
+			except ValueError:
+				size = 0
+			if size > 0:
+				return min(size, self.max_page_size)
+		return self.page_size
+
+	def get_ordering(self, queryset) -> str:
+		order_by = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+		if order_by:
+			first = order_by[0]
+			if isinstance(first, str) and first.lstrip("-") in self.keyset_fields:
+				return first
+		return self.default_ordering
+
+	def to_python(self, queryset, raw):
+		if self.key_field in queryset.query.annotations:
+			field = queryset.query.annotations[self.key_field].output_field
+		else:
+			field = queryset.model._meta.get_field(self.key_field)
+		try:
+			value = field.to_python(raw)
+		except Exception:
+			raise NotFound(self.invalid_cursor_message)
+		# Keyset fields are never null, so a null key can only be a forged cursor.
+		if value is None:
+			raise NotFound(self.invalid_cursor_message)
+		return value
+
+	def get_next_link(self):
+		if not self.has_next or not self.page:
+			return None
+		return self.encode_cursor(self.page[-1], reverse=False)
+
+	def get_previous_link(self):
+		if not self.has_previous or not self.page:
+			return None
+		return self.encode_cursor(self.page[0], reverse=True)
+
+	def decode_cursor(self, request) -> dict | None:
+		encoded = request.query_params.get(self.cursor_query_param)
+		if not encoded:
+			return None
+		try:
+			raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+			cursor = json.loads(raw)
+			cursor["i"] = int(cursor["i"])
+			cursor["k"]
+		except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+			raise NotFound(self.invalid_cursor_message)
+		return cursor
+
+	def encode_cursor(self, row, *, reverse: bool) -> str:
+		value = getattr(row, self.key_field)
+		value = value.isoformat() if hasattr(value, "isoformat") else force_str(value)
+		# Rows may be `.values_list(named=True)` tuples (see core/fastlist.py).
+		payload = {"k": value, "i": row.pk if hasattr(row, "pk") else row.id}
+		if reverse:
+			payload["r"] = 1
+		encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+		url = remove_query_param(self.base_url, "page")
+		return replace_query_param(url, self.cursor_query_param, encoded.decode("ascii"))
+
+
+class ExpenseCursorPagination(KeysetPagination):
+	"""Expenses page on `(date, id)` by default, matching `idx_expense_user_date`.
+
+	Full-text searches page on `(rank, id)`.
+	"""
+
+	default_ordering = "-date"
+	keyset_fields = ("date", "amount", "created_at", "rank")
@@ -0,0 +1,225 @@
+"""
+Report result cache.
+
+Report payloads are cached under (scope, endpoint, normalized query params,
+data versions, today). Every write moves a data version, and keys are built
+from the versions committed in the database, so once a write has committed
+(and, for all-users results, its after-commit bump has run) no worker reads
+a result computed before it. Stale entries just age out; nothing is deleted
+on write.
+
+Two tiers: a bounded per-process LRU answers repeated dashboard loads without
+a round trip, and an optional shared Django cache (REPORT_CACHE_ALIAS, e.g. a
+file or database backend) lets workers reuse each other's results. Hit/miss
+counters are per process.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from core.rbac import is_admin
+from core.versions import ALL_USERS_VERSION_KEY, get_data_versions, load_data_versions
+
+_MISSING = object()
+
+
+class LRUCache:
+	"""Thread-safe bounded mapping with per-entry expiry, evicting the least recently used."""
+
+	def __init__(self, max_entries: int):
+		self.max_entries = max_entries
+		self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: str, default=None):
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return default
+			expires_at, value = entry
+			if expires_at <= time.monotonic():
+				del self._entries[key]
+				return default
+			self._entries.move_to_end(key)
+			return value
+
+	def set(self, key: str, value, timeout: float) -> None:
+		if self.max_entries <= 0:
+			return
+		with self._lock:
+			self._entries[key] = (time.monotonic() + timeout, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+
+class ReportCache:
+	def __init__(self, *, max_entries: int, timeout: int, alias: str | None = None):
+		self.local = LRUCache(max_entries)
+		self.timeout = timeout
+		self.alias = alias
+		self._lock = threading.Lock()
+		self._counters = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+	@property
+	def shared(self):
+		return caches[self.alias] if self.alias else None
+
+	def _count(self, name: str) -> None:
+		with self._lock:
+			self._counters[name] += 1
+
+	def get(self, key: str):
+		value = self.local.get(key, _MISSING)
+		if value is not _MISSING:
+			self._count("local_hits")
+			return value
+		if self.shared is not None:
+			value = self.shared.get(key, _MISSING)
+			if value is not _MISSING:
+				self.local.set(key, value, self.timeout)
+				self._count("shared_hits")
+				return value
+		self._count("misses")
+		return _MISSING
+
+	def set(self, key: str, value) -> None:
+		self.local.set(key, value, self.timeout)
+		if self.shared is not None:
+			self.shared.set(key, value, self.timeout)
+
+	def stats(self) -> dict[str, Any]:
+		with self._lock:
+			counters = dict(self._counters)
+		lookups = sum(counters.values())
+		hits = counters["local_hits"] + counters["shared_hits"]
+		return {
+			**counters,
+			"hit_ratio": round(hits / lookups, 4) if lookups else None,
+			"local_entries": len(self.local),
+			"local_max_entries": self.local.max_entries,
+			"shared_alias": self.alias,
+			"timeout": self.timeout,
+		}
+
+	def clear(self) -> None:
+		"""Drop this process's entries and counters (the shared tier ages out on its own)."""
+		self.local.clear()
+		with self._lock:
+			self._counters = dict.fromkeys(self._counters, 0)
+
+
+_report_cache: ReportCache | None = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> ReportCache:
+	global _report_cache
+	if _report_cache is None:
+		with _report_cache_lock:
+			if _report_cache is None:
+				_report_cache = ReportCache(
+					max_entries=getattr(settings, "REPORT_CACHE_MAX_ENTRIES", 512),
+					timeout=getattr(settings, "REPORT_CACHE_SECONDS", 300),
+					alias=getattr(settings, "REPORT_CACHE_ALIAS", None),
+				)
+	return _report_cache
+
+
+def report_cache_key(request, endpoint: str, *, all_users: bool) -> str:
+	"""Key for `endpoint` as requested: caller (or every user), query params, data versions and today."""
+	if all_users:
+		scope = ("all", *load_data_versions(ALL_USERS_VERSION_KEY))
+	else:
+		scope = ("user", request.user.pk, *get_data_versions(request.user.pk))
+	params = sorted((name, sorted(values)) for name, values in request.query_params.lists())
+	parts = (*scope, endpoint, params, timezone.localdate().isoformat())
+	digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+	return f"report:{endpoint}:{digest}"
+
+
+def cached_response(request, endpoint: str, view: Callable[[], Response], *, all_users: bool) -> Response:
+	"""Serve `endpoint` from the report cache, running `view` on a miss; only 200 payloads are stored."""
+	report_cache = get_report_cache()
+	key = report_cache_key(request, endpoint, all_users=all_users)
+	data = report_cache.get(key)
+	if data is not _MISSING:
+		return Response(data)
+	response = view()
+	if response.status_code == status.HTTP_200_OK:
+		report_cache.set(key, response.data)
+	return response
+
+
+class _CachedReport(Exception):
+	def __init__(self, data):
+		self.data = data
+
+
+class ReportCacheMixin:
+	"""Serve a GET view's payload from the report cache, per caller and data version.
+
+	Admin requests are cached across every user unless the view sets
+	`conditional_for_admins` (see ConditionalGetMixin) because it only ever
+	shows the caller's own data.
+	"""
+
+	report_cache_endpoint: str | None = None
+
+	def initial(self, request, *args, **kwargs):
+		super().initial(request, *args, **kwargs)
+		self._report_cache_key = None
+		if request.method not in ("GET", "HEAD"):
+			return
+		all_users = is_admin(request.user) and not getattr(self, "conditional_for_admins", False)
+		endpoint = self.report_cache_endpoint or type(self).__name__
+		self._report_cache_key = report_cache_key(request, endpoint, all_users=all_users)
+		data = get_report_cache().get(self._report_cache_key)
+		if data is not _MISSING:
+			raise _CachedReport(data)
+
+	def handle_exception(self, exc):
+		if isinstance(exc, _CachedReport):
+			self._report_cache_key = None
+			return Response(exc.data)
+		return super().handle_exception(exc)
+
+	def finalize_response(self, request, response, *args, **kwargs):
+		response = super().finalize_response(request, response, *args, **kwargs)
+		key = getattr(self, "_report_cache_key", None)
+		if key and response.status_code == status.HTTP_200_OK:
+			get_report_cache().set(key, response.data)
+		return response
+
+
+def cache_report(endpoint: str, *, all_users: bool = True):
+	"""Decorator for admin analytics function views and viewset actions (cached across every user)."""
+
+	def decorator(view):
+		@functools.wraps(view)
+		def wrapper(*args, **kwargs):
+			request = next(arg for arg in args if isinstance(arg, Request))
+			return cached_response(request, endpoint, lambda: view(*args, **kwargs), all_users=all_users)
+
+		return wrapper
+
+	return decorator
@@ -0,0 +1,111 @@
+"""
+Deliver stored files after the view has authorized the request.
+
+With `FILE_SENDFILE_BACKEND` set, the response carries no body: the front
+web server sees `X-Accel-Redirect` (nginx) or `X-Sendfile` (Apache
+mod_xsendfile, lighttpd) and streams the file itself, Range requests
+included, so no Python worker is held for the transfer. Without one the
+file is streamed from Django in chunks, honouring a single byte range.
+"""
+from __future__ import annotations
+
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+
+X_ACCEL = "x-accel"
+X_SENDFILE = "x-sendfile"
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def serve_file(request, storage, name: str, *, content_type: str | None = None, etag: str | None = None):
+	"""Response for the stored file `name`; validators are left to the caller except `etag`."""
+	backend = getattr(settings, "FILE_SENDFILE_BACKEND", None)
+	if backend == X_ACCEL:
+		prefix = getattr(settings, "FILE_ACCEL_PREFIX", "/protected-media/")
+		response = HttpResponse(content_type=content_type)
+		response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name.lstrip("/"))
+	elif backend == X_SENDFILE and _has_path(storage, name):
+		response = HttpResponse(content_type=content_type)
+		response["X-Sendfile"] = storage.path(name)
+	else:
+		response = _stream(request, storage, name, content_type, etag)
+	if etag:
+		response["ETag"] = etag
+	return response
+
+
+def _has_path(storage, name: str) -> bool:
+	try:
+		storage.path(name)
+	except NotImplementedError:
+		return False
+	return True
+
+
+def _stream(request, storage, name, content_type, etag):
+	fileobj = storage.open(name, "rb")
+	size = storage.size(name)
+	byte_range = _requested_range(request, size, etag)
+	if byte_range is None:
+		response = FileResponse(fileobj, content_type=content_type)
+	elif byte_range is False:
+		fileobj.close()
+		response = HttpResponse(status=416)
+		response["Content-Range"] = f"bytes */{size}"
+	else:
+		start, end = byte_range
+		fileobj.seek(start)
+		response = StreamingHttpResponse(_read(fileobj, end - start + 1), status=206, content_type=content_type)
+		response["Content-Length"] = str(end - start + 1)
+		response["Content-Range"] = f"bytes {start}-{end}/{size}"
+	response["Accept-Ranges"] = "bytes"
+	return response
+
+
+def _requested_range(request, size: int, etag: str | None):
+	"""`(start, end)` of a satisfiable single range, False if unsatisfiable, None for the whole file.
+
+	Multi-range requests and a stale `If-Range` get the whole file, as RFC 9110 allows.
+	"""
+	header = request.META.get("HTTP_RANGE", "").strip()
+	match = _RANGE.match(header)
+	if not match or not (match.group(1) or match.group(2)):
+		return None
+	if_range = request.META.get("HTTP_IF_RANGE")
+	if if_range and (not etag or etag not in parse_etags(if_range)):
+		return None
+
+	first, last = match.groups()
+	if first:
+		start = int(first)
+		if last and int(last) < start:
+			return None
+		end = min(int(last), size - 1) if last else size - 1
+		if start >= size:
+			return False
+	else:
+		# A suffix range: the last N bytes.
+		length = int(last)
+		if length == 0 or size == 0:
+			return False
+		start, end = max(size - length, 0), size - 1
+	return start, end
+
+
+def _read(fileobj, remaining: int):
+	try:
+		while remaining > 0:
+			chunk = fileobj.read(min(CHUNK_SIZE, remaining))
+			if not chunk:
+				break
+			remaining -= len(chunk)
+			yield chunk
+	finally:
+		fileobj.close()
@@ -0,0 +1,16 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.versions import bump_all_users_version
+
+User = get_user_model()
+
+
+# Admin analytics count users and roles, which carry no data version of their own.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(m2m_changed, sender=User.groups.through)
+def _bump_all_users_version(sender, **kwargs):
+	transaction.on_commit(bump_all_users_version)
@@ -1,3 +1,161 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from categories.models import Category
+from core.fastlist import RowConverter
+from expenses.models import Expense, ReceiptBlob
+from expenses.serializers import ExpenseSerializer
+from users.roles import ROLE_USER
+
+User = get_user_model()
+
+
+def make_user(username):
+	user = User.objects.create_user(username, password="x")
+	user.groups.add(Group.objects.get_or_create(name=ROLE_USER)[0])
+	return user
+
+
+class ExpenseCursorPaginationTests(TestCase):
+	"""Following `next` and then `previous` links visits every row once, in order."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = make_user("pager")
+		start = date(2026, 1, 1)
+		# Several rows share a date (and an amount) so pages break inside ties.
+		for index in range(11):
+			Expense.objects.create(
+				created_by=cls.user,
+				amount=Decimal(10 + index % 3),
+				date=start + timedelta(days=index // 3),
+				description=f"Expense {index}",
+			)
+		Expense.objects.create(created_by=make_user("other"), amount=1, date=start, description="Not mine")
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def walk(self, url):
+		pages = []
+		while url:
+			response = self.client.get(url)
+			self.assertEqual(response.status_code, 200)
+			pages.append([row["id"] for row in response.data["results"]])
+			url = response.data["next"]
+		return pages, response.data["previous"]
+
+	def walk_back(self, url):
+		pages = []
+		while url:
+			response = self.client.get(url)
+			self.assertEqual(response.status_code, 200)
+			pages.append([row["id"] for row in response.data["results"]])
+			url = response.data["previous"]
+		return pages
+
+	def assertRoundTrips(self, query, expected_ids):
+		pages, previous = self.walk(f"/api/v1/expenses/?page_size=3{query}")
+		self.assertEqual([pk for page in pages for pk in page], expected_ids)
+		self.assertTrue(all(len(page) == 3 for page in pages[:-1]))
+		# Paging back from the last page returns the same pages in reverse.
+		self.assertEqual(self.walk_back(previous), pages[-2::-1])
+
+	def test_default_order_is_date_then_id_descending(self):
+		expected = list(Expense.objects.filter(created_by=self.user).order_by("-date", "-id").values_list("id", flat=True))
+		self.assertRoundTrips("", expected)
+
+	def test_amount_order(self):
+		expected = list(Expense.objects.filter(created_by=self.user).order_by("amount", "id").values_list("id", flat=True))
+		self.assertRoundTrips("&ordering=amount", expected)
+
+	def test_filters_apply_on_every_page(self):
+		qs = Expense.objects.filter(created_by=self.user, date__gte=date(2026, 1, 2)).order_by("-date", "-id")
+		self.assertRoundTrips("&start_date=2026-01-02", list(qs.values_list("id", flat=True)))
+
+	def test_rows_added_while_paging_do_not_shift_pages(self):
+		response = self.client.get("/api/v1/expenses/?page_size=3")
+		first = [row["id"] for row in response.data["results"]]
+		Expense.objects.create(created_by=self.user, amount=5, date=date(2026, 2, 1), description="New")
+		pages, _ = self.walk(response.data["next"])
+		seen = first + [pk for page in pages for pk in page]
+		self.assertEqual(len(seen), len(set(seen)))
+		self.assertEqual(len(seen), 11)
+
+	def test_forged_cursor_is_rejected(self):
+		for cursor in ("not-base64!", "eyJrIjpudWxsLCJpIjoxfQ==", "eyJpIjoxfQ=="):
+			response = self.client.get("/api/v1/expenses/", {"cursor": cursor})
+			self.assertEqual(response.status_code, 404, cursor)
+
+
+class RowConverterTests(TestCase):
+	"""A compiled `RowConverter` renders rows exactly as `ExpenseSerializer` does."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = make_user("rows")
+		category = Category.objects.create(name="Travel", created_by=cls.user)
+		blob = ReceiptBlob.objects.create(
+			sha256="a" * 64, file="receipts/blobs/aa/" + "a" * 64 + ".jpg", size=3, content_type="image/jpeg"
+		)
+		Expense.objects.create(
+			created_by=cls.user,
+			amount=Decimal("12.5"),
+			date=date(2026, 1, 2),
+			description="Train",
+			category=category,
+			merchant="Rail Co",
+			payment_method="card",
+			notes="Return ticket",
+			receipt=blob.file.name,
+			receipt_blob=blob,
+		)
+		Expense.objects.create(created_by=cls.user, amount=Decimal("0.10"), date=date(2026, 1, 3), description="Gum")
+		Expense.objects.create(
+			created_by=cls.user, amount=Decimal("3.00"), currency="USD", date=date(2026, 1, 3), description="Abroad"
+		)
+
+	def assertMatchesSerializer(self, context=None):
+		queryset = Expense.objects.filter(created_by=self.user).order_by("id")
+		serializer = ExpenseSerializer(queryset, many=True, context=context or {})
+		converter = RowConverter.compile(serializer)
+		self.assertIsNotNone(converter)
+		rows = converter.convert_many(converter.values(queryset))
+		self.assertEqual(rows, [dict(item) for item in serializer.data])
+
+	def test_matches_serializer(self):
+		self.assertMatchesSerializer()
+
+	def test_matches_serializer_with_request(self):
+		# Receipt URLs become absolute when a request is in the context.
+		request = Request(APIRequestFactory().get("/api/v1/expenses/"))
+		self.assertMatchesSerializer(context={"request": request})
+
+	def test_list_endpoint_renders_the_same(self):
+		client = APIClient()
+		client.force_authenticate(self.user)
+		response = client.get("/api/v1/expenses/", {"ordering": "date"})
+		self.assertEqual(response.status_code, 200)
+		queryset = Expense.objects.filter(created_by=self.user).order_by("date", "id")
+		expected = ExpenseSerializer(queryset, many=True, context={"request": response.wsgi_request}).data
+		self.assertEqual(response.json()["results"], [dict(item) for item in expected])
+
+	def test_declines_serializers_it_cannot_trace(self):
+		class WithMethodField(ExpenseSerializer):
+			label = serializers.SerializerMethodField()
+
+			class Meta(ExpenseSerializer.Meta):
+				fields = [*ExpenseSerializer.Meta.fields, "label"]
+
+			def get_label(self, obj):
+				return obj.description.upper()
 
-# Create your tests here.
+		self.assertIsNone(RowConverter.compile(WithMethodField()))
@@ -17,6 +17,8 @@ urlpatterns = [
     path("export/", include("export_api.urls")),
     path("ai/", include("ai.urls")),
     path("admin-panel/", include("admin_panel.urls")),
+    path("sync/", include("sync.urls")),
+    path("recurring/", include("recurring.urls")),
 ]
 
 urlpatterns += router.urls
@@ -0,0 +1,68 @@
+"""
+Per-user data versions.
+
+Every write to a user's expenses, budgets, incomes or categories bumps that
+user's counter (shared system rows bump the global one) inside the writing
+transaction. Readers fetch the committed counters with one primary-key
+query, so an endpoint can tell whether anything changed without touching the
+data. They are deliberately not cached: the default cache is per process, and
+a worker holding an old version would answer 304 to a client with stale data.
+
+Results that span every user (admin analytics) are versioned by a separate
+"all-users" row that moves once any write commits.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F
+
+from core.models import DataVersion
+
+GLOBAL_VERSION_KEY = "global"
+ALL_USERS_VERSION_KEY = "all-users"
+
+
+def user_version_key(user_id: int) -> str:
+	return f"user:{user_id}"
+
+
+def bump_data_versions(*, user_ids: Iterable[int] = (), include_global: bool = False) -> None:
+	keys = {user_version_key(user_id) for user_id in user_ids if user_id is not None}
+	if include_global:
+		keys.add(GLOBAL_VERSION_KEY)
+	if not keys:
+		return
+
+	_increment(keys)
+	transaction.on_commit(bump_all_users_version)
+
+
+def _increment(keys: set[str]) -> None:
+	versions = DataVersion.objects.filter(key__in=keys)
+	if versions.update(version=F("version") + 1) < len(keys):
+		# First write for some key: create the missing rows, then bump them all
+		# (existing rows moving twice is harmless, only "changed" matters).
+		DataVersion.objects.bulk_create([DataVersion(key=key) for key in keys], ignore_conflicts=True)
+		versions.update(version=F("version") + 1)
+
+
+def bump_all_users_version() -> None:
+	"""Move the counter behind results that span every user (call after commit).
+
+	Bumped outside the writing transaction so concurrent writers do not queue
+	on this one row for the length of their transactions.
+	"""
+	_increment({ALL_USERS_VERSION_KEY})
+
+
+def load_data_versions(*keys: str) -> tuple[int, ...]:
+	"""Committed values of `keys`, read from the database (one query, no cache)."""
+	versions = dict(DataVersion.objects.filter(key__in=keys).values_list("key", "version"))
+	return tuple(versions.get(key, 0) for key in keys)
+
+
+def get_data_versions(user_id: int) -> tuple[int, int]:
+	"""(user version, global version) as committed."""
+	return load_data_versions(user_version_key(user_id), GLOBAL_VERSION_KEY)
@@ -11,6 +11,7 @@ import mimetypes
 from budgets.models import Budget
 from categories.models import Category
 from core.permissions import IsUserOrAdminRole, IsAdminRole
+from core.reportcache import cache_report
 from expenses.models import Expense
 
 User = get_user_model()
@@ -47,24 +48,25 @@ def health(_request):
 
 @api_view(["GET"])
 @permission_classes([IsUserOrAdminRole, IsAdminRole])
+@cache_report("core-admin-dashboard")
 def admin_dashboard(request):
 	"""System-wide stats for admins"""
 	
 	# Total stats
 	total_expenses = Expense.objects.aggregate(
-		total=Sum("amount"),
+		total=Sum("amount_base"),
 		count=Count("id")
 	)
 	
 	# User stats
 	user_stats = User.objects.annotate(
 		expense_count=Count("expense"),
-		total_spent=Sum("expense__amount")
+		total_spent=Sum("expense__amount_base")
 	).values("id", "username", "expense_count", "total_spent").order_by("-total_spent")[:10]
 	
 	# Category stats
 	category_stats = Expense.objects.values("category__name").annotate(
-		total=Sum("amount"),
+		total=Sum("amount_base"),
 		count=Count("id")
 	).order_by("-total")[:10]
 	
@@ -84,12 +86,15 @@ def admin_dashboard(request):
 
 # Notification views
 from rest_framework import viewsets, status as http_status
+from django.db import transaction
 from rest_framework.decorators import action
 from core.models import Notification
 from core.serializers import NotificationSerializer, MarkNotificationsReadSerializer
+from core.fieldsets import SparseFieldsetMixin
+from sync.services import notification_changes, record_changes
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
 	"""Read-only viewset for user notifications"""
 	serializer_class = NotificationSerializer
 	permission_classes = [IsUserOrAdminRole]
@@ -120,7 +125,11 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
 		if notification_ids:
 			qs = qs.filter(id__in=notification_ids)
 		
-		updated = qs.update(is_read=True)
+		with transaction.atomic():
+			ids = list(qs.select_for_update().values_list("id", flat=True))
+			updated = Notification.objects.filter(id__in=ids).update(is_read=True)
+			# Queryset updates send no post_save; log the rows for mobile sync explicitly.
+			record_changes(notification_changes((pk, request.user.pk) for pk in ids))
 		return Response({"marked_read": updated})
 
 	@action(detail=True, methods=["post"])
@@ -1,10 +1,44 @@
 from django.contrib import admin
 
-from expenses.models import Expense
+from expenses.models import Expense, ExpenseArchive, ExpenseImport, FxRate, Merchant, ReceiptBlob
 
 
 @admin.register(Expense)
 class ExpenseAdmin(admin.ModelAdmin):
-	list_display = ("date", "amount", "currency", "category", "created_by", "created_at")
+	list_display = ("date", "amount", "currency", "amount_base", "category", "created_by", "created_at")
 	search_fields = ("description", "merchant", "notes")
 	list_filter = ("currency", "category")
+
+
+@admin.register(ExpenseImport)
+class ExpenseImportAdmin(admin.ModelAdmin):
+	list_display = ("filename", "created_by", "status", "total_rows", "imported_rows", "error_rows", "created_at")
+	list_filter = ("status",)
+	readonly_fields = ("created_at", "updated_at", "started_at", "finished_at")
+
+
+@admin.register(Merchant)
+class MerchantAdmin(admin.ModelAdmin):
+	list_display = ("name", "user", "use_count", "last_used", "category")
+	search_fields = ("name",)
+
+
+@admin.register(ReceiptBlob)
+class ReceiptBlobAdmin(admin.ModelAdmin):
+	list_display = ("sha256", "content_type", "size", "status", "created_at")
+	list_filter = ("status",)
+	readonly_fields = ("sha256", "file", "size", "content_type", "thumbnail", "preview", "created_at")
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+	list_display = ("currency", "date", "rate")
+	list_filter = ("currency",)
+	date_hierarchy = "date"
+
+
+@admin.register(ExpenseArchive)
+class ExpenseArchiveAdmin(admin.ModelAdmin):
+	list_display = ("created_by", "year", "row_count", "first_date", "last_date", "size", "updated_at")
+	raw_id_fields = ("created_by",)
+	readonly_fields = ("file", "row_count", "first_date", "last_date", "size", "sha256", "receipt_blobs")
@@ -0,0 +1,310 @@
+"""
+Cold archive tier for old expenses.
+
+`archive_expenses` moves expenses dated before a horizon (by default
+EXPENSE_ARCHIVE_AFTER_MONTHS ago) out of the expenses table into one gzipped
+JSON-lines blob per user and year, recorded in an `ExpenseArchive` manifest.
+The hot table and its indexes then only hold recent history.
+
+Rollups are left as they are, so reports and budgets keep counting archived
+months without reading the blobs (`rebuild_rollups` reads them, so a repair
+keeps them too). Moves are announced with `expenses_moved` instead, which
+the sync log and the merchant dictionary follow. The expense list
+(`?include_archived=1`) and the exports read the blobs for the date range
+they are asked for. Archived rows are read-only; `restore_archive` moves a
+year back.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from core.versions import bump_data_versions
+from expenses.models import Expense, ExpenseArchive
+from expenses.signals import send_expenses_moved, suppress_row_signals
+
+ARCHIVE_ROOT = "archives/expenses"
+
+# Stored per archived expense, in this order.
+ARCHIVE_FIELDS = (
+	"id",
+	"created_by_id",
+	"amount",
+	"currency",
+	"amount_base",
+	"date",
+	"description",
+	"category_id",
+	"payment_method",
+	"notes",
+	"merchant",
+	"receipt",
+	"receipt_blob_id",
+	"fingerprint",
+	"created_at",
+	"updated_at",
+)
+
+_DECIMAL_FIELDS = {"amount", "amount_base"}
+_DATETIME_FIELDS = {"created_at", "updated_at"}
+
+
+def _default(o):
+	if isinstance(o, Decimal):
+		return str(o)
+	if isinstance(o, (date, datetime)):
+		return o.isoformat()
+	return str(o)
+
+
+_encode = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _record(expense: Expense) -> dict:
+	record = {name: getattr(expense, name) for name in ARCHIVE_FIELDS}
+	record["receipt"] = expense.receipt.name or ""
+	return record
+
+
+def _parse(record: dict) -> dict:
+	"""A stored record with its values back in Python types."""
+	for name in _DECIMAL_FIELDS:
+		if record.get(name) is not None:
+			record[name] = Decimal(record[name])
+	record["date"] = date.fromisoformat(record["date"])
+	for name in _DATETIME_FIELDS:
+		if record.get(name):
+			record[name] = datetime.fromisoformat(record[name])
+	return record
+
+
+def read_archive(archive: ExpenseArchive) -> Iterator[dict]:
+	with archive.file.open("rb") as fileobj, gzip.open(fileobj, "rt", encoding="utf-8") as lines:
+		for line in lines:
+			if line.strip():
+				yield _parse(json.loads(line))
+
+
+def _write_blob(user_id: int, year: int, records: list[dict]) -> tuple[str, int, str]:
+	payload = gzip.compress("".join(_encode(record) + "\n" for record in records).encode("utf-8"), mtime=0)
+	digest = hashlib.sha256(payload).hexdigest()
+	name = default_storage.save(f"{ARCHIVE_ROOT}/{user_id}/{year}-{digest[:16]}.jsonl.gz", ContentFile(payload))
+	return name, len(payload), digest
+
+
+def default_horizon(today: date | None = None) -> date:
+	"""First day of the month EXPENSE_ARCHIVE_AFTER_MONTHS before `today`'s."""
+	today = today or timezone.localdate()
+	months = getattr(settings, "EXPENSE_ARCHIVE_AFTER_MONTHS", 24)
+	index = today.year * 12 + today.month - 1 - months
+	return date(index // 12, index % 12 + 1, 1)
+
+
+# ---- archiving ----
+
+
+def archive_user_year(*, user_id: int, year: int, before: date) -> int:
+	"""Move `user_id`'s expenses from `year` dated before `before` into that year's archive.
+
+	An existing archive for the year is rewritten with the new rows merged in.
+	Returns the number of expenses moved.
+	"""
+	new_name = None
+	try:
+		with transaction.atomic():
+			archive = ExpenseArchive.objects.select_for_update().filter(created_by_id=user_id, year=year).first()
+			expenses = list(
+				Expense.objects.select_for_update()
+				.defer("search_vector")
+				.filter(created_by_id=user_id, date__gte=date(year, 1, 1), date__lt=min(before, date(year + 1, 1, 1)))
+				.order_by("date", "id")
+			)
+			if not expenses:
+				return 0
+
+			records = list(read_archive(archive)) if archive else []
+			records.extend(_record(expense) for expense in expenses)
+			records.sort(key=lambda record: (record["date"], record["id"]))
+			new_name, size, digest = _write_blob(user_id, year, records)
+
+			old_name = archive.file.name if archive else None
+			if archive is None:
+				archive = ExpenseArchive(created_by_id=user_id, year=year)
+			archive.file.name = new_name
+			archive.row_count = len(records)
+			archive.first_date = records[0]["date"]
+			archive.last_date = records[-1]["date"]
+			archive.size = size
+			archive.sha256 = digest
+			archive.save()
+			archive.receipt_blobs.add(*{e.receipt_blob_id for e in expenses if e.receipt_blob_id})
+
+			# Rollups keep counting archived expenses, so `expenses_moved` rather
+			# than `expenses_changed`: synced clients get tombstones, rollups stay.
+			with suppress_row_signals():
+				Expense.objects.filter(pk__in=[expense.pk for expense in expenses]).delete()
+			send_expenses_moved(removed=expenses)
+			bump_data_versions(user_ids=[user_id])
+			if old_name:
+				transaction.on_commit(lambda: default_storage.delete(old_name))
+	except BaseException:
+		if new_name:
+			default_storage.delete(new_name)
+		raise
+	return len(expenses)
+
+
+def archive_expenses(*, before: date | None = None, user_ids: Iterable[int] | None = None) -> dict[tuple[int, int], int]:
+	"""Archive every expense dated before `before` (default: `default_horizon()`).
+
+	Returns the number of expenses moved per (user id, year).
+	"""
+	before = before or default_horizon()
+	targets = Expense.objects.filter(date__lt=before)
+	if user_ids is not None:
+		targets = targets.filter(created_by_id__in=list(user_ids))
+	targets = (
+		targets.order_by()
+		.annotate(year=ExtractYear("date"))
+		.values_list("created_by_id", "year")
+		.distinct()
+	)
+	moved = {}
+	for user_id, year in sorted(targets):
+		count = archive_user_year(user_id=user_id, year=year, before=before)
+		if count:
+			moved[(user_id, year)] = count
+	return moved
+
+
+def restore_archive(archive: ExpenseArchive) -> int:
+	"""Move an archived year back into the expenses table. Returns the number restored."""
+	with transaction.atomic():
+		archive = ExpenseArchive.objects.select_for_update().get(pk=archive.pk)
+		expenses = [Expense(**record) for record in read_archive(archive)]
+		# Rollups already include these rows; bulk_create sends no signals.
+		Expense.objects.bulk_create(expenses, batch_size=1000)
+		send_expenses_moved(added=expenses)
+		name = archive.file.name
+		archive.delete()
+		bump_data_versions(user_ids=[archive.created_by_id])
+		transaction.on_commit(lambda: default_storage.delete(name))
+	return len(expenses)
+
+
+# ---- reading ----
+
+
+def wants_archived(request) -> bool:
+	"""Whether the request asked for archived rows too (`?include_archived=1`)."""
+	return request.query_params.get("include_archived", "").lower() in ("1", "true", "yes")
+
+
+def archives_for(*, owner_ids: Iterable[int] | None, start: date | None = None, end: date | None = None):
+	"""Manifests that may hold rows in [start, end] (owner_ids=None means all users)."""
+	qs = ExpenseArchive.objects.order_by("created_by_id", "year")
+	if owner_ids is not None:
+		qs = qs.filter(created_by_id__in=list(owner_ids))
+	if start is not None:
+		qs = qs.filter(last_date__gte=start)
+	if end is not None:
+		qs = qs.filter(first_date__lte=end)
+	return qs
+
+
+def archived_records(*, owner_ids: Iterable[int] | None, start: date | None = None, end: date | None = None):
+	"""Archived expense records (dicts of ARCHIVE_FIELDS) dated within [start, end], per archive oldest first."""
+	for archive in archives_for(owner_ids=owner_ids, start=start, end=end):
+		for record in read_archive(archive):
+			if (start is None or record["date"] >= start) and (end is None or record["date"] <= end):
+				yield record
+
+
+@dataclass
+class ArchivedRowFilter:
+	"""The expense list filters, applied to archived records in Python."""
+	start: date | None = None
+	end: date | None = None
+	category_id: int | None = None
+	min_amount: Decimal | None = None
+	max_amount: Decimal | None = None
+	search: list[str] | None = None
+
+	def __call__(self, record: dict) -> bool:
+		if self.category_id is not None and record["category_id"] != self.category_id:
+			return False
+		if self.min_amount is not None and record["amount"] < self.min_amount:
+			return False
+		if self.max_amount is not None and record["amount"] > self.max_amount:
+			return False
+		if self.search:
+			text = " ".join((record["description"], record["merchant"], record["notes"])).lower()
+			return all(term in text for term in self.search)
+		return True
+
+
+def archived_expense_page(
+	*,
+	owner_ids: Iterable[int] | None,
+	row_filter: ArchivedRowFilter,
+	after: tuple[date, int] | None = None,
+	descending: bool = True,
+	limit: int,
+) -> list[Expense]:
+	"""Up to `limit` matching archived expenses past the keyset position `after` ((date, id)), in scan order.
+
+	Archives are visited nearest the position first and skipped whole by their
+	date range; reading stops once no further archive can hold a row that
+	makes the page.
+	"""
+	start, end = row_filter.start, row_filter.end
+	if after is not None:
+		if descending:
+			end = after[0] if end is None else min(end, after[0])
+		else:
+			start = after[0] if start is None else max(start, after[0])
+	archives = archives_for(owner_ids=owner_ids, start=start, end=end).order_by(
+		"-last_date" if descending else "first_date", "created_by_id"
+	)
+
+	def position(record):
+		return (record["date"], record["id"])
+
+	def wanted(record):
+		if (start is not None and record["date"] < start) or (end is not None and record["date"] > end):
+			return False
+		if after is not None and not (position(record) < after if descending else position(record) > after):
+			return False
+		return row_filter(record)
+
+	found: list[dict] = []
+	for archive in archives:
+		if len(found) >= limit:
+			last = found[-1]["date"]
+			if (archive.last_date < last) if descending else (archive.first_date > last):
+				break
+		found.extend(record for record in read_archive(archive) if wanted(record))
+		found.sort(key=position, reverse=descending)
+		del found[limit:]
+
+	users = get_user_model().objects.in_bulk({record["created_by_id"] for record in found})
+	expenses = []
+	for record in found:
+		expense = Expense(**record)
+		expense.created_by = users.get(record["created_by_id"])
+		expense._state.adding = False
+		expenses.append(expense)
+	return expenses
@@ -0,0 +1,83 @@
+"""
+Duplicate-expense detection.
+
+Every expense stores a `fingerprint` (see `expense_fingerprint`): a 64-bit
+hash of its normalized amount, date, merchant and description, indexed per
+user. Checking new expenses is one index probe for the whole batch, and
+history is scanned for clusters with a single grouped query.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, Min
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from expenses.models import Expense, expense_fingerprint
+
+
+class DuplicateMode:
+	FLAG = "flag"
+	REJECT = "reject"
+
+	choices = (FLAG, REJECT)
+
+
+class DuplicateExpense(APIException):
+	status_code = status.HTTP_409_CONFLICT
+	default_code = "duplicate_expense"
+
+	def __init__(self, duplicate_of: int):
+		super().__init__()
+		# Set directly so the id stays a number in the response.
+		self.detail = {"detail": "Possible duplicate of an existing expense.", "possible_duplicate_of": duplicate_of}
+
+
+def duplicate_mode(request) -> str:
+	"""`?on_duplicate=flag|reject`, else the EXPENSE_DUPLICATE_MODE setting."""
+	mode = request.query_params.get("on_duplicate") or getattr(settings, "EXPENSE_DUPLICATE_MODE", DuplicateMode.FLAG)
+	return mode if mode in DuplicateMode.choices else DuplicateMode.FLAG
+
+
+def fingerprint_of(data: dict) -> int:
+	return expense_fingerprint(
+		amount=data["amount"],
+		date=data["date"],
+		merchant=data.get("merchant", ""),
+		description=data.get("description", ""),
+	)
+
+
+def find_duplicates(*, owner_id: int, fingerprints: Iterable[int]) -> dict[int, int]:
+	"""Oldest existing expense id per fingerprint, for the fingerprints `owner_id` already has."""
+	fingerprints = set(fingerprints)
+	if not fingerprints:
+		return {}
+	rows = (
+		Expense.objects.filter(created_by_id=owner_id, fingerprint__in=fingerprints)
+		.order_by()
+		.values("fingerprint")
+		.annotate(first_id=Min("id"))
+	)
+	return {row["fingerprint"]: row["first_id"] for row in rows}
+
+
+def duplicate_clusters(*, user_ids: Iterable[int] | None = None, min_size: int = 2):
+	"""Groups of a user's expenses sharing a fingerprint, largest first.
+
+	Rows are dicts with `created_by_id`, `fingerprint`, `size` and `ids`
+	(oldest first); one grouped query over `idx_expense_user_fprint`.
+	"""
+	qs = Expense.objects.filter(fingerprint__isnull=False)
+	if user_ids is not None:
+		qs = qs.filter(created_by_id__in=list(user_ids))
+	return (
+		qs.order_by()
+		.values("created_by_id", "fingerprint")
+		.annotate(size=Count("id"), ids=ArrayAgg("id", ordering="id"))
+		.filter(size__gte=min_size)
+		.order_by("-size", "created_by_id")
+	)
@@ -0,0 +1,106 @@
+"""
+Exchange rates into the base currency (settings.BASE_CURRENCY).
+
+`FxRate` rows say how many units of the base currency one unit of a currency
+bought on a date; a date without its own row uses the latest earlier rate.
+Each process keeps every currency's rates in memory after the first lookup
+(refreshed after FX_RATE_CACHE_SECONDS), so converting on save or in a
+serializer costs no query.
+
+Expenses store the converted `amount_base` at write time and reports sum
+that column, so totals never mix currencies and never convert per row.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import IO
+
+from django.apps import apps
+from django.conf import settings
+from django.utils.dateparse import parse_date
+
+CENT = Decimal("0.01")
+
+_rates: dict[str, tuple[list[date], list[Decimal]]] = {}
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+class FxRateError(ValueError):
+	pass
+
+
+def base_currency() -> str:
+	return getattr(settings, "BASE_CURRENCY", "BDT").upper()
+
+
+def clear_rate_cache() -> None:
+	global _loaded_at
+	with _lock:
+		_rates.clear()
+		_loaded_at = time.monotonic()
+
+
+def _currency_rates(currency: str) -> tuple[list[date], list[Decimal]]:
+	global _loaded_at
+	with _lock:
+		if time.monotonic() - _loaded_at > getattr(settings, "FX_RATE_CACHE_SECONDS", 600):
+			_rates.clear()
+			_loaded_at = time.monotonic()
+		cached = _rates.get(currency)
+	if cached is not None:
+		return cached
+
+	FxRate = apps.get_model("expenses", "FxRate")
+	rows = list(FxRate.objects.filter(currency=currency).order_by("date").values_list("date", "rate"))
+	cached = ([day for day, _ in rows], [rate for _, rate in rows])
+	with _lock:
+		_rates[currency] = cached
+	return cached
+
+
+def rate_for(currency: str, day: date) -> Decimal | None:
+	"""Base-currency units per unit of `currency` on `day`, or None without a rate on or before it."""
+	currency = (currency or "").upper()
+	if currency == base_currency():
+		return Decimal("1")
+	dates, rates = _currency_rates(currency)
+	index = bisect_right(dates, day)
+	return rates[index - 1] if index else None
+
+
+def to_base(amount: Decimal | None, currency: str, day: date | None) -> Decimal | None:
+	"""`amount` in the base currency, rounded to cents; None when it cannot be converted."""
+	if amount is None or day is None:
+		return None
+	rate = rate_for(currency, day)
+	if rate is None:
+		return None
+	return (Decimal(amount) * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def read_rates_csv(fileobj: IO[bytes]) -> list[tuple[date, str, Decimal]]:
+	"""Parse a `date,currency,rate` CSV (with header). Raises FxRateError naming the bad line."""
+	reader = csv.DictReader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+	missing = {"date", "currency", "rate"} - set(reader.fieldnames or ())
+	if missing:
+		raise FxRateError(f"Missing column(s): {', '.join(sorted(missing))}")
+
+	rows = []
+	for record in reader:
+		day = parse_date((record["date"] or "").strip())
+		currency = (record["currency"] or "").strip().upper()
+		try:
+			rate = Decimal((record["rate"] or "").strip())
+		except InvalidOperation:
+			rate = None
+		if day is None or not currency or len(currency) > 8 or rate is None or rate <= 0:
+			raise FxRateError(f"Line {reader.line_num}: expected date (YYYY-MM-DD), currency and a positive rate")
+		rows.append((day, currency, rate))
+	return rows
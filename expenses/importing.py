@@ -0,0 +1,444 @@
+"""
+Bank-statement CSV import.
+
+The import is a chain of generators so a file of any size streams through in
+constant memory:
+
+    read_csv -> normalize -> batched -> dedupe -> categorize -> insert
+
+Only one batch of rows (IMPORT_BATCH_SIZE) is materialized at a time. Each
+batch is written with one bulk_create inside its own transaction and
+announced through `expenses_changed` so rollups and caches stay in step.
+
+Uploads through the API are only stored and queued as `pending` jobs; a
+worker (`import_expenses_csv --pending --loop`) runs them with
+`run_pending_imports`.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from categories.models import Category
+from expenses.duplicates import find_duplicates
+from expenses.fx import rate_for, to_base
+from expenses.models import Expense, ExpenseImport, ImportStatus, expense_fingerprint
+from expenses.signals import send_expenses_changed
+
+IMPORT_BATCH_SIZE = 2000
+MAX_STORED_ERRORS = 1000
+
+MAPPABLE_FIELDS = (
+	"date",
+	"amount",
+	"debit",
+	"credit",
+	"description",
+	"merchant",
+	"category",
+	"notes",
+	"payment_method",
+	"currency",
+)
+
+FALLBACK_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y", "%Y/%m/%d", "%d %b %Y", "%d-%b-%Y")
+
+# Amounts may carry currency symbols, a three-letter code and spacing; anything
+# else besides digits, separators, signs and parentheses makes the value invalid.
+_CURRENCY_CODE = re.compile(r"^[A-Z]{3}(?=[\s\d.,(+-])|(?<=[\s\d.,)-])[A-Z]{3}$")
+_AMOUNT = re.compile(r"[0-9.,()\-+]+")
+
+
+class ImportConfigError(ValueError):
+	pass
+
+
+@dataclass(frozen=True)
+class ImportOptions:
+	date_format: str | None = None
+	delimiter: str = ","
+	encoding: str = "utf-8-sig"
+	currency: str = "BDT"
+	# "positive" when debits are positive amounts, "negative" when they are negative
+	expense_sign: str = "positive"
+	decimal_comma: bool = False
+	dedupe: bool = True
+	default_category_id: int | None = None
+
+	@classmethod
+	def from_dict(cls, data: dict | None) -> "ImportOptions":
+		data = dict(data or {})
+		unknown = set(data) - set(cls.__dataclass_fields__)
+		if unknown:
+			raise ImportConfigError(f"Unknown options: {', '.join(sorted(unknown))}")
+		options = cls(**data)
+		if options.expense_sign not in ("positive", "negative"):
+			raise ImportConfigError("expense_sign must be 'positive' or 'negative'")
+		if len(options.delimiter) != 1:
+			raise ImportConfigError("delimiter must be a single character")
+		return options
+
+
+def validate_mapping(mapping: dict) -> dict:
+	if not isinstance(mapping, dict) or not mapping:
+		raise ImportConfigError("column_mapping must map expense fields to CSV headers")
+	unknown = set(mapping) - set(MAPPABLE_FIELDS)
+	if unknown:
+		raise ImportConfigError(f"Unknown mapped fields: {', '.join(sorted(unknown))}")
+	if "date" not in mapping:
+		raise ImportConfigError("column_mapping needs a 'date' column")
+	if "amount" not in mapping and "debit" not in mapping:
+		raise ImportConfigError("column_mapping needs an 'amount' or 'debit' column")
+	if "description" not in mapping and "merchant" not in mapping:
+		raise ImportConfigError("column_mapping needs a 'description' or 'merchant' column")
+	return mapping
+
+
+@dataclass
+class ImportRow:
+	line: int
+	date: date
+	amount: Decimal
+	description: str
+	merchant: str = ""
+	notes: str = ""
+	payment_method: str = ""
+	currency: str = ""
+	category_name: str = ""
+	category_id: int | None = None
+
+
+@dataclass
+class ImportStats:
+	total: int = 0
+	imported: int = 0
+	duplicates: int = 0
+	skipped: int = 0
+	errors: int = 0
+	error_details: list = field(default_factory=list)
+
+	def add_error(self, line: int, errors: dict) -> None:
+		self.errors += 1
+		if len(self.error_details) < MAX_STORED_ERRORS:
+			self.error_details.append({"line": line, "errors": errors})
+
+
+# ---- stages ----
+
+
+def read_csv(fileobj: IO[bytes], options: ImportOptions) -> Iterator[tuple[int, dict]]:
+	text = io.TextIOWrapper(fileobj, encoding=options.encoding, newline="")
+	reader = csv.DictReader(text, delimiter=options.delimiter)
+	for record in reader:
+		yield reader.line_num, record
+
+
+def parse_amount(raw: str, options: ImportOptions) -> Decimal | None:
+	raw = (raw or "").strip()
+	if not raw:
+		return None
+	cleaned = "".join(
+		ch for ch in _CURRENCY_CODE.sub("", raw) if not ch.isspace() and unicodedata.category(ch) != "Sc"
+	)
+	if not _AMOUNT.fullmatch(cleaned):
+		raise ValueError(f"Invalid amount '{raw}'")
+	negative = cleaned.startswith("(") and cleaned.endswith(")")
+	cleaned = cleaned.strip("()")
+	if cleaned.endswith("-"):
+		negative, cleaned = True, cleaned[:-1]
+	if options.decimal_comma:
+		cleaned = cleaned.replace(".", "").replace(",", ".")
+	else:
+		cleaned = cleaned.replace(",", "")
+	try:
+		value = Decimal(cleaned)
+	except InvalidOperation:
+		raise ValueError(f"Invalid amount '{raw}'")
+	return -value if negative else value
+
+
+def parse_day(raw: str, options: ImportOptions) -> date:
+	raw = (raw or "").strip()
+	formats = (options.date_format,) if options.date_format else FALLBACK_DATE_FORMATS
+	for fmt in formats:
+		try:
+			return datetime.strptime(raw, fmt).date()
+		except ValueError:
+			continue
+	raise ValueError(f"Invalid date '{raw}'")
+
+
+def _fits(value: Decimal, field_name: str) -> bool:
+	field = Expense._meta.get_field(field_name)
+	return abs(value) < Decimal(10) ** (field.max_digits - field.decimal_places)
+
+
+def _amount_error(amount: Decimal, currency: str, day: date) -> str | None:
+	"""Why `amount` cannot be stored (the model's precision and scale), if it cannot."""
+	places = Expense._meta.get_field("amount").decimal_places
+	if amount != amount.quantize(Decimal(1).scaleb(-places)):
+		return f"Must have at most {places} decimal places"
+	if not _fits(amount, "amount"):
+		return "Amount is too large"
+	if not _fits(to_base(abs(amount), currency, day), "amount_base"):
+		return "Amount is too large once converted to the base currency"
+	return None
+
+
+def normalize(
+	records: Iterable[tuple[int, dict]], mapping: dict, options: ImportOptions, stats: ImportStats
+) -> Iterator[ImportRow]:
+	def column(record, name):
+		header = mapping.get(name)
+		return (record.get(header) or "").strip() if header else ""
+
+	for line, record in records:
+		stats.total += 1
+		errors = {}
+
+		try:
+			day = parse_day(column(record, "date"), options)
+		except ValueError as exc:
+			errors["date"] = str(exc)
+
+		amount = None
+		try:
+			if "debit" in mapping:
+				amount = parse_amount(column(record, "debit"), options)
+				amount = abs(amount) if amount else None
+			else:
+				amount = parse_amount(column(record, "amount"), options)
+				if amount is not None and options.expense_sign == "negative":
+					amount = -amount
+		except ValueError as exc:
+			errors["amount"] = str(exc)
+
+		merchant = column(record, "merchant")[:120]
+		description = column(record, "description") or merchant
+		if not description:
+			errors["description"] = "Required"
+
+		currency = (column(record, "currency") or options.currency)[:8].upper()
+		if "date" not in errors and rate_for(currency, day) is None:
+			errors["currency"] = f"No exchange rate for {currency} on or before {day}"
+		elif amount and amount > 0 and "date" not in errors:
+			amount_error = _amount_error(amount, currency, day)
+			if amount_error:
+				errors["amount"] = amount_error
+
+		if errors:
+			stats.add_error(line, errors)
+			continue
+		if amount is None or amount <= 0:
+			# Credits / zero rows are not expenses.
+			stats.skipped += 1
+			continue
+
+		yield ImportRow(
+			line=line,
+			date=day,
+			amount=amount.quantize(Decimal("0.01")),
+			description=description,
+			merchant=merchant,
+			notes=column(record, "notes"),
+			payment_method=column(record, "payment_method")[:32],
+			currency=currency,
+			category_name=column(record, "category"),
+		)
+
+
+def batched(rows: Iterable[ImportRow], size: int = IMPORT_BATCH_SIZE) -> Iterator[list[ImportRow]]:
+	iterator = iter(rows)
+	while batch := list(islice(iterator, size)):
+		yield batch
+
+
+def _fingerprint(row: ImportRow) -> int:
+	return expense_fingerprint(amount=row.amount, date=row.date, merchant=row.merchant, description=row.description)
+
+
+def dedupe(batches: Iterable[list[ImportRow]], *, owner, stats: ImportStats) -> Iterator[list[ImportRow]]:
+	"""Drop rows whose fingerprint (amount, date, merchant, description) the user already had.
+
+	One indexed lookup per batch. Only expenses stored before the import
+	began count: identical lines within the file (two equal coffees on the
+	same day) are all imported, including when earlier batches already are.
+	"""
+	stored_up_to = None
+	for batch in batches:
+		if stored_up_to is None:
+			stored_up_to = Expense.objects.filter(created_by=owner).aggregate(last=Max("pk"))["last"] or 0
+		fingerprints = [_fingerprint(row) for row in batch]
+		existing = {
+			fingerprint
+			for fingerprint, first_id in find_duplicates(owner_id=owner.pk, fingerprints=fingerprints).items()
+			if first_id <= stored_up_to
+		}
+		kept = []
+		for row, fingerprint in zip(batch, fingerprints):
+			if fingerprint in existing:
+				stats.duplicates += 1
+				continue
+			kept.append(row)
+		if kept:
+			yield kept
+
+
+def categorize(
+	batches: Iterable[list[ImportRow]], *, owner, options: ImportOptions
+) -> Iterator[list[ImportRow]]:
+	"""Resolve categories by name, else by the category last used for the merchant."""
+	by_name: dict[str, int] = {}
+	# System categories first so the user's own same-named category wins.
+	for name, pk, is_system in (
+		Category.objects.filter(Q(is_system=True) | Q(created_by=owner))
+		.order_by("-is_system")
+		.values_list("name", "id", "is_system")
+	):
+		by_name[name.lower()] = pk
+
+	by_merchant: dict[str, int] | None = None
+
+	for batch in batches:
+		for row in batch:
+			if row.category_name:
+				row.category_id = by_name.get(row.category_name.lower())
+			if row.category_id is None and row.merchant:
+				if by_merchant is None:
+					by_merchant = _merchant_categories(owner)
+				row.category_id = by_merchant.get(row.merchant.lower())
+			if row.category_id is None:
+				row.category_id = options.default_category_id
+		yield batch
+
+
+def _merchant_categories(owner) -> dict[str, int]:
+	latest: dict[str, tuple[date, int]] = {}
+	rows = (
+		Expense.objects.filter(created_by=owner, category__isnull=False)
+		.exclude(merchant="")
+		.values("merchant", "category_id")
+		.annotate(last_used=Max("date"))
+	)
+	for row in rows:
+		key = row["merchant"].lower()
+		if key not in latest or row["last_used"] > latest[key][0]:
+			latest[key] = (row["last_used"], row["category_id"])
+	return {merchant: category_id for merchant, (_, category_id) in latest.items()}
+
+
+def insert(batches: Iterable[list[ImportRow]], *, owner, stats: ImportStats) -> Iterator[int]:
+	for batch in batches:
+		expenses = [
+			Expense(
+				created_by=owner,
+				amount=row.amount,
+				currency=row.currency,
+				date=row.date,
+				description=row.description,
+				category_id=row.category_id,
+				payment_method=row.payment_method,
+				notes=row.notes,
+				merchant=row.merchant,
+			)
+			for row in batch
+		]
+		for expense in expenses:
+			expense.refresh_fingerprint()
+			expense.refresh_amount_base()
+		with transaction.atomic():
+			Expense.objects.bulk_create(expenses, batch_size=IMPORT_BATCH_SIZE)
+			send_expenses_changed(added=expenses)
+		stats.imported += len(expenses)
+		yield len(expenses)
+
+
+# ---- driver ----
+
+
+def _record_progress(job: ExpenseImport, stats: ImportStats, **extra) -> None:
+	job.total_rows = stats.total
+	job.imported_rows = stats.imported
+	job.duplicate_rows = stats.duplicates
+	job.skipped_rows = stats.skipped
+	job.error_rows = stats.errors
+	job.errors = stats.error_details
+	for name, value in extra.items():
+		setattr(job, name, value)
+	job.save()
+
+
+def run_import(job: ExpenseImport, fileobj: IO[bytes]) -> ExpenseImport:
+	"""Stream `fileobj` through the pipeline, recording progress on `job` after each batch."""
+	owner = job.created_by
+	stats = ImportStats()
+	options = ImportOptions.from_dict(job.options)
+	mapping = validate_mapping(job.column_mapping)
+
+	_record_progress(job, stats, status=ImportStatus.RUNNING, started_at=timezone.now())
+	try:
+		rows = normalize(read_csv(fileobj, options), mapping, options, stats)
+		batches = batched(rows)
+		if options.dedupe:
+			batches = dedupe(batches, owner=owner, stats=stats)
+		batches = categorize(batches, owner=owner, options=options)
+		for _ in insert(batches, owner=owner, stats=stats):
+			_record_progress(job, stats)
+	except (UnicodeDecodeError, csv.Error) as exc:
+		stats.add_error(0, {"file": str(exc)})
+		_record_progress(job, stats, status=ImportStatus.FAILED, finished_at=timezone.now())
+		return job
+	except Exception as exc:
+		# Batches before the failure stay imported; the job must not be left RUNNING.
+		stats.add_error(0, {"import": f"{type(exc).__name__}: {exc}"})
+		_record_progress(job, stats, status=ImportStatus.FAILED, finished_at=timezone.now())
+		raise
+
+	_record_progress(job, stats, status=ImportStatus.COMPLETED, finished_at=timezone.now())
+	return job
+
+
+def run_pending_imports(*, limit: int = 1) -> int:
+	"""Run up to `limit` queued uploads, oldest first. Returns how many were run.
+
+	Jobs are claimed with SKIP LOCKED and marked running before the lock is
+	released, so several workers can run at once. The stored file is deleted
+	once its job has finished.
+	"""
+	with transaction.atomic():
+		jobs = list(
+			ExpenseImport.objects.select_for_update(skip_locked=True)
+			.filter(status=ImportStatus.PENDING)
+			.select_related("created_by")
+			.order_by("created_at")[:limit]
+		)
+		for job in jobs:
+			_record_progress(job, ImportStats(), status=ImportStatus.RUNNING, started_at=timezone.now())
+
+	for job in jobs:
+		if not job.file:
+			stats = ImportStats()
+			stats.add_error(0, {"file": "The uploaded file is missing"})
+			_record_progress(job, stats, status=ImportStatus.FAILED, finished_at=timezone.now())
+			continue
+		try:
+			with job.file.open("rb") as fileobj:
+				run_import(job, fileobj)
+		except Exception:
+			# run_import has recorded the failure on the job; carry on with the next.
+			pass
+		finally:
+			job.file.delete(save=False)
+			job.save(update_fields=["file"])
+	return len(jobs)
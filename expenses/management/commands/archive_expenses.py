@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from expenses.archive import archive_expenses, default_horizon, restore_archive
+from expenses.models import ExpenseArchive
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Move expenses older than the archive horizon into per-user, per-year compressed archives"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Archive expenses dated before this day (YYYY-MM-DD); default EXPENSE_ARCHIVE_AFTER_MONTHS ago",
+        )
+        parser.add_argument("--user", help="Only this username")
+        parser.add_argument(
+            "--restore",
+            type=int,
+            metavar="YEAR",
+            help="Move this year's archived expenses back into the live table (needs --user)",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"User '{options['user']}' not found")
+
+        if options["restore"] is not None:
+            if user is None:
+                raise CommandError("--restore needs --user")
+            archive = ExpenseArchive.objects.filter(created_by=user, year=options["restore"]).first()
+            if archive is None:
+                raise CommandError(f"No {options['restore']} archive for '{user.username}'")
+            restored = restore_archive(archive)
+            self.stdout.write(self.style.SUCCESS(f"Restored {restored} expenses"))
+            return
+
+        before = default_horizon()
+        if options["before"]:
+            before = parse_date(options["before"])
+            if before is None:
+                raise CommandError("--before must be YYYY-MM-DD")
+
+        moved = archive_expenses(before=before, user_ids=[user.pk] if user else None)
+        for (user_id, year), count in moved.items():
+            self.stdout.write(f"user {user_id} {year}: archived {count} expenses")
+        self.stdout.write(
+            self.style.SUCCESS(f"Archived {sum(moved.values())} expenses dated before {before.isoformat()}")
+        )
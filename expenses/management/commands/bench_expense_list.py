@@ -0,0 +1,149 @@
+"""
+Benchmark the `.values_list()` list path (core/fastlist.py) against rendering
+the same rows through the serializers, for the user and admin expense lists.
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from admin_panel.serializers import AdminExpenseSerializer
+from categories.models import Category
+from core.fastlist import RowConverter
+from expenses.models import Expense
+from expenses.serializers import ExpenseSerializer
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare serializer vs values_list-based rendering of expense list pages (time, output)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to benchmark against (uses existing data)")
+        parser.add_argument(
+            "--seed-expenses",
+            type=int,
+            default=0,
+            help="Create a throwaway user with this many expenses; everything is rolled back afterwards",
+        )
+        parser.add_argument("--rows", type=int, default=10000, help="Rows per rendered page")
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        if not options["user"] and not options["seed_expenses"]:
+            raise CommandError("Pass --user or --seed-expenses")
+
+        try:
+            with transaction.atomic():
+                if options["seed_expenses"]:
+                    owner = self._seed(options["seed_expenses"])
+                else:
+                    owner = User.objects.filter(username=options["user"]).first()
+                    if owner is None:
+                        raise CommandError(f"User '{options['user']}' not found")
+                self._run(owner, options["rows"], options["iterations"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, count: int):
+        owner = User.objects.create(username=f"bench-list-{random.randint(0, 10**9)}", is_active=False)
+        categories = list(Category.objects.filter(is_system=True)[:10]) or [
+            Category.objects.create(name=f"bench-{i}", created_by=owner) for i in range(5)
+        ]
+        today = date.today()
+        rng = random.Random(42)
+        batch = [
+            Expense(
+                created_by=owner,
+                amount=Decimal(rng.randint(100, 500000)) / 100,
+                date=today - timedelta(days=rng.randint(0, 730)),
+                description=f"bench expense {i}",
+                # Leave some uncategorized; the admin serializer omits `category_name` for those.
+                category=rng.choice(categories) if rng.random() < 0.8 else None,
+                merchant=rng.choice(["", "Coffee Shop", "Grocer", "Fuel"]),
+                notes="" if i % 3 else "note",
+                receipt="" if i % 10 else f"receipts/bench/{i}.jpg",
+            )
+            for i in range(count)
+        ]
+        Expense.objects.bulk_create(batch, batch_size=5000)
+        self.stdout.write(f"Seeded {count} expenses")
+        return owner
+
+    def _measure(self, label, fetch, build, render, iterations):
+        """Best-of timings for fetching the rows, building the data and rendering it."""
+        best = {"fetch": None, "build": None, "render": None}
+        output = None
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = fetch()
+            fetched = time.perf_counter()
+            data = build(rows)
+            built = time.perf_counter()
+            output = render(data)
+            rendered = time.perf_counter()
+            for stage, seconds in (("fetch", fetched - start), ("build", built - fetched), ("render", rendered - built)):
+                best[stage] = seconds if best[stage] is None else min(best[stage], seconds)
+
+        best = {stage: seconds * 1000 for stage, seconds in best.items()}
+        best["total"] = sum(best.values())
+        self.stdout.write(
+            f"  {label:<11} fetch {best['fetch']:7.1f} ms  build {best['build']:7.1f} ms  "
+            f"render {best['render']:6.1f} ms  total {best['total']:7.1f} ms"
+        )
+        return output, best
+
+    def _run(self, owner, rows, iterations):
+        request = APIRequestFactory().get("/api/expenses/")
+        context = {"request": request}
+        renderer = JSONRenderer()
+        base = Expense.objects.filter(created_by=owner).order_by("-date", "-id")
+        cases = (
+            ("expenses", ExpenseSerializer, base.select_related("category", "created_by").defer("search_vector")),
+            ("admin", AdminExpenseSerializer, base.select_related("created_by", "category")),
+        )
+
+        for label, serializer_class, queryset in cases:
+            page = queryset[:rows]
+            converter = RowConverter.compile(serializer_class(context=context))
+            if converter is None:
+                raise CommandError(f"{serializer_class.__name__} does not compile to a row converter")
+            self.stdout.write(f"{label} ({page.count()} rows)")
+
+            slow, slow_ms = self._measure(
+                "serializer",
+                lambda: list(page.all()),
+                lambda instances: serializer_class(instances, many=True, context=context).data,
+                renderer.render,
+                iterations,
+            )
+            fast, fast_ms = self._measure(
+                "values_list",
+                lambda: list(converter.values(page)),
+                converter.convert_many,
+                renderer.render,
+                iterations,
+            )
+
+            if slow != fast:
+                self.stdout.write(self.style.ERROR("  Output differs"))
+            else:
+                self.stdout.write(f"  identical output ({len(fast) / 1024:.0f} KiB)")
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  Speedup: {(slow_ms['fetch'] + slow_ms['build']) / (fast_ms['fetch'] + fast_ms['build']):.1f}x "
+                    f"rows to data, {slow_ms['total'] / fast_ms['total']:.1f}x including rendering"
+                )
+            )
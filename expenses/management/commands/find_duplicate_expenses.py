@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.duplicates import duplicate_clusters
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "List clusters of expenses sharing a duplicate fingerprint (amount, date, merchant, description)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only scan this username")
+        parser.add_argument("--min-size", type=int, default=2, help="Smallest cluster to report")
+        parser.add_argument("--limit", type=int, default=100, help="Clusters to print (0 for all)")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["user"]:
+            owner = User.objects.filter(username=options["user"]).first()
+            if owner is None:
+                raise CommandError(f"User '{options['user']}' not found")
+            user_ids = [owner.pk]
+
+        clusters = duplicate_clusters(user_ids=user_ids, min_size=max(options["min_size"], 2))
+        if options["limit"]:
+            clusters = clusters[: options["limit"]]
+
+        count = extra = 0
+        for cluster in clusters:
+            count += 1
+            extra += cluster["size"] - 1
+            ids = ", ".join(map(str, cluster["ids"]))
+            self.stdout.write(f"user {cluster['created_by_id']}: {cluster['size']} expenses [{ids}]")
+        self.stdout.write(self.style.SUCCESS(f"{count} clusters, {extra} possible duplicates"))
@@ -0,0 +1,74 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.importing import ImportConfigError, ImportOptions, run_import, run_pending_imports, validate_mapping
+from expenses.models import ExpenseImport
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a bank-statement CSV for a user through the streaming import pipeline, "
+        "or run uploads queued through the API with --pending (as a worker with --loop)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", help="CSV file to import")
+        parser.add_argument("--user", help="Username that will own the expenses")
+        parser.add_argument(
+            "--mapping",
+            help='JSON object of expense field -> CSV header, e.g. \'{"date": "Txn Date", "debit": "Withdrawal", "description": "Narration"}\'',
+        )
+        parser.add_argument("--options", default="{}", help="JSON import options (date_format, delimiter, ...)")
+        parser.add_argument("--pending", action="store_true", help="Run queued uploads instead of a file")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new uploads (--pending)")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when idle (--loop)")
+
+    def handle(self, *args, **options):
+        if options["pending"]:
+            return self._run_pending(options)
+        if not options["path"] or not options["user"] or not options["mapping"]:
+            raise CommandError("Give a CSV path with --user and --mapping, or --pending")
+
+        owner = User.objects.filter(username=options["user"]).first()
+        if owner is None:
+            raise CommandError(f"User '{options['user']}' not found")
+
+        try:
+            mapping = validate_mapping(json.loads(options["mapping"]))
+            import_options = json.loads(options["options"])
+            ImportOptions.from_dict(import_options)
+        except (ValueError, ImportConfigError, TypeError) as exc:
+            raise CommandError(str(exc))
+
+        job = ExpenseImport.objects.create(
+            created_by=owner,
+            filename=options["path"][-255:],
+            column_mapping=mapping,
+            options=import_options,
+        )
+        with open(options["path"], "rb") as fileobj:
+            run_import(job, fileobj)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Import #{job.pk} {job.status}: {job.imported_rows} imported, {job.duplicate_rows} duplicates, "
+                f"{job.skipped_rows} skipped, {job.error_rows} errors (of {job.total_rows} rows)"
+            )
+        )
+
+    def _run_pending(self, options):
+        while True:
+            ran = 0
+            while handled := run_pending_imports():
+                ran += handled
+            if ran:
+                self.stdout.write(f"Ran {ran} queued imports")
+            if not options["loop"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS("Done"))
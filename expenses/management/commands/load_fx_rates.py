@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.fx import FxRateError, base_currency, clear_rate_cache, read_rates_csv
+from expenses.services import refresh_base_amounts, store_fx_rates
+
+
+class Command(BaseCommand):
+    help = "Load exchange rates from a date,currency,rate CSV and update the affected base-currency amounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV with a header row: date,currency,rate (base-currency units per unit)")
+        parser.add_argument(
+            "--no-refresh",
+            action="store_true",
+            help="Only store the rates; leave existing expenses' amount_base alone",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as fileobj:
+                rows = read_rates_csv(fileobj)
+        except (OSError, FxRateError) as exc:
+            raise CommandError(str(exc))
+
+        base = base_currency()
+        rows = [row for row in rows if row[1] != base]
+        written = store_fx_rates(rows)
+        self.stdout.write(f"Stored {written} rates (base currency {base})")
+        if options["no_refresh"] or not rows:
+            return
+
+        clear_rate_cache()
+        since = {}
+        for day, currency, _ in rows:
+            since[currency] = min(day, since.get(currency, day))
+        changed = 0
+        for currency, first_day in sorted(since.items()):
+            changed += refresh_base_amounts(currencies=[currency], since=first_day)
+        self.stdout.write(self.style.SUCCESS(f"Updated the base amount of {changed} expenses"))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from expenses.archive import archive_expenses
+from expenses.partitioning import (
+    PartitioningError,
+    convert_to_partitioned,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = "Manage monthly partitions of the expenses table: convert once, then create ahead / detach old months"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert",
+            action="store_true",
+            help="Rebuild the (unpartitioned) expenses table as partitioned by month; locks it while copying",
+        )
+        parser.add_argument("--months-ahead", type=int, default=3, help="Future months to keep partitions for")
+        parser.add_argument(
+            "--detach-before",
+            help=(
+                "Archive the expenses of months before this date (YYYY-MM-DD), then detach their now empty "
+                "partitions; they stay as standalone tables"
+            ),
+        )
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+        parser.add_argument("--list", action="store_true", help="Print the current partitions")
+
+    def handle(self, *args, **options):
+        before = None
+        if options["detach_before"]:
+            before = parse_date(options["detach_before"])
+            if before is None:
+                raise CommandError("--detach-before must be YYYY-MM-DD")
+            before = month_start(before)
+        if options["drop"] and before is None:
+            raise CommandError("--drop needs --detach-before")
+
+        try:
+            if options["convert"]:
+                created = convert_to_partitioned(months_ahead=options["months_ahead"])
+                self.stdout.write(f"Converted the expenses table into {created} partitions")
+            elif not is_partitioned():
+                raise CommandError("The expenses table is not partitioned; run with --convert first")
+
+            created = ensure_partitions(months_ahead=options["months_ahead"])
+            if created:
+                self.stdout.write(f"Created partitions: {', '.join(created)}")
+
+            if before is not None:
+                moved = archive_expenses(before=before)
+                self.stdout.write(f"Archived {sum(moved.values())} expenses dated before {before}")
+                detached = detach_partitions(before=before, drop=options["drop"])
+                verb = "Dropped" if options["drop"] else "Detached"
+                self.stdout.write(f"{verb} {len(detached)} partitions{': ' + ', '.join(detached) if detached else ''}")
+        except PartitioningError as exc:
+            raise CommandError(str(exc))
+
+        if options["list"]:
+            for partition in list_partitions():
+                bounds = f"{partition.start} .. {partition.end}" if partition.start else "default"
+                self.stdout.write(f"  {partition.name}  {bounds}")
+        self.stdout.write(self.style.SUCCESS("Done"))
@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from expenses.receipts import (
+    adopt_legacy_receipts,
+    imaging_available,
+    process_pending_receipts,
+    prune_orphan_receipts,
+)
+
+
+class Command(BaseCommand):
+    help = "Render receipt thumbnails/previews for pending blobs (run once, or as a worker with --loop)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=50, help="Blobs claimed per transaction")
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new uploads")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Seconds between polls when idle (--loop)")
+        parser.add_argument(
+            "--adopt-legacy",
+            action="store_true",
+            help="First move receipts uploaded before content-addressed storage into it",
+        )
+        parser.add_argument(
+            "--prune-orphans",
+            action="store_true",
+            help="Also delete blobs (and files) no expense has used for --orphan-days",
+        )
+        parser.add_argument("--orphan-days", type=int, default=1)
+
+    def handle(self, *args, **options):
+        if not imaging_available():
+            raise CommandError("Pillow is required to render receipt images (pip install Pillow)")
+
+        if options["adopt_legacy"]:
+            moved = adopt_legacy_receipts()
+            self.stdout.write(f"Moved {moved} legacy receipts into content-addressed storage")
+
+        while True:
+            processed = 0
+            while handled := process_pending_receipts(limit=options["batch"]):
+                processed += handled
+            if processed:
+                self.stdout.write(f"Rendered {processed} receipts")
+
+            if options["prune_orphans"]:
+                deleted = prune_orphan_receipts(older_than=timedelta(days=options["orphan_days"]))
+                if deleted:
+                    self.stdout.write(f"Deleted {deleted} unused receipt blobs")
+
+            if not options["loop"]:
+                break
+            time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS("Done"))
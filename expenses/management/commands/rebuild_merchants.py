@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from expenses.merchants import rebuild_merchants
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user merchant dictionary from raw expenses (backfill or repair)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild merchants for this user id (repeatable). Defaults to all users.",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_merchants(user_ids=options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} merchant rows"))
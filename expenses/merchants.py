@@ -0,0 +1,191 @@
+"""
+Per-user merchant dictionary backing merchant autocomplete.
+
+`Merchant` rows are folded from `expenses_changed` the same way rollups are:
+net deltas per (user, key), applied with a fixed number of queries.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+
+from expenses.models import Expense, Merchant
+
+MerchantKey = tuple[int, str]
+
+SUGGESTION_LIMIT = 10
+MAX_SUGGESTION_LIMIT = 50
+
+
+def normalize_merchant(name: str) -> str:
+	return " ".join((name or "").lower().split())[:120]
+
+
+class _Delta:
+	__slots__ = ("count", "last_used", "name", "category_id")
+
+	def __init__(self):
+		self.count = 0
+		self.last_used: date | None = None
+		self.name = ""
+		self.category_id = None
+
+	def use(self, expense: Expense) -> None:
+		self.count += 1
+		if self.last_used is None or expense.date >= self.last_used:
+			self.last_used = expense.date
+			self.name = " ".join(expense.merchant.split())
+			self.category_id = expense.category_id
+
+
+def compute_merchant_deltas(
+	*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()
+) -> dict[MerchantKey, _Delta]:
+	deltas: dict[MerchantKey, _Delta] = {}
+	for expense in removed:
+		key = normalize_merchant(expense.merchant)
+		if key:
+			deltas.setdefault((expense.created_by_id, key), _Delta()).count -= 1
+	for expense in added:
+		key = normalize_merchant(expense.merchant)
+		if key:
+			deltas.setdefault((expense.created_by_id, key), _Delta()).use(expense)
+	return {key: delta for key, delta in deltas.items() if delta.count or delta.last_used}
+
+
+@transaction.atomic
+def apply_merchant_deltas(deltas: dict[MerchantKey, _Delta]) -> None:
+	if not deltas:
+		return
+
+	existing = {
+		(row.user_id, row.key): row
+		for row in Merchant.objects.select_for_update().filter(
+			user_id__in={user_id for user_id, _ in deltas}, key__in={key for _, key in deltas}
+		)
+		if (row.user_id, row.key) in deltas
+	}
+
+	to_update, to_delete, to_create = [], [], []
+	for (user_id, key), delta in deltas.items():
+		row = existing.get((user_id, key))
+		if row is None:
+			if delta.count > 0 and delta.last_used:
+				to_create.append(
+					Merchant(
+						user_id=user_id,
+						key=key,
+						name=delta.name,
+						use_count=delta.count,
+						last_used=delta.last_used,
+						category_id=delta.category_id,
+					)
+				)
+			continue
+		row.use_count += delta.count
+		if delta.last_used and delta.last_used >= row.last_used:
+			row.last_used = delta.last_used
+			row.name = delta.name
+			row.category_id = delta.category_id
+		if row.use_count <= 0:
+			to_delete.append(row.pk)
+		else:
+			to_update.append(row)
+
+	if to_update:
+		Merchant.objects.bulk_update(to_update, ["use_count", "last_used", "name", "category"])
+	if to_delete:
+		Merchant.objects.filter(pk__in=to_delete).delete()
+	if to_create:
+		try:
+			with transaction.atomic():
+				Merchant.objects.bulk_create(to_create)
+		except IntegrityError:
+			# A concurrent writer created some of the keys first; fold into them one by one.
+			for row in to_create:
+				_upsert_row(row)
+
+
+def _upsert_row(row: Merchant) -> None:
+	current = Merchant.objects.select_for_update().filter(user_id=row.user_id, key=row.key).first()
+	if current is None:
+		row.save()
+		return
+	current.use_count += row.use_count
+	if row.last_used >= current.last_used:
+		current.last_used, current.name, current.category_id = row.last_used, row.name, row.category_id
+	current.save()
+
+
+def apply_merchant_changes(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> None:
+	apply_merchant_deltas(compute_merchant_deltas(removed=removed, added=added))
+
+
+@transaction.atomic
+def rebuild_merchants(*, user_ids: Iterable[int] | None = None) -> int:
+	"""Recompute the merchant dictionary from raw expenses (backfill / repair). Returns rows written."""
+	merchants = Merchant.objects.all()
+	expenses = Expense.objects.exclude(merchant="")
+	if user_ids is not None:
+		user_ids = list(user_ids)
+		merchants = merchants.filter(user_id__in=user_ids)
+		expenses = expenses.filter(created_by_id__in=user_ids)
+
+	merchants.delete()
+
+	# Grouped by exact spelling and category; folded per normalized key below.
+	grouped = (
+		expenses.order_by()
+		.values("created_by_id", "merchant", "category_id")
+		.annotate(count=Count("id"), last_used=Max("date"))
+	)
+	rows: dict[MerchantKey, Merchant] = {}
+	for group in grouped.iterator(chunk_size=5000):
+		key = normalize_merchant(group["merchant"])
+		if not key:
+			continue
+		row = rows.get((group["created_by_id"], key))
+		if row is None:
+			rows[(group["created_by_id"], key)] = Merchant(
+				user_id=group["created_by_id"],
+				key=key,
+				name=" ".join(group["merchant"].split()),
+				use_count=group["count"],
+				last_used=group["last_used"],
+				category_id=group["category_id"],
+			)
+			continue
+		row.use_count += group["count"]
+		if group["last_used"] > row.last_used:
+			row.last_used = group["last_used"]
+			row.name = " ".join(group["merchant"].split())
+			row.category_id = group["category_id"]
+
+	Merchant.objects.bulk_create(rows.values(), batch_size=5000)
+	return len(rows)
+
+
+def suggest_merchants(*, owner, query: str = "", limit: int = SUGGESTION_LIMIT):
+	"""The owner's merchants matching `query`, most used (then most recent) first.
+
+	Prefix matches rank ahead of matches elsewhere in the name; an empty query
+	returns the overall favourites.
+	"""
+	limit = max(1, min(limit, MAX_SUGGESTION_LIMIT))
+	key = normalize_merchant(query)
+	qs = Merchant.objects.filter(user=owner)
+	if not key:
+		return list(qs.order_by("-use_count", "-last_used", "key")[:limit])
+
+	prefixed = list(qs.filter(key__startswith=key).order_by("-use_count", "-last_used", "key")[:limit])
+	if len(prefixed) == limit:
+		return prefixed
+	elsewhere = (
+		qs.filter(key__contains=key)
+		.exclude(key__startswith=key)
+		.order_by("-use_count", "-last_used", "key")[: limit - len(prefixed)]
+	)
+	return prefixed + list(elsewhere)
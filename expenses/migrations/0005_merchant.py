@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:58
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def backfill_merchants(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    Merchant = apps.get_model("expenses", "Merchant")
+
+    grouped = (
+        Expense.objects.exclude(merchant="")
+        .order_by()
+        .values("created_by_id", "merchant", "category_id")
+        .annotate(count=Count("id"), last_used=Max("date"))
+    )
+    rows = {}
+    for group in grouped.iterator(chunk_size=5000):
+        name = " ".join(group["merchant"].split())
+        key = name.lower()[:120]
+        if not key:
+            continue
+        row = rows.get((group["created_by_id"], key))
+        if row is None:
+            rows[(group["created_by_id"], key)] = Merchant(
+                user_id=group["created_by_id"],
+                key=key,
+                name=name,
+                use_count=group["count"],
+                last_used=group["last_used"],
+                category_id=group["category_id"],
+            )
+        else:
+            row.use_count += group["count"]
+            if group["last_used"] > row.last_used:
+                row.last_used, row.name, row.category_id = group["last_used"], name, group["category_id"]
+    Merchant.objects.bulk_create(rows.values(), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_remove_category_uniq_category_name_per_user_and_more'),
+        ('expenses', '0004_expense_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Merchant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Lowercased, whitespace-collapsed name', max_length=120)),
+                ('name', models.CharField(help_text='Spelling on the most recent expense', max_length=120)),
+                ('use_count', models.PositiveIntegerField(default=0)),
+                ('last_used', models.DateField()),
+                ('category', models.ForeignKey(blank=True, help_text='Category of the most recent expense', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='categories.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='merchants', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-use_count', '-last_used'],
+                'indexes': [models.Index(models.F('user'), django.contrib.postgres.indexes.OpClass('key', name='varchar_pattern_ops'), name='idx_merchant_user_key_prefix')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'key'), name='uniq_merchant_user_key')],
+            },
+        ),
+        migrations.RunPython(backfill_merchants, migrations.RunPython.noop),
+    ]
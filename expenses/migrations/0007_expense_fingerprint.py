@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:17
+
+import hashlib
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _fingerprint(expense):
+    # Frozen copy of expenses.models.expense_fingerprint.
+    key = "|".join(
+        (
+            str(expense.amount.quantize(Decimal("0.01"))),
+            expense.date.isoformat(),
+            " ".join((expense.merchant or "").lower().split()),
+            " ".join((expense.description or "").lower().split()),
+        )
+    )
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    batch = []
+    for expense in Expense.objects.only("id", "amount", "date", "merchant", "description").iterator(chunk_size=5000):
+        expense.fingerprint = _fingerprint(expense)
+        batch.append(expense)
+        if len(batch) >= 5000:
+            Expense.objects.bulk_update(batch, ["fingerprint"])
+            batch = []
+    if batch:
+        Expense.objects.bulk_update(batch, ["fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0002_remove_category_uniq_category_name_per_user_and_more'),
+        ('expenses', '0006_receiptblob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='fingerprint',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['created_by', 'fingerprint'], name='idx_expense_user_fprint'),
+        ),
+    ]
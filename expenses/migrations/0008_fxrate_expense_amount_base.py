@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:27
+
+import csv
+from bisect import bisect_right
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def read_bootstrap_rates(path):
+    # A frozen copy of the date,currency,rate format `load_fx_rates` reads, so
+    # later changes to expenses.fx cannot alter this migration.
+    rows = []
+    with open(path, encoding="utf-8-sig", newline="") as fileobj:
+        reader = csv.DictReader(fileobj)
+        for record in reader:
+            try:
+                day = date.fromisoformat((record.get("date") or "").strip())
+                currency = (record.get("currency") or "").strip().upper()
+                rate = Decimal((record.get("rate") or "").strip())
+            except (ValueError, InvalidOperation):
+                raise ValueError(f"{path} line {reader.line_num}: expected date (YYYY-MM-DD), currency and rate")
+            if not currency or len(currency) > 8 or rate <= 0:
+                raise ValueError(f"{path} line {reader.line_num}: expected a currency and a positive rate")
+            rows.append((day, currency, rate))
+    return rows
+
+
+def backfill_base_amounts(apps, schema_editor):
+    # Expenses already in the base currency convert 1:1. Others convert at the
+    # rates in FX_BOOTSTRAP_RATES (a CSV, since the FxRate table is new) when
+    # set; without a rate `amount_base` stays NULL until `load_fx_rates`
+    # supplies one and recomputes it.
+    Expense = apps.get_model("expenses", "Expense")
+    FxRate = apps.get_model("expenses", "FxRate")
+    base = getattr(settings, "BASE_CURRENCY", "BDT").upper()
+    Expense.objects.filter(currency__iexact=base).update(amount_base=models.F("amount"))
+    foreign = Expense.objects.exclude(currency__iexact=base)
+    path = getattr(settings, "FX_BOOTSTRAP_RATES", None)
+    if not path or not foreign.exists():
+        return
+
+    FxRate.objects.bulk_create(
+        [
+            FxRate(currency=currency, date=day, rate=rate)
+            for day, currency, rate in read_bootstrap_rates(path)
+            if currency != base
+        ],
+        update_conflicts=True,
+        unique_fields=["currency", "date"],
+        update_fields=["rate"],
+    )
+    rates = {}
+    for currency, day, rate in FxRate.objects.order_by("currency", "date").values_list("currency", "date", "rate"):
+        dates, values = rates.setdefault(currency, ([], []))
+        dates.append(day)
+        values.append(rate)
+
+    batch = []
+    for expense in foreign.only("id", "amount", "currency", "date").iterator(chunk_size=2000):
+        dates, values = rates.get(expense.currency.upper(), ((), ()))
+        index = bisect_right(dates, expense.date)
+        if not index:
+            continue
+        expense.amount_base = (expense.amount * values[index - 1]).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        batch.append(expense)
+        if len(batch) >= 2000:
+            Expense.objects.bulk_update(batch, ["amount_base"])
+            batch = []
+    if batch:
+        Expense.objects.bulk_update(batch, ["amount_base"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0007_expense_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='amount_base',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.CreateModel(
+            name='FxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=8)),
+                ('date', models.DateField()),
+                ('rate', models.DecimalField(decimal_places=10, max_digits=20)),
+            ],
+            options={
+                'ordering': ['currency', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('currency', 'date'), name='uniq_fxrate_currency_date')],
+            },
+        ),
+        migrations.RunPython(backfill_base_amounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0008_fxrate_expense_amount_base'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('file', models.FileField(max_length=255, upload_to='archives/expenses/')),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('receipt_blobs', models.ManyToManyField(blank=True, related_name='archives', to='expenses.receiptblob')),
+            ],
+            options={
+                'ordering': ['created_by', 'year'],
+                'constraints': [models.UniqueConstraint(fields=('created_by', 'year'), name='uniq_expense_archive_user_year')],
+            },
+        ),
+    ]
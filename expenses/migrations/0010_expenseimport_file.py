@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0009_expensearchive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expenseimport',
+            name='file',
+            field=models.FileField(blank=True, max_length=255, upload_to='imports/'),
+        ),
+        migrations.AddIndex(
+            model_name='expenseimport',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='idx_expenseimport_pending'),
+        ),
+    ]
@@ -1,10 +1,34 @@
+import hashlib
 from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
 
 from categories.models import Category
 from core.models import OwnedModel
+from expenses.fx import to_base
+
+# Text search configuration for expense search. "simple" only lowercases, so it
+# works for any language and matches what users actually typed.
+SEARCH_CONFIG = "simple"
+
+# Fields an expense's duplicate fingerprint is computed from.
+FINGERPRINT_FIELDS = ("amount", "date", "merchant", "description")
+# Fields `amount_base` is computed from.
+BASE_AMOUNT_FIELDS = ("amount", "currency", "date")
+
+
+def expense_fingerprint(*, amount, date, merchant: str = "", description: str = "") -> int:
+	"""Signed 64-bit hash of the normalized amount, date, merchant and description."""
+	amount = Expense._meta.get_field("amount").to_python(amount).quantize(Decimal("0.01"))
+	date = Expense._meta.get_field("date").to_python(date)
+	key = "|".join(
+		(str(amount), date.isoformat(), " ".join((merchant or "").lower().split()), " ".join((description or "").lower().split()))
+	)
+	return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
 
 
 class Expense(OwnedModel):
@@ -25,11 +49,38 @@ class Expense(OwnedModel):
 	notes = models.TextField(blank=True)
 	merchant = models.CharField(max_length=120, blank=True)
 	receipt = models.FileField(upload_to="receipts/", blank=True)
+	# Set on every save (bulk paths call `refresh_fingerprint()`); see expenses/duplicates.py.
+	fingerprint = models.BigIntegerField(null=True, blank=True, editable=False)
+	# `amount` in settings.BASE_CURRENCY at the date's rate (see expenses/fx.py), set on
+	# every save like `fingerprint`; None until a rate for the currency is loaded.
+	amount_base = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, editable=False)
+	# The stored file `receipt` names, shared with other expenses that uploaded the same content.
+	receipt_blob = models.ForeignKey(
+		"ReceiptBlob",
+		on_delete=models.PROTECT,
+		null=True,
+		blank=True,
+		editable=False,
+		related_name="expenses",
+	)
+
+	# Maintained by PostgreSQL, so bulk writes keep it current too.
+	search_vector = models.GeneratedField(
+		expression=(
+			SearchVector("description", weight="A", config=SEARCH_CONFIG)
+			+ SearchVector("merchant", weight="B", config=SEARCH_CONFIG)
+			+ SearchVector("notes", weight="C", config=SEARCH_CONFIG)
+		),
+		output_field=SearchVectorField(),
+		db_persist=True,
+	)
 
 	class Meta:
 		indexes = [
 			models.Index(fields=["created_by", "date"], name="idx_expense_user_date"),
 			models.Index(fields=["created_by", "category"], name="idx_expense_user_cat"),
+			models.Index(fields=["created_by", "fingerprint"], name="idx_expense_user_fprint"),
+			GinIndex(fields=["search_vector"], name="idx_expense_search"),
 		]
 		ordering = ["-date", "-id"]
 
@@ -40,5 +91,180 @@ class Expense(OwnedModel):
 		if not self.description or not self.description.strip():
 			raise ValidationError({"description": "Required"})
 
+	def refresh_fingerprint(self) -> int:
+		self.fingerprint = expense_fingerprint(
+			amount=self.amount, date=self.date, merchant=self.merchant, description=self.description
+		)
+		return self.fingerprint
+
+	def refresh_amount_base(self) -> Decimal | None:
+		self.amount_base = to_base(self.amount, self.currency, self.date)
+		return self.amount_base
+
+	def save(self, *args, **kwargs):
+		self.refresh_fingerprint()
+		self.refresh_amount_base()
+		if kwargs.get("update_fields") is not None:
+			kwargs["update_fields"] = {*kwargs["update_fields"], "fingerprint", "amount_base"}
+		super().save(*args, **kwargs)
+
 	def __str__(self) -> str:
 		return f"{self.date} {self.amount} {self.description[:30]}"
+
+
+class FxRate(models.Model):
+	"""Units of settings.BASE_CURRENCY one unit of `currency` bought on `date` (see expenses/fx.py)."""
+	currency = models.CharField(max_length=8)
+	date = models.DateField()
+	rate = models.DecimalField(max_digits=20, decimal_places=10)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["currency", "date"], name="uniq_fxrate_currency_date"),
+		]
+		ordering = ["currency", "date"]
+
+	def __str__(self) -> str:
+		return f"{self.currency} {self.date} {self.rate}"
+
+
+class Merchant(models.Model):
+	"""Per-user merchant dictionary for autocomplete, kept in step with Expense writes.
+
+	One row per (user, normalized merchant name) with how often and how recently
+	it was used, so suggestions never scan the user's expenses.
+	"""
+	user = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="merchants",
+	)
+	key = models.CharField(max_length=120, help_text="Lowercased, whitespace-collapsed name")
+	name = models.CharField(max_length=120, help_text="Spelling on the most recent expense")
+	use_count = models.PositiveIntegerField(default=0)
+	last_used = models.DateField()
+	category = models.ForeignKey(
+		Category,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="+",
+		help_text="Category of the most recent expense",
+	)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["user", "key"], name="uniq_merchant_user_key"),
+		]
+		indexes = [
+			# Serves `key LIKE 'prefix%'` regardless of the database collation.
+			models.Index(
+				"user",
+				OpClass("key", name="varchar_pattern_ops"),
+				name="idx_merchant_user_key_prefix",
+			),
+		]
+		ordering = ["-use_count", "-last_used"]
+
+	def __str__(self) -> str:
+		return f"{self.user_id} {self.name} ({self.use_count})"
+
+
+class ReceiptStatus(models.TextChoices):
+	PENDING = "pending", "Pending"
+	READY = "ready", "Ready"
+	SKIPPED = "skipped", "Skipped"
+	FAILED = "failed", "Failed"
+
+
+class ReceiptBlob(models.Model):
+	"""A stored receipt file, named by the SHA-256 of its content.
+
+	Uploading the same file again reuses the blob instead of storing another
+	copy. `thumbnail` and `preview` are rendered later by `process_receipts`;
+	`status` says whether that has happened (`skipped` for non-images).
+	"""
+	sha256 = models.CharField(max_length=64, primary_key=True)
+	file = models.FileField(max_length=255)
+	size = models.PositiveBigIntegerField()
+	content_type = models.CharField(max_length=100, blank=True)
+	thumbnail = models.FileField(max_length=255, blank=True)
+	preview = models.FileField(max_length=255, blank=True)
+	status = models.CharField(max_length=16, choices=ReceiptStatus.choices, default=ReceiptStatus.PENDING)
+	error = models.TextField(blank=True)
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		indexes = [
+			models.Index(
+				fields=["created_at"],
+				condition=models.Q(status="pending"),
+				name="idx_receiptblob_pending",
+			),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.sha256[:12]} ({self.status})"
+
+
+class ExpenseArchive(OwnedModel):
+	"""Manifest of one user's archived expenses for one year (see expenses/archive.py).
+
+	The rows themselves live in `file`, a gzipped JSON-lines blob, oldest first.
+	"""
+	year = models.PositiveSmallIntegerField()
+	file = models.FileField(upload_to="archives/expenses/", max_length=255)
+	row_count = models.PositiveIntegerField(default=0)
+	first_date = models.DateField()
+	last_date = models.DateField()
+	size = models.PositiveBigIntegerField(default=0)
+	sha256 = models.CharField(max_length=64)
+	# Receipts the archived rows use, so they are not pruned as orphans.
+	receipt_blobs = models.ManyToManyField(ReceiptBlob, blank=True, related_name="archives")
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=["created_by", "year"], name="uniq_expense_archive_user_year"),
+		]
+		ordering = ["created_by", "year"]
+
+	def __str__(self) -> str:
+		return f"{self.created_by_id} {self.year} ({self.row_count} expenses)"
+
+
+class ImportStatus(models.TextChoices):
+	PENDING = "pending", "Pending"
+	RUNNING = "running", "Running"
+	COMPLETED = "completed", "Completed"
+	FAILED = "failed", "Failed"
+
+
+class ExpenseImport(OwnedModel):
+	"""A bank-statement CSV import job and its row-level outcome."""
+	filename = models.CharField(max_length=255, blank=True)
+	# The uploaded CSV, kept until `import_expenses_csv --pending` has run the job.
+	file = models.FileField(upload_to="imports/", max_length=255, blank=True)
+	status = models.CharField(max_length=16, choices=ImportStatus.choices, default=ImportStatus.PENDING)
+	column_mapping = models.JSONField(default=dict, help_text="Expense field -> CSV column header")
+	options = models.JSONField(default=dict, blank=True)
+	total_rows = models.PositiveIntegerField(default=0)
+	imported_rows = models.PositiveIntegerField(default=0)
+	duplicate_rows = models.PositiveIntegerField(default=0)
+	skipped_rows = models.PositiveIntegerField(default=0)
+	error_rows = models.PositiveIntegerField(default=0)
+	errors = models.JSONField(default=list, blank=True, help_text="First row-level errors: [{line, errors}]")
+	started_at = models.DateTimeField(null=True, blank=True)
+	finished_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		ordering = ["-created_at"]
+		indexes = [
+			models.Index(
+				fields=["created_at"],
+				condition=models.Q(status="pending"),
+				name="idx_expenseimport_pending",
+			),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.filename or 'import'} ({self.status})"
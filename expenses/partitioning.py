@@ -0,0 +1,247 @@
+"""
+Monthly range partitioning of the expenses table (PostgreSQL).
+
+`convert_to_partitioned` rebuilds `expenses_expense` as a table partitioned
+by `date`, with one partition per month (`expenses_expense_p202601`, ...) and
+a default partition for anything outside them. Queries bounded by date then
+only touch the months they cover, and old months can be detached (or
+dropped) as a whole once the archive has emptied them.
+
+PostgreSQL requires the primary key of a partitioned table to include the
+partition key, so it becomes `(id, date)`; ids still come from one sequence
+and stay unique. No foreign key may point at the table, hence
+`Occurrence.expense` uses `db_constraint=False`.
+
+Conversion is opt-in (`partition_expenses --convert`), runs in one
+transaction and locks the table while it copies, so plan a maintenance
+window for large tables. After that, run `partition_expenses` regularly to
+create partitions ahead of time.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from expenses.models import Expense
+
+TABLE = Expense._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+_BOUNDS = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+class PartitioningError(Exception):
+	pass
+
+
+@dataclass(frozen=True)
+class Partition:
+	name: str
+	start: date | None  # None for the default partition
+	end: date | None
+
+
+def month_start(day: date) -> date:
+	return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+	index = month.year * 12 + month.month - 1 + count
+	return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+	return f"{TABLE}_p{month:%Y%m}"
+
+
+def _quote(name: str) -> str:
+	return connection.ops.quote_name(name)
+
+
+def is_partitioned() -> bool:
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+		row = cursor.fetchone()
+	return bool(row) and row[0] == "p"
+
+
+def list_partitions() -> list[Partition]:
+	"""Attached partitions, oldest first, the default partition last."""
+	with connection.cursor() as cursor:
+		cursor.execute(
+			"""
+			SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+			FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+			WHERE pg_inherits.inhparent = to_regclass(%s)
+			""",
+			[TABLE],
+		)
+		rows = cursor.fetchall()
+	partitions = []
+	for name, bound in rows:
+		match = _BOUNDS.search(bound or "")
+		if match:
+			partitions.append(Partition(name, date.fromisoformat(match[1]), date.fromisoformat(match[2])))
+		else:
+			partitions.append(Partition(name, None, None))
+	return sorted(partitions, key=lambda p: (p.start is None, p.start or date.min))
+
+
+def _storable_columns(cursor, table: str) -> list[str]:
+	"""Columns that can be written (generated columns are computed by PostgreSQL)."""
+	cursor.execute(
+		"""
+		SELECT attname FROM pg_attribute
+		WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+		ORDER BY attnum
+		""",
+		[table],
+	)
+	return [_quote(name) for (name,) in cursor.fetchall()]
+
+
+def _create_partition(cursor, month: date) -> None:
+	start, end = month, add_months(month, 1)
+	name = partition_name(month)
+	cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [DEFAULT_PARTITION])
+	has_default = cursor.fetchone()[0]
+	stray = 0
+	if has_default:
+		# Rows for this month that landed in the default partition have to move
+		# into the new one, or PostgreSQL refuses to create it.
+		cursor.execute(
+			f"SELECT count(*) FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s", [start, end]
+		)
+		stray = cursor.fetchone()[0]
+	if stray:
+		columns = ", ".join(_storable_columns(cursor, TABLE))
+		cursor.execute(
+			f"CREATE TEMPORARY TABLE expense_partition_move ON COMMIT DROP AS "
+			f"SELECT {columns} FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s",
+			[start, end],
+		)
+		cursor.execute(f"DELETE FROM {_quote(DEFAULT_PARTITION)} WHERE date >= %s AND date < %s", [start, end])
+	cursor.execute(
+		f"CREATE TABLE {_quote(name)} PARTITION OF {_quote(TABLE)} FOR VALUES FROM (%s) TO (%s)", [start, end]
+	)
+	if stray:
+		cursor.execute(f"INSERT INTO {_quote(TABLE)} ({columns}) SELECT {columns} FROM expense_partition_move")
+		cursor.execute("DROP TABLE expense_partition_move")
+
+
+@transaction.atomic
+def ensure_partitions(*, months_ahead: int = 3, today: date | None = None) -> list[str]:
+	"""Create the monthly partitions missing from the oldest one through `months_ahead` months ahead."""
+	if not is_partitioned():
+		raise PartitioningError(f"{TABLE} is not partitioned; run partition_expenses --convert first")
+	current = month_start(today or timezone.localdate())
+	existing = {p.start for p in list_partitions() if p.start}
+	month = min(existing, default=current)
+	created = []
+	with connection.cursor() as cursor:
+		while month <= add_months(current, months_ahead):
+			if month not in existing:
+				_create_partition(cursor, month)
+				created.append(partition_name(month))
+			month = add_months(month, 1)
+	return created
+
+
+@transaction.atomic
+def detach_partitions(*, before: date, drop: bool = False) -> list[str]:
+	"""Detach every monthly partition that ends on or before `before`. Returns their names.
+
+	Only empty partitions are detached: rows must leave through the archive
+	first (`archive_expenses`), which keeps them in reports, the expense list
+	and the sync log. A detached partition stays behind as an ordinary table
+	unless `drop` is set.
+	"""
+	if not is_partitioned():
+		raise PartitioningError(f"{TABLE} is not partitioned")
+	detached = []
+	with connection.cursor() as cursor:
+		for partition in list_partitions():
+			if partition.end is None or partition.end > before:
+				continue
+			cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {_quote(partition.name)})")
+			if cursor.fetchone()[0]:
+				raise PartitioningError(
+					f"{partition.name} still holds expenses; archive them first (archive_expenses --before {before})"
+				)
+			cursor.execute(f"ALTER TABLE {_quote(TABLE)} DETACH PARTITION {_quote(partition.name)}")
+			if drop:
+				cursor.execute(f"DROP TABLE {_quote(partition.name)}")
+			detached.append(partition.name)
+	return detached
+
+
+@transaction.atomic
+def convert_to_partitioned(*, months_ahead: int = 3, today: date | None = None) -> int:
+	"""Rebuild the expenses table as a monthly range-partitioned table. Returns partitions created."""
+	if is_partitioned():
+		raise PartitioningError(f"{TABLE} is already partitioned")
+	old = f"{TABLE}_unpartitioned"
+	current = month_start(today or timezone.localdate())
+
+	with connection.cursor() as cursor:
+		cursor.execute(f"LOCK TABLE {_quote(TABLE)} IN ACCESS EXCLUSIVE MODE")
+		cursor.execute(
+			"SELECT conrelid::regclass::text, conname FROM pg_constraint WHERE confrelid = to_regclass(%s)", [TABLE]
+		)
+		referencing = cursor.fetchall()
+		if referencing:
+			names = ", ".join(f"{table}.{name}" for table, name in referencing)
+			raise PartitioningError(f"Foreign keys reference {TABLE} ({names}); make them db_constraint=False first")
+
+		cursor.execute(
+			"SELECT indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s "
+			"AND indexname <> %s",
+			[TABLE, f"{TABLE}_pkey"],
+		)
+		index_sql = [row[0] for row in cursor.fetchall()]
+		cursor.execute(
+			"SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+			"WHERE conrelid = to_regclass(%s) AND contype IN ('f', 'c')",
+			[TABLE],
+		)
+		constraints = cursor.fetchall()
+		cursor.execute(f"SELECT min(date), max(date) FROM {_quote(TABLE)}")
+		first, last = cursor.fetchone()
+
+		cursor.execute(f"ALTER TABLE {_quote(TABLE)} RENAME TO {_quote(old)}")
+		cursor.execute(
+			f"CREATE TABLE {_quote(TABLE)} (LIKE {_quote(old)} INCLUDING DEFAULTS INCLUDING GENERATED "
+			f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE (date)"
+		)
+		month = month_start(first) if first else current
+		end = add_months(max(current, month_start(last)) if last else current, months_ahead)
+		created = 0
+		while month <= end:
+			_create_partition(cursor, month)
+			created += 1
+			month = add_months(month, 1)
+		cursor.execute(f"CREATE TABLE {_quote(DEFAULT_PARTITION)} PARTITION OF {_quote(TABLE)} DEFAULT")
+
+		columns = ", ".join(_storable_columns(cursor, old))
+		cursor.execute(f"INSERT INTO {_quote(TABLE)} ({columns}) SELECT {columns} FROM {_quote(old)}")
+		cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {_quote(old)}")
+		next_id = cursor.fetchone()[0]
+		# Frees the old index, constraint and identity-sequence names for the new table.
+		cursor.execute(f"DROP TABLE {_quote(old)}")
+
+		sequence = f"{TABLE}_id_seq"
+		cursor.execute(f"CREATE SEQUENCE {_quote(sequence)} OWNED BY {_quote(TABLE)}.id")
+		cursor.execute("SELECT setval(%s, %s, false)", [sequence, next_id])
+		cursor.execute(f"ALTER TABLE {_quote(TABLE)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence])
+		cursor.execute(f"ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(TABLE + '_pkey')} PRIMARY KEY (id, date)")
+		# The saved definitions name the table, which is now the partitioned one.
+		for sql in index_sql:
+			cursor.execute(sql)
+		for name, definition in constraints:
+			cursor.execute(f"ALTER TABLE {_quote(TABLE)} ADD CONSTRAINT {_quote(name)} {definition}")
+		cursor.execute(f"ANALYZE {_quote(TABLE)}")
+	return created + 1
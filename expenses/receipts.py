@@ -0,0 +1,219 @@
+"""
+Content-addressed receipt storage.
+
+A receipt is stored once under the SHA-256 of its content
+(`receipts/sha256/ab/cd/<digest><ext>`) and tracked by a `ReceiptBlob`;
+expenses that upload the same file again point at the same blob.
+
+Thumbnail and preview images are rendered by `process_receipts`, never while
+an upload request waits. Their names derive from the digest as well, so a
+receipt URL always serves the same bytes and can be cached for good.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import mimetypes
+import os
+import re
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.utils import timezone
+
+from expenses.models import Expense, ReceiptBlob, ReceiptStatus
+from expenses.signals import send_expenses_changed
+
+try:
+	from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow is optional; without it blobs stay pending.
+	Image = None
+
+RECEIPT_ROOT = "receipts/sha256"
+DERIVED_ROOT = "receipts/derived"
+
+# Longest edge, in pixels, of each rendered variant.
+VARIANT_SIZES = {"thumbnail": 256, "preview": 1280}
+VARIANT_QUALITY = 80
+
+_EXTENSION = re.compile(r"\.[a-z0-9]{1,8}")
+
+# Types a receipt may be uploaded as. Only raster images are served inline;
+# anything else (PDFs, older blobs of other types) is sent as a download.
+RASTER_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "image/webp"})
+RECEIPT_CONTENT_TYPES = RASTER_CONTENT_TYPES | {"application/pdf"}
+
+
+def imaging_available() -> bool:
+	return Image is not None
+
+
+def blob_name(digest: str, filename: str = "") -> str:
+	extension = os.path.splitext(filename)[1].lower()
+	if not _EXTENSION.fullmatch(extension):
+		extension = ""
+	return f"{RECEIPT_ROOT}/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def variant_name(digest: str, variant: str) -> str:
+	return f"{DERIVED_ROOT}/{digest[:2]}/{digest}-{variant}.jpg"
+
+
+def upload_content_type(upload) -> str:
+	"""The upload's declared media type (or one guessed from its name), without parameters."""
+	declared = getattr(upload, "content_type", None) or mimetypes.guess_type(upload.name or "")[0] or ""
+	return declared.split(";")[0].strip().lower()
+
+
+def served_content_type(content_type: str) -> str:
+	"""Content-Type to serve a stored original with; unknown types never reach the browser as themselves."""
+	return content_type if content_type in RECEIPT_CONTENT_TYPES else "application/octet-stream"
+
+
+def _digest(fileobj) -> tuple[str, int]:
+	sha256 = hashlib.sha256()
+	size = 0
+	for chunk in fileobj.chunks():
+		sha256.update(chunk)
+		size += len(chunk)
+	return sha256.hexdigest(), size
+
+
+def _write_once(name: str, content) -> None:
+	"""Write `content` at `name` unless a file is already there."""
+	if default_storage.exists(name):
+		return
+	if hasattr(content, "seek"):
+		content.seek(0)
+	saved = default_storage.save(name, content)
+	if saved != name:
+		# A concurrent upload of the same content won the race; keep its copy.
+		default_storage.delete(saved)
+
+
+def store_receipt(upload) -> ReceiptBlob:
+	"""The blob for an uploaded file, writing the file only if its content is new."""
+	digest, size = _digest(upload)
+	blob = ReceiptBlob.objects.filter(pk=digest).first()
+	if blob is not None:
+		_write_once(blob.file.name, upload)
+		return blob
+
+	name = blob_name(digest, upload.name or "")
+	_write_once(name, upload)
+	content_type = upload_content_type(upload)
+	blob, _ = ReceiptBlob.objects.get_or_create(
+		pk=digest, defaults={"file": name, "size": size, "content_type": content_type[:100]}
+	)
+	return blob
+
+
+# ---- rendering ----
+
+
+def render_variants(blob: ReceiptBlob) -> None:
+	"""Render `blob`'s thumbnail and preview and set its status (not saved)."""
+	if not blob.content_type.startswith("image/"):
+		blob.status = ReceiptStatus.SKIPPED
+		return
+	try:
+		with blob.file.open("rb") as fileobj:
+			image = ImageOps.exif_transpose(Image.open(fileobj))
+			image.load()
+	except (UnidentifiedImageError, OSError) as exc:
+		blob.status = ReceiptStatus.SKIPPED
+		blob.error = str(exc)[:500]
+		return
+
+	if image.mode not in ("RGB", "L"):
+		image = image.convert("RGB")
+	for variant, size in VARIANT_SIZES.items():
+		scaled = image.copy()
+		scaled.thumbnail((size, size))
+		buffer = io.BytesIO()
+		scaled.save(buffer, format="JPEG", quality=VARIANT_QUALITY, optimize=True)
+		name = variant_name(blob.sha256, variant)
+		_write_once(name, ContentFile(buffer.getvalue()))
+		setattr(blob, variant, name)
+	blob.status = ReceiptStatus.READY
+	blob.error = ""
+
+
+def process_pending_receipts(*, limit: int = 50) -> int:
+	"""Render variants for up to `limit` pending blobs. Returns how many were handled.
+
+	Blobs are claimed with SKIP LOCKED, so several workers can run at once.
+	"""
+	with transaction.atomic():
+		blobs = list(
+			ReceiptBlob.objects.select_for_update(skip_locked=True)
+			.filter(status=ReceiptStatus.PENDING)
+			.order_by("created_at")[:limit]
+		)
+		for blob in blobs:
+			try:
+				render_variants(blob)
+			except Exception as exc:
+				blob.status = ReceiptStatus.FAILED
+				blob.error = str(exc)[:500]
+			blob.save(update_fields=["thumbnail", "preview", "status", "error"])
+	return len(blobs)
+
+
+# ---- maintenance ----
+
+
+def adopt_legacy_receipts(*, limit: int | None = None) -> int:
+	"""Move receipts uploaded before blobs existed into blob storage.
+
+	Duplicate files collapse into one blob; an old file is deleted once no
+	expense names it any more. Returns the number of expenses moved.
+	"""
+	expenses = Expense.objects.filter(receipt_blob__isnull=True).exclude(receipt="").order_by("id")
+	if limit is not None:
+		expenses = expenses[:limit]
+
+	moved = 0
+	for expense in expenses.iterator(chunk_size=200):
+		old_name = expense.receipt.name
+		if not default_storage.exists(old_name):
+			continue
+		with default_storage.open(old_name, "rb") as fileobj:
+			blob = store_receipt(fileobj)
+
+		with transaction.atomic():
+			previous = Expense.objects.select_for_update().filter(pk=expense.pk, receipt=old_name).first()
+			if previous is None:
+				continue
+			Expense.objects.filter(pk=expense.pk).update(receipt=blob.file.name, receipt_blob=blob)
+			current = Expense.objects.get(pk=expense.pk)
+			send_expenses_changed(removed=[previous], added=[current])
+		moved += 1
+		if old_name != blob.file.name and not Expense.objects.filter(receipt=old_name).exists():
+			default_storage.delete(old_name)
+	return moved
+
+
+def prune_orphan_receipts(*, older_than: timedelta = timedelta(days=1)) -> int:
+	"""Delete blobs no expense (hot or archived) uses any more, with their files. Returns blobs deleted.
+
+	Recent blobs are kept: an upload stores its blob before the expense row
+	that points at it is saved.
+	"""
+	cutoff = timezone.now() - older_than
+	deleted = 0
+	orphans = ReceiptBlob.objects.filter(expenses__isnull=True, archives__isnull=True, created_at__lt=cutoff)
+	for blob in orphans.iterator(chunk_size=200):
+		try:
+			blob.delete()
+		except ProtectedError:
+			# Picked up by an expense since the query ran.
+			continue
+		for name in (blob.file.name, blob.thumbnail.name, blob.preview.name):
+			if name:
+				default_storage.delete(name)
+		deleted += 1
+	return deleted
@@ -1,12 +1,58 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
 
 from categories.models import Category
 from core.rbac import is_admin
-from expenses.models import Expense
+from expenses.fx import base_currency, rate_for
+from expenses.importing import ImportConfigError, ImportOptions, validate_mapping
+from expenses.models import Expense, ExpenseImport, Merchant
+from expenses.receipts import RECEIPT_CONTENT_TYPES, store_receipt, upload_content_type
+
+
+class PrefetchedCategoryField(serializers.PrimaryKeyRelatedField):
+    """Category lookup that uses a `category_map` from the context when one is given.
+
+    Bulk validation resolves every referenced category with one query up front
+    instead of one `get()` per row.
+    """
+
+    def to_internal_value(self, data):
+        category_map = self.context.get("category_map")
+        if category_map is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in category_map:
+            self.fail("does_not_exist", pk_value=data)
+        return category_map[pk]
+
+
+class ReceiptVariantField(serializers.PrimaryKeyRelatedField):
+    """URL of one rendition of the expense's receipt blob (see ReceiptFileView)."""
+
+    def __init__(self, variant: str, **kwargs):
+        self.variant = variant
+        kwargs.setdefault("source", "receipt_blob")
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        url = reverse("expense-receipt-file", kwargs={"digest": value.pk, "variant": self.variant})
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
     created_by_username = serializers.CharField(source="created_by.username", read_only=True)
+    category = PrefetchedCategoryField(queryset=Category.objects.all(), allow_null=True, required=False)
+    receipt_url = ReceiptVariantField("original")
+    receipt_thumbnail = ReceiptVariantField("thumbnail")
+    receipt_preview = ReceiptVariantField("preview")
     
     class Meta:
         model = Expense
@@ -14,6 +60,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "id",
             "amount",
             "currency",
+            "amount_base",
             "date",
             "description",
             "category",
@@ -21,6 +68,9 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "notes",
             "merchant",
             "receipt",
+            "receipt_url",
+            "receipt_thumbnail",
+            "receipt_preview",
             "created_by_username",
             "created_at",
             "updated_at",
@@ -32,11 +82,27 @@ class ExpenseSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Must be > 0")
         return value
 
+    def validate_currency(self, value: str) -> str:
+        return value.strip().upper()
+
+    def validate(self, attrs):
+        # Reject what could not be converted, so every stored expense counts in base-currency totals.
+        currency = attrs.get("currency", getattr(self.instance, "currency", None) or base_currency())
+        day = attrs.get("date", getattr(self.instance, "date", None))
+        if ("currency" in attrs or "date" in attrs) and day is not None and rate_for(currency, day) is None:
+            raise serializers.ValidationError({"currency": f"No exchange rate for {currency} on or before {day}"})
+        return attrs
+
     def validate_description(self, value: str) -> str:
         if not value or not value.strip():
             raise serializers.ValidationError("Required")
         return value
 
+    def validate_receipt(self, value):
+        if value and not isinstance(value, str) and upload_content_type(value) not in RECEIPT_CONTENT_TYPES:
+            raise serializers.ValidationError("Unsupported file type; upload a JPEG, PNG, WebP or PDF receipt")
+        return value
+
     def validate_category(self, value: Category | None):
         if value is None:
             return None
@@ -45,7 +111,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
         if not request:
             return value
 
-        if is_admin(request.user):
+        if self._actor_is_admin(request.user):
             return value
 
         if value.is_system:
@@ -56,7 +122,109 @@ class ExpenseSerializer(serializers.ModelSerializer):
 
         return value
 
+    def _actor_is_admin(self, user) -> bool:
+        # Memoized in the (shared) context so bulk validation checks roles once.
+        if "actor_is_admin" not in self.context:
+            self.context["actor_is_admin"] = is_admin(user)
+        return self.context["actor_is_admin"]
+
+    def _store_receipt(self, validated_data):
+        # Uploads go to content-addressed storage; the expense names the shared blob's file.
+        upload = validated_data.get("receipt")
+        if upload and not isinstance(upload, str):
+            blob = store_receipt(upload)
+            validated_data["receipt"] = blob.file.name
+            validated_data["receipt_blob"] = blob
+
     def create(self, validated_data):
         request = self.context["request"]
         validated_data["created_by"] = request.user
+        self._store_receipt(validated_data)
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        self._store_receipt(validated_data)
+        return super().update(instance, validated_data)
+
+
+class MerchantSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Merchant
+        fields = ["name", "use_count", "last_used", "category"]
+        read_only_fields = fields
+
+
+class ExpenseBulkSerializer(serializers.Serializer):
+    """Envelope for `POST /expenses/bulk/`; items are validated by ExpenseSerializer."""
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+
+    def validate_update(self, value):
+        for item in value:
+            if not isinstance(item.get("id"), int) or isinstance(item.get("id"), bool):
+                raise serializers.ValidationError("Every update item needs an integer id")
+        return value
+
+    def validate(self, attrs):
+        max_items = getattr(settings, "EXPENSE_BULK_MAX_ITEMS", 1000)
+        total = len(attrs["create"]) + len(attrs["update"]) + len(attrs["delete"])
+        if total == 0:
+            raise serializers.ValidationError("Nothing to do")
+        if total > max_items:
+            raise serializers.ValidationError(f"At most {max_items} items per request")
+
+        ids = [item["id"] for item in attrs["update"]] + list(attrs["delete"])
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("An expense id may appear only once per request")
+        return attrs
+
+
+class ExpenseImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExpenseImport
+        fields = [
+            "id",
+            "filename",
+            "status",
+            "column_mapping",
+            "options",
+            "total_rows",
+            "imported_rows",
+            "duplicate_rows",
+            "skipped_rows",
+            "error_rows",
+            "errors",
+            "started_at",
+            "finished_at",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
+class ExpenseImportCreateSerializer(serializers.Serializer):
+    """Multipart upload: `file` plus JSON-encoded `column_mapping` and optional `options`."""
+    file = serializers.FileField()
+    column_mapping = serializers.JSONField(binary=True)
+    options = serializers.JSONField(binary=True, required=False, default=dict)
+
+    def validate_column_mapping(self, value):
+        try:
+            return validate_mapping(value)
+        except ImportConfigError as exc:
+            raise serializers.ValidationError(str(exc))
+
+    def validate_options(self, value):
+        try:
+            options = ImportOptions.from_dict(value)
+        except (ImportConfigError, TypeError) as exc:
+            raise serializers.ValidationError(str(exc))
+
+        if options.default_category_id is not None:
+            request = self.context.get("request")
+            category = Category.objects.filter(pk=options.default_category_id).first()
+            if category is None or not (
+                category.is_system or is_admin(request.user) or category.created_by_id == request.user.id
+            ):
+                raise serializers.ValidationError({"default_category_id": "Invalid category"})
+        return value
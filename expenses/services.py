@@ -1,15 +1,26 @@
+import copy
+from dataclasses import dataclass, field
 from datetime import timedelta
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Upper
 from django.utils import timezone
 from rest_framework import serializers
 
 from core.rbac import is_admin
-from expenses.models import Expense
+from expenses.fx import clear_rate_cache
+from expenses.models import BASE_AMOUNT_FIELDS, FINGERPRINT_FIELDS, Expense, FxRate
+from expenses.signals import send_expenses_changed, suppress_row_signals
 
+FINGERPRINT_FIELDS_SET = frozenset(FINGERPRINT_FIELDS)
+BASE_AMOUNT_FIELDS_SET = frozenset(BASE_AMOUNT_FIELDS)
 
-def assert_expense_editable(*, expense: Expense, actor) -> None:
-    if is_admin(actor):
+
+def assert_expense_editable(*, expense: Expense, actor, actor_is_admin: bool | None = None) -> None:
+    if actor_is_admin is None:
+        actor_is_admin = is_admin(actor)
+    if actor_is_admin:
         return
 
     window_hours = getattr(settings, "EXPENSE_EDIT_WINDOW_HOURS", 72)
@@ -20,3 +31,99 @@ def assert_expense_editable(*, expense: Expense, actor) -> None:
                 "detail": f"Expense can only be edited/deleted within {window_hours} hours of creation"
             }
         )
+
+
+@dataclass
+class BulkExpenseChanges:
+    create: list[Expense] = field(default_factory=list)
+    update: list[tuple[Expense, dict]] = field(default_factory=list)
+    delete: list[Expense] = field(default_factory=list)
+
+
+@transaction.atomic
+def apply_bulk_expense_changes(changes: BulkExpenseChanges) -> None:
+    """Write pre-validated creates/updates/deletes with bulk queries in one transaction.
+
+    Bulk writes bypass the per-row model signals, so `expenses_changed` is sent
+    once for the whole batch to keep rollups and caches in step.
+    """
+    removed: list[Expense] = []
+    added: list[Expense] = []
+
+    if changes.create:
+        for expense in changes.create:
+            expense.refresh_fingerprint()
+            expense.refresh_amount_base()
+        Expense.objects.bulk_create(changes.create, batch_size=500)
+        added.extend(changes.create)
+
+    if changes.update:
+        now = timezone.now()
+        fields = {"updated_at"}
+        instances = []
+        for instance, attrs in changes.update:
+            removed.append(copy.copy(instance))
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            instance.updated_at = now
+            fields.update(attrs)
+            if FINGERPRINT_FIELDS_SET & attrs.keys():
+                instance.refresh_fingerprint()
+                fields.add("fingerprint")
+            if BASE_AMOUNT_FIELDS_SET & attrs.keys():
+                instance.refresh_amount_base()
+                fields.add("amount_base")
+            instances.append(instance)
+        Expense.objects.bulk_update(instances, sorted(fields), batch_size=500)
+        added.extend(instances)
+
+    if changes.delete:
+        with suppress_row_signals():
+            Expense.objects.filter(pk__in=[e.pk for e in changes.delete]).delete()
+        removed.extend(changes.delete)
+
+    send_expenses_changed(removed=removed, added=added)
+
+
+@transaction.atomic
+def store_fx_rates(rows) -> int:
+    """Insert or overwrite `(date, currency, rate)` rows. Returns rows written."""
+    rates = [FxRate(date=day, currency=currency, rate=rate) for day, currency, rate in rows]
+    FxRate.objects.bulk_create(
+        rates, update_conflicts=True, unique_fields=["currency", "date"], update_fields=["rate"], batch_size=2000
+    )
+    transaction.on_commit(clear_rate_cache)
+    return len(rates)
+
+
+def refresh_base_amounts(*, currencies, since=None, batch_size: int = 2000) -> int:
+    """Recompute `amount_base` for expenses in `currencies` (dated `since` or later) after rates change.
+
+    Runs in keyset batches and sends `expenses_changed` for the rows whose
+    value moved, so rollups and caches follow. Returns the number changed.
+    """
+    qs = (
+        Expense.objects.annotate(currency_code=Upper("currency"))
+        .filter(currency_code__in=[currency.upper() for currency in currencies])
+        .order_by("pk")
+    )
+    if since is not None:
+        qs = qs.filter(date__gte=since)
+
+    changed = last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(qs.filter(pk__gt=last_pk).select_for_update()[:batch_size])
+            if not batch:
+                return changed
+            last_pk = batch[-1].pk
+            removed, added = [], []
+            for expense in batch:
+                previous = copy.copy(expense)
+                if expense.refresh_amount_base() != previous.amount_base:
+                    removed.append(previous)
+                    added.append(expense)
+            if added:
+                Expense.objects.bulk_update(added, ["amount_base"], batch_size=500)
+                send_expenses_changed(removed=removed, added=added)
+            changed += len(added)
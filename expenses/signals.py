@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import copy
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from categories.models import Category
+from core.versions import bump_data_versions
+from expenses.merchants import apply_merchant_changes
+from expenses.models import Expense
+
+# Sent whenever expense rows are written, by single-row saves/deletes as well as
+# bulk paths (which must send it themselves). Receivers get `removed` and
+# `added` lists of Expense instances: an update is the old row in `removed` and
+# the new row in `added`. Derived data (rollups, caches, logs) listens to this
+# instead of the model signals so that bulk writes are covered too.
+expenses_changed = Signal()
+
+# Sent when expense rows leave or return to the expenses table while still
+# counting as the user's spending (archiving and restoring). Same arguments
+# as `expenses_changed`; rollups and budget caches ignore it, while the sync
+# log and the merchant dictionary follow both.
+expenses_moved = Signal()
+
+_local = threading.local()
+
+
+@contextmanager
+def suppress_row_signals():
+	"""Silence the per-row handlers below while a bulk path writes rows.
+
+	The bulk path is then responsible for sending `expenses_changed` once.
+	"""
+	previous = getattr(_local, "suppressed", False)
+	_local.suppressed = True
+	try:
+		yield
+	finally:
+		_local.suppressed = previous
+
+
+def _suppressed() -> bool:
+	return getattr(_local, "suppressed", False)
+
+
+def send_expenses_changed(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> None:
+	removed = list(removed)
+	added = list(added)
+	if removed or added:
+		expenses_changed.send(sender=Expense, removed=removed, added=added)
+
+
+def send_expenses_moved(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> None:
+	removed = list(removed)
+	added = list(added)
+	if removed or added:
+		expenses_moved.send(sender=Expense, removed=removed, added=added)
+
+
+def _saved_state(instance: Expense) -> Expense:
+	# Callers may assign raw values (e.g. date strings); receivers get real types.
+	state = copy.copy(instance)
+	for name in ("date", "amount"):
+		setattr(state, name, Expense._meta.get_field(name).to_python(getattr(state, name)))
+	return state
+
+
+@receiver(pre_save, sender=Expense)
+def _remember_previous_state(sender, instance: Expense, **kwargs):
+	instance._previous_state = None
+	if _suppressed() or instance._state.adding or instance.pk is None:
+		return
+	instance._previous_state = Expense.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Expense)
+def _expense_saved(sender, instance: Expense, created: bool, **kwargs):
+	if _suppressed():
+		return
+	previous = getattr(instance, "_previous_state", None)
+	instance._previous_state = None
+	send_expenses_changed(removed=[previous] if previous else [], added=[_saved_state(instance)])
+
+
+@receiver(post_delete, sender=Expense)
+def _expense_deleted(sender, instance: Expense, **kwargs):
+	if _suppressed():
+		return
+	send_expenses_changed(removed=[instance])
+
+
+@receiver(pre_delete, sender=Category)
+def _category_deleted(sender, instance: Category, **kwargs):
+	# Expense.category is SET_NULL, which Django applies with a queryset update
+	# that sends no Expense signals; report the move to "uncategorized" here.
+	removed = list(Expense.objects.filter(category_id=instance.pk).iterator(chunk_size=2000))
+	added = []
+	for expense in removed:
+		moved = copy.copy(expense)
+		moved.category_id = None
+		added.append(moved)
+	send_expenses_changed(removed=removed, added=added)
+
+
+@receiver(expenses_changed)
+@receiver(expenses_moved)
+def _update_merchant_dictionary(sender, removed, added, **kwargs):
+	apply_merchant_changes(removed=removed, added=added)
+
+
+@receiver(expenses_changed)
+def _bump_data_versions(sender, removed, added, **kwargs):
+	bump_data_versions(user_ids={expense.created_by_id for expense in [*removed, *added]})
@@ -1,3 +1,104 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from expenses import importing
+from expenses.importing import run_import, run_pending_imports
+from expenses.models import Expense, ExpenseImport, ImportStatus
+from users.roles import ROLE_USER
+
+User = get_user_model()
+
+MAPPING = {"date": "date", "amount": "amount", "description": "description"}
+
+
+class ImportTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create_user("importer", password="x")
+		cls.user.groups.add(Group.objects.get_or_create(name=ROLE_USER)[0])
+
+	def run_csv(self, text, **options):
+		job = ExpenseImport.objects.create(created_by=self.user, column_mapping=MAPPING, options=options)
+		return run_import(job, io.BytesIO(text.encode("utf-8")))
+
+	def test_identical_lines_in_one_file_are_all_imported(self):
+		job = self.run_csv("date,amount,description\n2026-04-01,3.50,Coffee\n2026-04-01,3.50,Coffee\n")
+		self.assertEqual((job.status, job.imported_rows, job.duplicate_rows), (ImportStatus.COMPLETED, 2, 0))
+
+	def test_identical_lines_across_batches_are_all_imported(self):
+		batched = importing.batched
+		with mock.patch.object(importing, "batched", lambda rows: batched(rows, 1)):
+			job = self.run_csv("date,amount,description\n2026-04-01,3.50,Coffee\n2026-04-01,3.50,Coffee\n")
+		self.assertEqual((job.imported_rows, job.duplicate_rows), (2, 0))
+
+	def test_rows_already_stored_are_skipped(self):
+		Expense.objects.create(created_by=self.user, amount="3.50", date=date(2026, 4, 1), description="Coffee")
+		job = self.run_csv("date,amount,description\n2026-04-01,3.50,Coffee\n2026-04-02,8.00,Lunch\n")
+		self.assertEqual((job.imported_rows, job.duplicate_rows), (1, 1))
+		job = self.run_csv("date,amount,description\n2026-04-01,3.50,Coffee\n", dedupe=False)
+		self.assertEqual((job.imported_rows, job.duplicate_rows), (1, 0))
+
+	def test_row_errors_and_credits(self):
+		job = self.run_csv("date,amount,description\nyesterday,1,Bad date\n2026-04-01,-5,Refund\n2026-04-01,2,Ok\n")
+		self.assertEqual((job.total_rows, job.imported_rows, job.skipped_rows, job.error_rows), (3, 1, 1, 1))
+		self.assertEqual(job.errors[0]["line"], 2)
+
+
+class QueuedImportTests(TestCase):
+	"""Uploads are stored and answered at once; the worker runs them later."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create_user("uploader", password="x")
+		cls.user.groups.add(Group.objects.get_or_create(name=ROLE_USER)[0])
+
+	def setUp(self):
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		settings_override = override_settings(MEDIA_ROOT=media)
+		settings_override.enable()
+		self.addCleanup(settings_override.disable)
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def upload(self, text):
+		return self.client.post(
+			"/api/v1/expenses/imports/",
+			{
+				"file": SimpleUploadedFile("statement.csv", text.encode("utf-8"), content_type="text/csv"),
+				"column_mapping": '{"date": "date", "amount": "amount", "description": "description"}',
+			},
+			format="multipart",
+		)
+
+	def test_upload_is_queued_then_run_by_the_worker(self):
+		response = self.upload("date,amount,description\n2026-04-01,3.50,Coffee\n")
+		self.assertEqual(response.status_code, 202, response.data)
+		self.assertEqual(response.data["status"], ImportStatus.PENDING)
+		self.assertFalse(Expense.objects.exists())
+
+		job = ExpenseImport.objects.get(pk=response.data["id"])
+		self.assertTrue(job.file)
+		call_command("import_expenses_csv", pending=True, stdout=io.StringIO())
+
+		job.refresh_from_db()
+		self.assertEqual((job.status, job.imported_rows), (ImportStatus.COMPLETED, 1))
+		self.assertFalse(job.file)
+		self.assertEqual(Expense.objects.filter(created_by=self.user).count(), 1)
+		self.assertEqual(run_pending_imports(), 0)
+
+	def test_job_without_file_fails(self):
+		job = ExpenseImport.objects.create(created_by=self.user, column_mapping=MAPPING)
+		self.assertEqual(run_pending_imports(), 1)
+		job.refresh_from_db()
+		self.assertEqual(job.status, ImportStatus.FAILED)
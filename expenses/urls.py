@@ -1,8 +1,18 @@
+from django.urls import re_path
 from rest_framework.routers import SimpleRouter
 
-from expenses.views import ExpenseViewSet
+from expenses.views import ExpenseImportViewSet, ExpenseViewSet, ReceiptFileView
 
 router = SimpleRouter()
+# Registered before the expense routes so "imports/" is not taken for an expense id.
+router.register(r"imports", ExpenseImportViewSet, basename="expense-import")
 router.register(r"", ExpenseViewSet, basename="expense")
 
-urlpatterns = router.urls
+urlpatterns = [
+    re_path(
+        r"^receipts/(?P<digest>[0-9a-f]{64})/(?P<variant>original|thumbnail|preview)/$",
+        ReceiptFileView.as_view(),
+        name="expense-receipt-file",
+    ),
+    *router.urls,
+]
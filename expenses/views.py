@@ -1,11 +1,41 @@
+import functools
+
 import django_filters
-from rest_framework import viewsets
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+from django.http import Http404, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import generics, mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import SearchFilter
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
 
+from core.conditional import ConditionalGetMixin
+from core.fastlist import FastListMixin
+from core.fieldsets import SparseFieldsetMixin
+from core.pagination import ExpenseCursorPagination
 from core.permissions import IsUserOrAdminRole
 from core.rbac import is_admin
-from expenses.models import Expense
-from expenses.serializers import ExpenseSerializer
-from expenses.services import assert_expense_editable
+from core.sendfile import serve_file
+from categories.models import Category
+from expenses.archive import ArchivedRowFilter, archived_expense_page, wants_archived
+from expenses.duplicates import DuplicateExpense, DuplicateMode, duplicate_mode, find_duplicates, fingerprint_of
+from expenses.merchants import SUGGESTION_LIMIT, suggest_merchants
+from expenses.models import SEARCH_CONFIG, Expense, ExpenseImport, ReceiptBlob, ReceiptStatus
+from expenses.receipts import RASTER_CONTENT_TYPES, served_content_type
+from expenses.serializers import (
+    ExpenseBulkSerializer,
+    ExpenseImportCreateSerializer,
+    ExpenseImportSerializer,
+    ExpenseSerializer,
+    MerchantSerializer,
+)
+from expenses.services import BulkExpenseChanges, apply_bulk_expense_changes, assert_expense_editable
 
 
 class ExpenseFilter(django_filters.FilterSet):
@@ -13,20 +43,39 @@ class ExpenseFilter(django_filters.FilterSet):
 	end_date = django_filters.DateFilter(field_name="date", lookup_expr="lte")
 	min_amount = django_filters.NumberFilter(field_name="amount", lookup_expr="gte")
 	max_amount = django_filters.NumberFilter(field_name="amount", lookup_expr="lte")
+	# Full-text search over description/merchant/notes (web-search syntax:
+	# "quoted phrases", -excluded, or). Annotates `rank` for ordering.
+	q = django_filters.CharFilter(method="filter_search")
 
 	class Meta:
 		model = Expense
 		fields = ["category"]
 
+	def filter_search(self, queryset, name, value):
+		value = value.strip()
+		if not value:
+			return queryset
+		query = SearchQuery(value, search_type="websearch", config=SEARCH_CONFIG)
+		# ts_rank() is a float4; widen it so the value round-trips exactly through pagination cursors.
+		rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+		return queryset.filter(search_vector=query).annotate(rank=rank)
+
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ConditionalGetMixin, SparseFieldsetMixin, FastListMixin, viewsets.ModelViewSet):
 	serializer_class = ExpenseSerializer
 	permission_classes = [IsUserOrAdminRole]
-	queryset = Expense.objects.select_related("category").all()
+	queryset = Expense.objects.select_related("category", "created_by").defer("search_vector")
 	filterset_class = ExpenseFilter
+	pagination_class = ExpenseCursorPagination
 	search_fields = ["description", "merchant", "notes"]
 	ordering_fields = ["date", "amount", "created_at"]
-	ordering = ["-date", "-id"]
+
+	@property
+	def ordering(self):
+		# `?q=` results come best match first unless `?ordering=` says otherwise.
+		if self.request.query_params.get("q", "").strip():
+			return ["-rank", "-id"]
+		return ["-date", "-id"]
 
 	def get_queryset(self):
 		qs = super().get_queryset()
@@ -39,11 +88,296 @@ class ExpenseViewSet(viewsets.ModelViewSet):
 			return qs
 		return qs.filter(created_by=user)
 
+	def list(self, request, *args, **kwargs):
+		if not wants_archived(request):
+			return super().list(request, *args, **kwargs)
+
+		# Archived rows are read from their blobs and merged into the same keyset pages.
+		if request.query_params.get("q", "").strip():
+			raise serializers.ValidationError({"include_archived": "Cannot be combined with q; use search"})
+		queryset = self.filter_queryset(self.get_queryset())
+		if self.paginator.get_ordering(queryset).lstrip("-") != "date":
+			raise serializers.ValidationError({"include_archived": "Archived rows can only be listed in date order"})
+		owner_ids = [request.user.pk]
+		if is_admin(request.user):
+			# Reading every user's archives on each page would not scale.
+			if not request.query_params.get("user"):
+				raise serializers.ValidationError({"user": "Required with include_archived"})
+			owner_ids = [request.query_params["user"]]
+		filters = ExpenseFilter(request.query_params, queryset=queryset)
+		filters.is_valid()
+		cleaned = filters.form.cleaned_data
+		row_filter = ArchivedRowFilter(
+			start=cleaned.get("start_date"),
+			end=cleaned.get("end_date"),
+			category_id=cleaned["category"].pk if cleaned.get("category") else None,
+			min_amount=cleaned.get("min_amount"),
+			max_amount=cleaned.get("max_amount"),
+			search=[term.lower() for term in SearchFilter().get_search_terms(request)],
+		)
+		archived = functools.partial(archived_expense_page, owner_ids=owner_ids, row_filter=row_filter)
+		page = self.paginator.paginate_queryset(queryset, request, view=self, extra_rows=archived)
+		return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+	def create(self, request, *args, **kwargs):
+		response = super().create(request, *args, **kwargs)
+		response.data["possible_duplicate_of"] = self._possible_duplicate_of
+		return response
+
+	# Writes are atomic so the expense row and its derived data (rollups etc.,
+	# maintained by `expenses_changed` receivers) commit or roll back together.
+	@transaction.atomic
+	def perform_create(self, serializer):
+		fingerprint = fingerprint_of(serializer.validated_data)
+		matches = find_duplicates(owner_id=self.request.user.pk, fingerprints=[fingerprint])
+		self._possible_duplicate_of = matches.get(fingerprint)
+		if self._possible_duplicate_of is not None and duplicate_mode(self.request) == DuplicateMode.REJECT:
+			raise DuplicateExpense(self._possible_duplicate_of)
+		return super().perform_create(serializer)
+
+	@transaction.atomic
 	def perform_update(self, serializer):
 		instance = self.get_object()
 		assert_expense_editable(expense=instance, actor=self.request.user)
 		return super().perform_update(serializer)
 
+	@transaction.atomic
 	def perform_destroy(self, instance):
 		assert_expense_editable(expense=instance, actor=self.request.user)
 		return super().perform_destroy(instance)
+
+	@action(detail=False, methods=["post"])
+	def bulk(self, request):
+		"""Create, update and delete many expenses in one transaction.
+
+		Body: `{"create": [...], "update": [{"id": ..., ...}], "delete": [ids]}`.
+		Nothing is written unless every item validates; the response lists a
+		result per item either way. Created items that look like an existing
+		expense (or an earlier item) carry `possible_duplicate_of`; with
+		`?on_duplicate=reject` they fail instead.
+		"""
+		envelope = ExpenseBulkSerializer(data=request.data)
+		envelope.is_valid(raise_exception=True)
+		data = envelope.validated_data
+
+		actor = request.user
+		actor_is_admin = is_admin(actor)
+		context = {
+			**self.get_serializer_context(),
+			"actor_is_admin": actor_is_admin,
+			"category_map": self._category_map(data["create"] + data["update"]),
+		}
+
+		ids = [item["id"] for item in data["update"]] + list(data["delete"])
+		scope = Expense.objects.all() if actor_is_admin else Expense.objects.filter(created_by=actor)
+		existing = {expense.pk: expense for expense in scope.filter(pk__in=ids)} if ids else {}
+
+		changes = BulkExpenseChanges()
+		results = []
+		failed = False
+
+		valid_creates = []
+		for index, item in enumerate(data["create"]):
+			serializer = ExpenseSerializer(data=item, context=context)
+			if serializer.is_valid():
+				expense = Expense(created_by=actor, **serializer.validated_data)
+				result = {"op": "create", "index": index, "status": "ok"}
+				valid_creates.append((expense, result))
+				results.append(result)
+			else:
+				failed = True
+				results.append({"op": "create", "index": index, "status": "invalid", "errors": serializer.errors})
+
+		# One indexed lookup for every created item; repeats within the batch refer to their first occurrence.
+		reject = duplicate_mode(request) == DuplicateMode.REJECT
+		existing_duplicates = find_duplicates(
+			owner_id=actor.pk, fingerprints=[expense.refresh_fingerprint() for expense, _ in valid_creates]
+		)
+		first_in_batch = {}
+		batch_duplicates = []
+		for expense, result in valid_creates:
+			duplicate_of = existing_duplicates.get(expense.fingerprint)
+			earlier = first_in_batch.setdefault(expense.fingerprint, expense)
+			if duplicate_of is None and earlier is expense:
+				changes.create.append(expense)
+				continue
+			if reject:
+				failed = True
+				result["status"] = "invalid"
+				result["errors"] = {"detail": "Possible duplicate of an existing expense."}
+				if duplicate_of is not None:
+					result["possible_duplicate_of"] = duplicate_of
+				continue
+			changes.create.append(expense)
+			if duplicate_of is not None:
+				result["possible_duplicate_of"] = duplicate_of
+			else:
+				# Filled in once the earlier item has been saved.
+				batch_duplicates.append((result, earlier))
+
+		for index, item in enumerate(data["update"]):
+			instance, errors = self._bulk_target(existing, item["id"], actor, actor_is_admin)
+			if instance is not None:
+				serializer = ExpenseSerializer(instance, data=item, partial=True, context=context)
+				if serializer.is_valid():
+					changes.update.append((instance, serializer.validated_data))
+				else:
+					errors = serializer.errors
+			if errors:
+				failed = True
+				results.append({"op": "update", "index": index, "id": item["id"], "status": "invalid", "errors": errors})
+			else:
+				results.append({"op": "update", "index": index, "id": item["id"], "status": "ok"})
+
+		for index, pk in enumerate(data["delete"]):
+			instance, errors = self._bulk_target(existing, pk, actor, actor_is_admin)
+			if errors:
+				failed = True
+				results.append({"op": "delete", "index": index, "id": pk, "status": "invalid", "errors": errors})
+			else:
+				changes.delete.append(instance)
+				results.append({"op": "delete", "index": index, "id": pk, "status": "ok"})
+
+		if failed:
+			return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+		apply_bulk_expense_changes(changes)
+
+		created = iter(changes.create)
+		for result in results:
+			if result["op"] == "create":
+				result["id"] = next(created).pk
+			result["status"] = {"create": "created", "update": "updated", "delete": "deleted"}[result["op"]]
+		for result, earlier in batch_duplicates:
+			result["possible_duplicate_of"] = earlier.pk
+
+		return Response(
+			{
+				"created": len(changes.create),
+				"updated": len(changes.update),
+				"deleted": len(changes.delete),
+				"results": results,
+			}
+		)
+
+	@action(detail=False, methods=["get"])
+	def merchants(self, request):
+		"""Autocomplete: `?q=<typed text>&limit=10` over the caller's merchant dictionary."""
+		try:
+			limit = int(request.query_params.get("limit", SUGGESTION_LIMIT))
+		except ValueError:
+			limit = SUGGESTION_LIMIT
+		suggestions = suggest_merchants(owner=request.user, query=request.query_params.get("q", ""), limit=limit)
+		return Response(MerchantSerializer(suggestions, many=True).data)
+
+	@staticmethod
+	def _category_map(items) -> dict[int, Category]:
+		ids = set()
+		for item in items:
+			value = item.get("category")
+			if value in (None, "") or isinstance(value, bool):
+				continue
+			try:
+				ids.add(int(value))
+			except (TypeError, ValueError):
+				continue
+		if not ids:
+			return {}
+		return {category.pk: category for category in Category.objects.filter(pk__in=ids)}
+
+	@staticmethod
+	def _bulk_target(existing, pk, actor, actor_is_admin):
+		instance = existing.get(pk)
+		if instance is None:
+			return None, {"detail": "Not found."}
+		try:
+			assert_expense_editable(expense=instance, actor=actor, actor_is_admin=actor_is_admin)
+		except serializers.ValidationError as exc:
+			return None, exc.detail
+		return instance, None
+
+
+class ExpenseImportViewSet(
+	mixins.CreateModelMixin,
+	mixins.ListModelMixin,
+	mixins.RetrieveModelMixin,
+	viewsets.GenericViewSet,
+):
+	"""Upload a bank-statement CSV and inspect the resulting import jobs.
+
+	An upload is stored and answered with its `pending` job straight away; the
+	`import_expenses_csv --pending` worker runs it, and the job's status and
+	counts show its progress.
+	"""
+	serializer_class = ExpenseImportSerializer
+	permission_classes = [IsUserOrAdminRole]
+	parser_classes = [MultiPartParser, FormParser]
+	ordering = ["-created_at"]
+
+	def get_queryset(self):
+		return ExpenseImport.objects.filter(created_by=self.request.user)
+
+	def create(self, request, *args, **kwargs):
+		upload = ExpenseImportCreateSerializer(data=request.data, context=self.get_serializer_context())
+		upload.is_valid(raise_exception=True)
+		data = upload.validated_data
+
+		job = ExpenseImport.objects.create(
+			created_by=request.user,
+			filename=data["file"].name[:255],
+			file=data["file"],
+			column_mapping=data["column_mapping"],
+			options=data["options"],
+		)
+		return Response(ExpenseImportSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReceiptFileView(generics.GenericAPIView):
+	"""`GET /expenses/receipts/<digest>/<variant>/` -- a receipt or one of its renditions.
+
+	Only the owner of an expense using the receipt (or an admin) may fetch it;
+	the bytes are then handed to the front web server when one is configured
+	(see core/sendfile.py). The URL names content by digest, so a rendered
+	variant never changes and is sent with a year-long immutable cache
+	lifetime. Until the thumbnail or preview is rendered the original image
+	is served instead, uncached.
+	"""
+	permission_classes = [IsUserOrAdminRole]
+	immutable_max_age = 365 * 24 * 3600
+
+	def get(self, request, digest, variant):
+		blobs = ReceiptBlob.objects.filter(pk=digest)
+		if not is_admin(request.user):
+			blobs = blobs.filter(Q(expenses__created_by=request.user) | Q(archives__created_by=request.user))
+		blob = blobs.first()
+		if blob is None:
+			raise Http404
+
+		name = blob.file.name if variant == "original" else getattr(blob, variant).name
+		content_type = served_content_type(blob.content_type) if variant == "original" else "image/jpeg"
+		if not name:
+			if blob.status != ReceiptStatus.PENDING or blob.content_type not in RASTER_CONTENT_TYPES:
+				raise Http404
+			response = serve_file(request, default_storage, blob.file.name, content_type=blob.content_type)
+			self._protect(response, blob.content_type)
+			patch_cache_control(response, private=True, no_cache=True)
+			return response
+
+		etag = f'"{digest}-{variant}"'
+		if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+			response = HttpResponseNotModified()
+			response["ETag"] = etag
+		else:
+			response = serve_file(request, default_storage, name, content_type=content_type, etag=etag)
+		self._protect(response, content_type)
+		if response.status_code in (200, 206, 304):
+			patch_cache_control(response, private=True, max_age=self.immutable_max_age, immutable=True)
+		return response
+
+	@staticmethod
+	def _protect(response, content_type: str) -> None:
+		# Uploaded bytes are served from the API origin: never let the browser
+		# sniff them into something active, and only render raster images inline.
+		response["X-Content-Type-Options"] = "nosniff"
+		if content_type not in RASTER_CONTENT_TYPES:
+			response["Content-Disposition"] = "attachment"
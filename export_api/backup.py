@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import chain
+from typing import Iterator
+
+from django.utils import timezone
+
+from budgets.models import Budget
+from categories.models import Category
+from expenses.archive import archived_records
+from expenses.models import Expense
+from export_api.streaming import EXPORT_CHUNK_SIZE
+
+BACKUP_FORMAT_VERSION = 1
+
+BACKUP_SECTIONS = (
+	(
+		"categories",
+		Category,
+		("id", "name", "is_system", "icon", "color_token", "created_at", "updated_at"),
+	),
+	(
+		"budgets",
+		Budget,
+		(
+			"id",
+			"month",
+			"scope",
+			"category_id",
+			"amount",
+			"rollover_enabled",
+			"warn_threshold",
+			"created_at",
+			"updated_at",
+		),
+	),
+	(
+		"expenses",
+		Expense,
+		(
+			"id",
+			"amount",
+			"currency",
+			"date",
+			"description",
+			"category_id",
+			"payment_method",
+			"merchant",
+			"notes",
+			"receipt",
+			"created_at",
+			"updated_at",
+		),
+	),
+)
+
+
+def _default(o):
+	# Decimals keep their exact string form; dates/datetimes go out as ISO 8601.
+	if isinstance(o, Decimal):
+		return str(o)
+	if isinstance(o, (date, datetime)):
+		return o.isoformat()
+	return str(o)
+
+
+_encode = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":")).encode
+
+
+def _section_rows(model, fields, owner, include_archived=False):
+	qs = model.objects.all()
+	if owner is not None:
+		qs = qs.filter(created_by=owner)
+	rows = qs.order_by("id").values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+	if model is Expense and include_archived:
+		# Archived expenses (older, so mostly lower ids) go first, then the live table.
+		archived = archived_records(owner_ids=None if owner is None else [owner.pk])
+		return chain(({name: record[name] for name in fields} for record in archived), rows)
+	return rows
+
+
+def ndjson_backup(*, owner=None, include_archived: bool = False) -> Iterator[str]:
+	"""Newline-delimited backup: a header line, then per section a marker line and one line per row."""
+	yield _encode(
+		{
+			"format": "expense-tracker-backup",
+			"version": BACKUP_FORMAT_VERSION,
+			"exported_at": timezone.now(),
+		}
+	) + "\n"
+	for section, model, fields in BACKUP_SECTIONS:
+		yield _encode({"section": section}) + "\n"
+		lines = []
+		for row in _section_rows(model, fields, owner, include_archived):
+			lines.append(_encode(row))
+			if len(lines) >= EXPORT_CHUNK_SIZE:
+				yield "\n".join(lines) + "\n"
+				lines = []
+		if lines:
+			yield "\n".join(lines) + "\n"
+
+
+def json_backup(*, owner=None, include_archived: bool = False) -> Iterator[str]:
+	"""The classic `{"categories": [...], "budgets": [...], "expenses": [...]}` document, streamed."""
+	yield "{"
+	for index, (section, model, fields) in enumerate(BACKUP_SECTIONS):
+		yield ("," if index else "") + _encode(section) + ":["
+		lines = []
+		first = True
+		for row in _section_rows(model, fields, owner, include_archived):
+			lines.append(_encode(row))
+			if len(lines) >= EXPORT_CHUNK_SIZE:
+				yield ("" if first else ",") + ",".join(lines)
+				first = False
+				lines = []
+		if lines:
+			yield ("" if first else ",") + ",".join(lines)
+		yield "]"
+	yield "}"
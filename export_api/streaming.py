@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import csv
+import io
+import zlib
+from itertools import islice
+from typing import Iterable, Iterator
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def wants_gzip(request) -> bool:
+	"""Compress when asked explicitly (?compress=gzip) or when the client accepts it."""
+	requested = (request.query_params.get("compress") or "").lower()
+	if requested in ("none", "identity", "0"):
+		return False
+	if requested == "gzip":
+		return True
+	return "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "").lower()
+
+
+def chunked(iterable: Iterable, size: int = EXPORT_CHUNK_SIZE) -> Iterator[list]:
+	iterator = iter(iterable)
+	while batch := list(islice(iterator, size)):
+		yield batch
+
+
+def csv_stream(header: list[str], rows: Iterable[Iterable], *, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+	"""Yield CSV text one chunk of rows at a time; the header goes out before any query runs."""
+	buffer = io.StringIO()
+	writer = csv.writer(buffer)
+
+	writer.writerow(header)
+	yield buffer.getvalue()
+
+	for batch in chunked(rows, chunk_size):
+		buffer.seek(0)
+		buffer.truncate()
+		writer.writerows(batch)
+		yield buffer.getvalue()
+
+
+def gzip_stream(chunks: Iterable[str | bytes], *, level: int = 6) -> Iterator[bytes]:
+	compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+	for chunk in chunks:
+		data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+		if data:
+			yield data
+	yield compressor.flush()
+
+
+def encode_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+	for chunk in chunks:
+		yield chunk.encode("utf-8")
@@ -1,8 +1,9 @@
 from django.urls import path
 
-from export_api.views import BackupJsonExportView, ExpensesCsvExportView
+from export_api.views import BackupJsonExportView, BackupNdjsonExportView, ExpensesCsvExportView
 
 urlpatterns = [
     path("expenses.csv", ExpensesCsvExportView.as_view(), name="export-expenses-csv"),
     path("backup.json", BackupJsonExportView.as_view(), name="export-backup-json"),
+    path("backup.ndjson", BackupNdjsonExportView.as_view(), name="export-backup-ndjson"),
 ]
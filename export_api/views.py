@@ -1,141 +1,149 @@
-import csv
-import json
-from decimal import Decimal
+from itertools import chain
 
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.utils.dateparse import parse_date
 from rest_framework import generics
-from rest_framework.response import Response
 
-from budgets.models import Budget
-from categories.models import Category
 from core.permissions import IsUserOrAdminRole
 from core.rbac import is_admin
+from categories.models import Category
+from expenses.archive import archived_records, wants_archived
 from expenses.models import Expense
+from export_api.backup import json_backup, ndjson_backup
+from export_api.streaming import EXPORT_CHUNK_SIZE, csv_stream, encode_stream, gzip_stream, wants_gzip
 
 
 class ExpensesCsvExportView(generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
 
+	header = [
+		"id",
+		"date",
+		"amount",
+		"currency",
+		"description",
+		"category",
+		"payment_method",
+		"merchant",
+		"notes",
+		"created_at",
+	]
+
 	def get(self, request, *args, **kwargs):
 		start_param = request.query_params.get("start")
 		end_param = request.query_params.get("end")
 		start = parse_date(start_param) if start_param else None
 		end = parse_date(end_param) if end_param else None
 
-		qs = Expense.objects.select_related("category").all()
+		qs = Expense.objects.all()
 		if not is_admin(request.user):
 			qs = qs.filter(created_by=request.user)
 		if start:
 			qs = qs.filter(date__gte=start)
 		if end:
 			qs = qs.filter(date__lte=end)
-		qs = qs.order_by("date", "id")
+		qs = qs.order_by("date", "id").values_list(
+			"id",
+			"date",
+			"amount",
+			"currency",
+			"description",
+			"category__name",
+			"payment_method",
+			"merchant",
+			"notes",
+			"created_at",
+		)
 
-		response = HttpResponse(content_type="text/csv")
-		response["Content-Disposition"] = "attachment; filename=expenses.csv"
+		rows = self._rows(qs)
+		if wants_archived(request):
+			owner_ids = None if is_admin(request.user) else [request.user.pk]
+			rows = chain(self._archived_rows(archived_records(owner_ids=owner_ids, start=start, end=end)), rows)
 
-		writer = csv.writer(response)
-		writer.writerow(
-			[
-				"id",
-				"date",
-				"amount",
-				"currency",
-				"description",
-				"category",
-				"payment_method",
-				"merchant",
-				"notes",
-				"created_at",
-			]
+		stream = csv_stream(self.header, rows)
+		compress = wants_gzip(request)
+		response = StreamingHttpResponse(
+			gzip_stream(stream) if compress else encode_stream(stream),
+			content_type="text/csv; charset=utf-8",
 		)
+		if compress:
+			response["Content-Encoding"] = "gzip"
+		response["Vary"] = "Accept-Encoding"
+		response["Content-Disposition"] = "attachment; filename=expenses.csv"
+		return response
 
-		for e in qs:
-			writer.writerow(
-				[
-					e.id,
-					e.date.isoformat(),
-					str(e.amount),
-					e.currency,
-					e.description,
-					getattr(e.category, "name", ""),
-					e.payment_method,
-					e.merchant,
-					e.notes,
-					e.created_at.isoformat() if e.created_at else "",
-				]
+	@staticmethod
+	def _rows(qs):
+		# Tuples straight off a server-side cursor: no model instances, no result cache.
+		for pk, day, amount, currency, description, category, payment_method, merchant, notes, created_at in qs.iterator(
+			chunk_size=EXPORT_CHUNK_SIZE
+		):
+			yield (
+				pk,
+				day.isoformat(),
+				str(amount),
+				currency,
+				description,
+				category or "",
+				payment_method,
+				merchant,
+				notes,
+				created_at.isoformat() if created_at else "",
 			)
 
-		return response
+	@staticmethod
+	def _archived_rows(records):
+		category_names = dict(Category.objects.values_list("id", "name"))
+		for record in records:
+			yield (
+				record["id"],
+				record["date"].isoformat(),
+				str(record["amount"]),
+				record["currency"],
+				record["description"],
+				category_names.get(record["category_id"], ""),
+				record["payment_method"],
+				record["merchant"],
+				record["notes"],
+				record["created_at"].isoformat() if record["created_at"] else "",
+			)
 
 
 class BackupJsonExportView(generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
 
 	def get(self, request, *args, **kwargs):
-		if is_admin(request.user):
-			categories = Category.objects.all()
-			expenses = Expense.objects.all()
-			budgets = Budget.objects.all()
-		else:
-			categories = Category.objects.filter(created_by=request.user)
-			expenses = Expense.objects.filter(created_by=request.user)
-			budgets = Budget.objects.filter(created_by=request.user)
-
-		payload = {
-			"categories": [
-				{
-					"id": c.id,
-					"name": c.name,
-					"is_system": c.is_system,
-					"icon": c.icon,
-					"color_token": c.color_token,
-					"created_at": c.created_at,
-					"updated_at": c.updated_at,
-				}
-				for c in categories
-			],
-			"budgets": [
-				{
-					"id": b.id,
-					"month": b.month,
-					"scope": b.scope,
-					"category_id": b.category_id,
-					"amount": b.amount,
-					"rollover_enabled": b.rollover_enabled,
-					"warn_threshold": b.warn_threshold,
-					"created_at": b.created_at,
-					"updated_at": b.updated_at,
-				}
-				for b in budgets
-			],
-			"expenses": [
-				{
-					"id": e.id,
-					"amount": e.amount,
-					"currency": e.currency,
-					"date": e.date,
-					"description": e.description,
-					"category_id": e.category_id,
-					"payment_method": e.payment_method,
-					"merchant": e.merchant,
-					"notes": e.notes,
-					"receipt": e.receipt.name if e.receipt else "",
-					"created_at": e.created_at,
-					"updated_at": e.updated_at,
-				}
-				for e in expenses
-			],
-		}
-
-		# Ensure Decimal/Date serialize cleanly
-		def default(o):
-			if isinstance(o, Decimal):
-				return str(o)
-			if hasattr(o, "isoformat"):
-				return o.isoformat()
-			return str(o)
-
-		raw = json.loads(json.dumps(payload, default=default))
-		return Response(raw)
+		owner = None if is_admin(request.user) else request.user
+		return _streaming_backup(
+			request,
+			json_backup(owner=owner, include_archived=wants_archived(request)),
+			content_type="application/json",
+			filename="backup.json",
+		)
+
+
+class BackupNdjsonExportView(generics.GenericAPIView):
+	"""Streaming backup as newline-delimited JSON sections (O(chunk) memory)."""
+	permission_classes = [IsUserOrAdminRole]
+
+	def get(self, request, *args, **kwargs):
+		owner = None if is_admin(request.user) else request.user
+		return _streaming_backup(
+			request,
+			ndjson_backup(owner=owner, include_archived=wants_archived(request)),
+			content_type="application/x-ndjson",
+			filename="backup.ndjson",
+		)
+
+
+def _streaming_backup(request, stream, *, content_type: str, filename: str) -> StreamingHttpResponse:
+	compress = wants_gzip(request)
+	response = StreamingHttpResponse(
+		gzip_stream(stream) if compress else encode_stream(stream),
+		content_type=f"{content_type}; charset=utf-8",
+	)
+	if compress:
+		response["Content-Encoding"] = "gzip"
+	response["Vary"] = "Accept-Encoding"
+	response["Content-Disposition"] = f"attachment; filename={filename}"
+	return response
@@ -64,6 +64,7 @@ export default function AddExpenseModal({ categories, onClose, onSuccess }) {
   const [error, setError] = useState('')
   const [allocatedCategoryIds, setAllocatedCategoryIds] = useState(null)
   const [loadingAllocations, setLoadingAllocations] = useState(true)
+  const [merchantSuggestions, setMerchantSuggestions] = useState([])
 
   // Fetch allocated categories on mount
   useEffect(() => {
@@ -97,6 +98,23 @@ export default function AddExpenseModal({ categories, onClose, onSuccess }) {
     }
   }, [loadingAllocations, displayCategories])
 
+  // Merchant autocomplete, debounced per keystroke
+  useEffect(() => {
+    let cancelled = false
+    const timer = setTimeout(async () => {
+      try {
+        const response = await expensesAPI.merchants(formData.merchant)
+        if (!cancelled) setMerchantSuggestions(response.data)
+      } catch (error) {
+        if (!cancelled) setMerchantSuggestions([])
+      }
+    }, 150)
+    return () => {
+      cancelled = true
+      clearTimeout(timer)
+    }
+  }, [formData.merchant])
+
   const handleSubmit = async (e) => {
     e.preventDefault()
     if (!formData.description || !formData.amount) return
@@ -264,8 +282,15 @@ export default function AddExpenseModal({ categories, onClose, onSuccess }) {
                 value={formData.merchant}
                 onChange={(e) => setFormData({ ...formData, merchant: e.target.value })}
                 placeholder="Store or vendor name"
+                list="merchant-suggestions"
+                autoComplete="off"
                 className="w-full bg-slate-800 border border-slate-700 rounded-xl px-4 py-3 text-white placeholder-slate-500 focus:outline-none focus:border-violet-500 transition-colors text-base"
               />
+              <datalist id="merchant-suggestions">
+                {merchantSuggestions.map((merchant) => (
+                  <option key={merchant.name} value={merchant.name} />
+                ))}
+              </datalist>
             </div>
 
             <div>
@@ -43,7 +43,7 @@ export function OnboardingProvider({ children }) {
   const checkActualProgress = async (currentState, storageKey) => {
     try {
       // Check if user has expenses
-      const expensesRes = await expensesAPI.list({ limit: 1 })
+      const expensesRes = await expensesAPI.list({ page_size: 1, fields: 'id' })
       const expensesData = expensesRes.data?.results ?? expensesRes.data
       const hasExpenses = Array.isArray(expensesData) && expensesData.length > 0
       
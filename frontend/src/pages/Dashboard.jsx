@@ -89,7 +89,7 @@ export default function Dashboard() {
   const fetchDashboardData = async () => {
     try {
       const [expensesRes, categoriesRes, summaryRes, budgetRes, timeseriesRes] = await Promise.all([
-        expensesAPI.list({ ordering: '-date', limit: 10 }),
+        expensesAPI.list({ ordering: '-date', page_size: 10, fields: 'id,amount,date,description,category' }),
         categoriesAPI.list(),
         reportsAPI.getSummary(monthStart, monthEnd),
         budgetsAPI.getStatus(currentMonth),
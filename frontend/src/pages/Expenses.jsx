@@ -26,6 +26,9 @@ const iconMap = {
 
 const getIcon = (iconName) => iconMap[iconName] || Wallet
 
+// The expenses list is cursor-paginated; keep only the opaque cursor from next/previous links.
+const cursorFrom = (link) => (link ? new URL(link).searchParams.get('cursor') : null)
+
 export default function Expenses() {
   const { isAdmin } = useAuth()
   const { incrementExpenseCount } = useOnboarding()
@@ -42,15 +45,19 @@ export default function Expenses() {
     date_to: '',
   })
   const [showFilters, setShowFilters] = useState(false)
-  const [pagination, setPagination] = useState({ page: 1, total: 0, pageSize: 20 })
+  const [pagination, setPagination] = useState({ page: 1, cursor: null, next: null, previous: null, pageSize: 20 })
 
   useEffect(() => {
     fetchCategories()
   }, [])
 
+  useEffect(() => {
+    setPagination(prev => ({ ...prev, page: 1, cursor: null }))
+  }, [filters])
+
   useEffect(() => {
     fetchExpenses()
-  }, [filters, pagination.page])
+  }, [filters, pagination.cursor])
 
   const fetchCategories = async () => {
     try {
@@ -67,9 +74,10 @@ export default function Expenses() {
     try {
       const params = {
         ordering: '-date',
-        page: pagination.page,
         page_size: pagination.pageSize,
+        fields: 'id,amount,date,description,category,merchant,notes',
       }
+      if (pagination.cursor) params.cursor = pagination.cursor
       if (filters.search) params.search = filters.search
       if (filters.category) params.category = filters.category
       if (filters.date_from) params.date_from = filters.date_from
@@ -80,7 +88,8 @@ export default function Expenses() {
       setExpenses(Array.isArray(expensesData) ? expensesData : [])
       setPagination(prev => ({
         ...prev,
-        total: response.data.count || response.data.length,
+        next: cursorFrom(response.data?.next),
+        previous: cursorFrom(response.data?.previous),
       }))
     } catch (error) {
       console.error('Error fetching expenses:', error)
@@ -101,7 +110,6 @@ export default function Expenses() {
 
   const getCategoryById = (id) => categories.find(c => c.id === id)
 
-  const totalPages = Math.ceil(pagination.total / pagination.pageSize)
 
   return (
     <div className="space-y-6">
@@ -324,26 +332,26 @@ export default function Expenses() {
         )}
 
         {/* Pagination */}
-        {totalPages > 1 && (
+        {(pagination.next || pagination.previous) && (
           <div className="flex items-center justify-between p-4 border-t border-slate-800">
             <p className="text-sm text-slate-400">
               Showing {(pagination.page - 1) * pagination.pageSize + 1} to{' '}
-              {Math.min(pagination.page * pagination.pageSize, pagination.total)} of {pagination.total}
+              {(pagination.page - 1) * pagination.pageSize + expenses.length}
             </p>
             <div className="flex items-center gap-2">
               <button
-                onClick={() => setPagination(prev => ({ ...prev, page: prev.page - 1 }))}
-                disabled={pagination.page === 1}
+                onClick={() => setPagination(prev => ({ ...prev, page: prev.page - 1, cursor: prev.previous }))}
+                disabled={!pagination.previous}
                 className="p-2 rounded-lg bg-slate-800 text-slate-400 hover:text-white disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
               >
                 <ChevronLeft size={18} />
               </button>
               <span className="px-3 py-1 text-sm text-slate-300">
-                {pagination.page} / {totalPages}
+                {pagination.page}
               </span>
               <button
-                onClick={() => setPagination(prev => ({ ...prev, page: prev.page + 1 }))}
-                disabled={pagination.page >= totalPages}
+                onClick={() => setPagination(prev => ({ ...prev, page: prev.page + 1, cursor: prev.next }))}
+                disabled={!pagination.next}
                 className="p-2 rounded-lg bg-slate-800 text-slate-400 hover:text-white disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
               >
                 <ChevronRight size={18} />
@@ -111,6 +111,7 @@ export const expensesAPI = {
   create: (data) => api.post('/expenses/', data),
   update: (id, data) => api.patch(`/expenses/${id}/`, data),
   delete: (id) => api.delete(`/expenses/${id}/`),
+  merchants: (q, limit = 8) => api.get('/expenses/merchants/', { params: { q, limit } }),
 }
 
 // Budgets API
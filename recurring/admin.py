@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from recurring.models import Occurrence, Recurrence
+
+
+@admin.register(Recurrence)
+class RecurrenceAdmin(admin.ModelAdmin):
+	list_display = ("id", "created_by", "kind", "frequency", "interval", "amount", "next_date", "active")
+	list_filter = ("kind", "frequency", "active")
+	search_fields = ("description", "merchant")
+	raw_id_fields = ("created_by", "category", "income_source")
+	readonly_fields = ("next_date", "occurrence_count")
+
+
+@admin.register(Occurrence)
+class OccurrenceAdmin(admin.ModelAdmin):
+	list_display = ("id", "recurrence", "date", "expense", "income", "created_at")
+	raw_id_fields = ("recurrence", "expense", "income")
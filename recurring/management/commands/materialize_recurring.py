@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from recurring.services import materialize_due
+
+
+class Command(BaseCommand):
+    help = "Create the expenses and incomes recurring rules are due for, catching up on any missed dates"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Materialize up to this date (YYYY-MM-DD); defaults to today")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rules claimed per transaction")
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            today = parse_date(options["date"])
+            if today is None:
+                raise CommandError("--date must be YYYY-MM-DD")
+
+        result = materialize_due(today=today, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {result.rules} rules: created {result.expenses} expenses and {result.incomes} incomes"
+            )
+        )
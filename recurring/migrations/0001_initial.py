@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('budgets', '0002_budget_allocation_percentage_incomesource_income_and_more'),
+        ('categories', '0002_remove_category_uniq_category_name_per_user_and_more'),
+        ('expenses', '0007_expense_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('expense', 'Expense'), ('income', 'Income')], max_length=16)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('yearly', 'Yearly')], max_length=16)),
+                ('interval', models.PositiveSmallIntegerField(default=1)),
+                ('weekdays', models.JSONField(blank=True, default=list, help_text="Weekly: 0=Monday .. 6=Sunday; empty means start_date's weekday")),
+                ('month_day', models.SmallIntegerField(blank=True, help_text="Monthly: 1-31 (clamped to the month's length) or -1 for the last day", null=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('max_occurrences', models.PositiveIntegerField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('next_date', models.DateField(blank=True, editable=False, null=True)),
+                ('occurrence_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('currency', models.CharField(default='BDT', max_length=8)),
+                ('description', models.TextField(blank=True)),
+                ('merchant', models.CharField(blank=True, max_length=120)),
+                ('payment_method', models.CharField(blank=True, max_length=32)),
+                ('notes', models.TextField(blank=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurrences', to='categories.category')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(app_label)s_%(class)s_created', to=settings.AUTH_USER_MODEL)),
+                ('income_source', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurrences', to='budgets.incomesource')),
+            ],
+            options={
+                'ordering': ['next_date', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Occurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expense', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.expense')),
+                ('income', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='budgets.income')),
+                ('recurrence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='recurring.recurrence')),
+            ],
+            options={
+                'ordering': ['recurrence', 'date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recurrence',
+            index=models.Index(condition=models.Q(('active', True)), fields=['next_date'], name='idx_recurrence_due'),
+        ),
+        migrations.AddIndex(
+            model_name='recurrence',
+            index=models.Index(fields=['created_by', 'kind'], name='idx_recurrence_user_kind'),
+        ),
+        migrations.AddConstraint(
+            model_name='occurrence',
+            constraint=models.UniqueConstraint(fields=('recurrence', 'date'), name='uniq_occurrence_recurrence_date'),
+        ),
+    ]
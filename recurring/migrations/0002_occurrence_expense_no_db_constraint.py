@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0008_fxrate_expense_amount_base'),
+        ('recurring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='occurrence',
+            name='expense',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='expenses.expense'),
+        ),
+    ]
@@ -0,0 +1,102 @@
+from django.db import models
+from django.db.models import Q
+
+from budgets.models import Income, IncomeSource
+from categories.models import Category
+from core.models import OwnedModel
+from expenses.models import Expense
+
+
+class RecurrenceKind(models.TextChoices):
+	EXPENSE = "expense", "Expense"
+	INCOME = "income", "Income"
+
+
+class Frequency(models.TextChoices):
+	DAILY = "daily", "Daily"
+	WEEKLY = "weekly", "Weekly"
+	MONTHLY = "monthly", "Monthly"
+	YEARLY = "yearly", "Yearly"
+
+
+class Recurrence(OwnedModel):
+	"""A rule that creates an expense or income on a schedule (see recurring/services.py).
+
+	The schedule is RRULE-like: every `interval` days/weeks/months/years from
+	`start_date`, on `weekdays` (weekly) or `month_day` (monthly), until
+	`end_date` or `max_occurrences`.
+	"""
+	kind = models.CharField(max_length=16, choices=RecurrenceKind.choices)
+	frequency = models.CharField(max_length=16, choices=Frequency.choices)
+	interval = models.PositiveSmallIntegerField(default=1)
+	weekdays = models.JSONField(
+		default=list, blank=True, help_text="Weekly: 0=Monday .. 6=Sunday; empty means start_date's weekday"
+	)
+	month_day = models.SmallIntegerField(
+		null=True, blank=True, help_text="Monthly: 1-31 (clamped to the month's length) or -1 for the last day"
+	)
+	start_date = models.DateField()
+	end_date = models.DateField(null=True, blank=True)
+	max_occurrences = models.PositiveIntegerField(null=True, blank=True)
+	active = models.BooleanField(default=True)
+
+	# Scheduler state: the next date to materialize (None once the rule has ended).
+	next_date = models.DateField(null=True, blank=True, editable=False)
+	occurrence_count = models.PositiveIntegerField(default=0, editable=False)
+
+	# Template for the rows each occurrence creates.
+	amount = models.DecimalField(max_digits=12, decimal_places=2)
+	currency = models.CharField(max_length=8, default="BDT")
+	description = models.TextField(blank=True)
+	category = models.ForeignKey(
+		Category,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="recurrences",
+	)
+	merchant = models.CharField(max_length=120, blank=True)
+	payment_method = models.CharField(max_length=32, blank=True)
+	notes = models.TextField(blank=True)
+	income_source = models.ForeignKey(
+		IncomeSource,
+		on_delete=models.SET_NULL,
+		null=True,
+		blank=True,
+		related_name="recurrences",
+	)
+
+	class Meta:
+		ordering = ["next_date", "id"]
+		indexes = [
+			models.Index(fields=["next_date"], condition=Q(active=True), name="idx_recurrence_due"),
+			models.Index(fields=["created_by", "kind"], name="idx_recurrence_user_kind"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.get_frequency_display()} {self.kind}: {self.description or self.amount}"
+
+
+class Occurrence(models.Model):
+	"""One materialized date of a rule; the unique key makes the scheduler idempotent.
+
+	The row outlives the expense/income it created, so deleting a generated
+	entry does not bring it back on the next run.
+	"""
+	recurrence = models.ForeignKey(Recurrence, on_delete=models.CASCADE, related_name="occurrences")
+	date = models.DateField()
+	# No database constraint: once partitioned, expense ids alone are not a referenceable key (expenses/partitioning.py).
+	expense = models.ForeignKey(
+		Expense, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False, related_name="+"
+	)
+	income = models.ForeignKey(Income, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+	created_at = models.DateTimeField(auto_now_add=True)
+
+	class Meta:
+		ordering = ["recurrence", "date"]
+		constraints = [
+			models.UniqueConstraint(fields=["recurrence", "date"], name="uniq_occurrence_recurrence_date"),
+		]
+
+	def __str__(self) -> str:
+		return f"{self.recurrence_id} @ {self.date}"
@@ -0,0 +1,123 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from expenses.fx import base_currency, rate_for
+from recurring.models import Frequency, Recurrence, RecurrenceKind
+from recurring.services import reschedule
+
+# Changing any of these moves the rule's next due date.
+SCHEDULE_FIELDS = ("frequency", "interval", "weekdays", "month_day", "start_date", "end_date", "max_occurrences")
+
+
+class RecurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Recurrence
+        fields = [
+            "id",
+            "kind",
+            "frequency",
+            "interval",
+            "weekdays",
+            "month_day",
+            "start_date",
+            "end_date",
+            "max_occurrences",
+            "active",
+            "next_date",
+            "occurrence_count",
+            "amount",
+            "currency",
+            "description",
+            "category",
+            "merchant",
+            "payment_method",
+            "notes",
+            "income_source",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ["id", "next_date", "occurrence_count", "created_at", "updated_at"]
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Amount must be greater than 0")
+        return value
+
+    def validate_currency(self, value):
+        return value.strip().upper()
+
+    def validate_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Interval must be at least 1")
+        return value
+
+    def validate_weekdays(self, value):
+        if not isinstance(value, list) or any(
+            isinstance(day, bool) or not isinstance(day, int) or not 0 <= day <= 6 for day in value
+        ):
+            raise serializers.ValidationError("Expected a list of weekdays 0 (Monday) to 6 (Sunday)")
+        return sorted(set(value))
+
+    def validate_month_day(self, value):
+        if value is not None and value != -1 and not 1 <= value <= 31:
+            raise serializers.ValidationError("Use 1-31, or -1 for the last day of the month")
+        return value
+
+    def validate_category(self, value):
+        request = self.context.get("request")
+        if value is None or not request or value.is_system or value.created_by_id == request.user.id:
+            return value
+        raise serializers.ValidationError("Invalid category")
+
+    def validate_income_source(self, value):
+        request = self.context.get("request")
+        if value is None or not request or value.is_system or value.created_by_id == request.user.id:
+            return value
+        raise serializers.ValidationError("Invalid income source")
+
+    def validate(self, attrs):
+        def current(name):
+            return attrs.get(name, getattr(self.instance, name, None))
+
+        kind = current("kind")
+        if self.instance is not None and kind != self.instance.kind:
+            raise serializers.ValidationError({"kind": "Cannot be changed; create a new rule instead"})
+
+        start_date, end_date = current("start_date"), current("end_date")
+        if end_date and start_date and end_date < start_date:
+            raise serializers.ValidationError({"end_date": "Must be on or after start_date"})
+        if current("weekdays") and current("frequency") != Frequency.WEEKLY:
+            raise serializers.ValidationError({"weekdays": "Only used by weekly rules"})
+        if current("month_day") is not None and current("frequency") != Frequency.MONTHLY:
+            raise serializers.ValidationError({"month_day": "Only used by monthly rules"})
+
+        if kind == RecurrenceKind.EXPENSE:
+            currency = current("currency") or base_currency()
+            if start_date and rate_for(currency, start_date) is None:
+                raise serializers.ValidationError({"currency": f"No exchange rate for {currency} on or before {start_date}"})
+            if not current("description"):
+                raise serializers.ValidationError({"description": "Required for expense rules"})
+            if current("income_source"):
+                raise serializers.ValidationError({"income_source": "Only used by income rules"})
+        elif current("category"):
+            raise serializers.ValidationError({"category": "Only used by expense rules"})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data["created_by"] = self.context["request"].user
+        rule = Recurrence(**validated_data)
+        reschedule(rule)
+        rule.save()
+        return rule
+
+    def update(self, instance, validated_data):
+        resumed = not instance.active and validated_data.get("active") is True
+        rule = super().update(instance, validated_data)
+        if resumed:
+            # Dates that fell due while the rule was paused are skipped, not back-filled.
+            reschedule(rule, not_before=timezone.localdate())
+            rule.save(update_fields=["next_date", "updated_at"])
+        elif any(name in validated_data for name in SCHEDULE_FIELDS):
+            reschedule(rule)
+            rule.save(update_fields=["next_date", "updated_at"])
+        return rule
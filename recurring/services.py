@@ -0,0 +1,235 @@
+"""
+Recurring expenses and incomes.
+
+A `Recurrence` keeps the next date it is due. `materialize_due` claims every
+due rule in batches, works out all of each rule's missed dates in Python (a
+backlog of months after downtime included) and writes them with one
+`bulk_create` per model, so a pass costs a handful of queries per batch
+however many users and dates it covers. Each date is recorded as an
+`Occurrence` under a unique (rule, date) key: a date is never created twice,
+even when runs overlap or a rule is rescheduled.
+"""
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from budgets.models import Income, normalize_month
+from budgets.services import mark_month_end_snapshots_changed
+from core.versions import bump_data_versions
+from expenses.models import Expense
+from expenses.signals import send_expenses_changed
+from recurring.models import Frequency, Occurrence, Recurrence, RecurrenceKind
+from sync.models import ChangeOp
+from sync.services import Change, record_changes
+
+# Dates materialized per rule per batch; a rule with a longer backlog stays
+# due and is picked up again within the same run.
+MAX_CATCH_UP = 1000
+
+
+@dataclass
+class MaterializeResult:
+	rules: int = 0
+	expenses: int = 0
+	incomes: int = 0
+
+
+# ---- schedule ----
+
+
+def _day_in_month(year: int, month: int, month_day: int) -> date:
+	last = calendar.monthrange(year, month)[1]
+	return date(year, month, last if month_day == -1 else min(month_day, last))
+
+
+def schedule(rule: Recurrence, start: date) -> Iterator[date]:
+	"""On-schedule dates of `rule` from `start` (inclusive), ignoring its end."""
+	start = max(start, rule.start_date)
+	anchor = rule.start_date
+	interval = max(rule.interval, 1)
+
+	if rule.frequency == Frequency.DAILY:
+		steps = -(-(start - anchor).days // interval)
+		day = anchor + timedelta(days=steps * interval)
+		while True:
+			yield day
+			day += timedelta(days=interval)
+
+	elif rule.frequency == Frequency.WEEKLY:
+		weekdays = sorted(set(rule.weekdays or [anchor.weekday()]))
+		week = anchor - timedelta(days=anchor.weekday())
+		week += timedelta(weeks=((start - week).days // 7 // interval) * interval)
+		while True:
+			for weekday in weekdays:
+				day = week + timedelta(days=weekday)
+				if day >= start:
+					yield day
+			week += timedelta(weeks=interval)
+
+	else:
+		if rule.frequency == Frequency.YEARLY:
+			step, month_day = 12 * interval, anchor.day
+		else:
+			step, month_day = interval, rule.month_day or anchor.day
+		first = anchor.year * 12 + anchor.month - 1
+		index = first + ((start.year * 12 + start.month - 1 - first) // step) * step
+		while True:
+			day = _day_in_month(index // 12, index % 12 + 1, month_day)
+			if day >= start:
+				yield day
+			index += step
+
+
+def due_dates(rule: Recurrence, through: date, limit: int = MAX_CATCH_UP) -> tuple[list[date], date | None]:
+	"""Dates due from `rule.next_date` up to `through`, and the next date after them (None once ended)."""
+	if rule.next_date is None:
+		return [], None
+	dates: list[date] = []
+	count = rule.occurrence_count
+	for day in schedule(rule, rule.next_date):
+		if rule.end_date and day > rule.end_date:
+			return dates, None
+		if rule.max_occurrences is not None and count >= rule.max_occurrences:
+			return dates, None
+		if day > through or len(dates) >= limit:
+			return dates, day
+		dates.append(day)
+		count += 1
+
+
+def reschedule(rule: Recurrence, *, not_before: date | None = None) -> None:
+	"""Set `next_date` after a rule is created or edited (not saved).
+
+	Dates up to the last materialized occurrence are never repeated, nor
+	dates before `not_before` (a paused rule resumes from today, it does not
+	catch up on the pause).
+	"""
+	start = rule.start_date
+	if not_before is not None:
+		start = max(start, not_before)
+	if rule.pk:
+		last = rule.occurrences.aggregate(last=Max("date"))["last"]
+		if last is not None:
+			start = max(start, last + timedelta(days=1))
+	next_date = next(schedule(rule, start))
+	if (rule.end_date and next_date > rule.end_date) or (
+		rule.max_occurrences is not None and rule.occurrence_count >= rule.max_occurrences
+	):
+		next_date = None
+	rule.next_date = next_date
+
+
+# ---- materialization ----
+
+
+def _expense(rule: Recurrence, day: date) -> Expense:
+	expense = Expense(
+		created_by_id=rule.created_by_id,
+		amount=rule.amount,
+		currency=rule.currency,
+		date=day,
+		description=rule.description,
+		category_id=rule.category_id,
+		merchant=rule.merchant,
+		payment_method=rule.payment_method,
+		notes=rule.notes,
+	)
+	expense.refresh_fingerprint()
+	expense.refresh_amount_base()
+	return expense
+
+
+def _income(rule: Recurrence, day: date) -> Income:
+	source = rule.income_source
+	return Income(
+		created_by_id=rule.created_by_id,
+		month=normalize_month(day),
+		source=source,
+		source_name=(source.name if source else rule.description)[:100],
+		amount=rule.amount,
+		notes=rule.notes,
+	)
+
+
+def materialize_batch(*, today: date, batch_size: int = 500) -> MaterializeResult:
+	"""Materialize the due dates of up to `batch_size` rules in one transaction.
+
+	Rules are claimed with SKIP LOCKED, so several schedulers can run at once.
+	"""
+	result = MaterializeResult()
+	with transaction.atomic():
+		rules = list(
+			Recurrence.objects.select_for_update(skip_locked=True, of=("self",))
+			.select_related("income_source")
+			.filter(active=True, next_date__lte=today)
+			.order_by("next_date", "id")[:batch_size]
+		)
+		if not rules:
+			return result
+		result.rules = len(rules)
+
+		planned: list[tuple[Recurrence, date]] = []
+		for rule in rules:
+			dates, rule.next_date = due_dates(rule, today)
+			planned.extend((rule, day) for day in dates)
+
+		if planned:
+			existing = set(
+				Occurrence.objects.filter(
+					recurrence__in=rules, date__gte=min(day for _, day in planned), date__lte=today
+				).values_list("recurrence_id", "date")
+			)
+			planned = [(rule, day) for rule, day in planned if (rule.pk, day) not in existing]
+
+		occurrences, expenses, incomes = [], [], []
+		for rule, day in planned:
+			occurrence = Occurrence(recurrence=rule, date=day)
+			if rule.kind == RecurrenceKind.EXPENSE:
+				occurrence.expense = _expense(rule, day)
+				expenses.append(occurrence.expense)
+			else:
+				occurrence.income = _income(rule, day)
+				incomes.append(occurrence.income)
+			occurrences.append(occurrence)
+			# Only dates actually materialized count; ones already there were counted before.
+			rule.occurrence_count += 1
+
+		Expense.objects.bulk_create(expenses, batch_size=1000)
+		Income.objects.bulk_create(incomes, batch_size=1000)
+		Occurrence.objects.bulk_create(occurrences, batch_size=1000)
+
+		now = timezone.now()
+		for rule in rules:
+			rule.updated_at = now
+		Recurrence.objects.bulk_update(rules, ["next_date", "occurrence_count", "updated_at"])
+
+		if expenses:
+			send_expenses_changed(added=expenses)
+		if incomes:
+			# bulk_create skips the post_save receivers that do this for single saves.
+			bump_data_versions(user_ids={income.created_by_id for income in incomes})
+			record_changes(Change(income.created_by_id, "incomes", income.pk, ChangeOp.UPSERT) for income in incomes)
+			mark_month_end_snapshots_changed((income.created_by_id, income.month) for income in incomes)
+
+	result.expenses, result.incomes = len(expenses), len(incomes)
+	return result
+
+
+def materialize_due(*, today: date | None = None, batch_size: int = 500) -> MaterializeResult:
+	"""Materialize everything due up to `today` for all users."""
+	today = today or timezone.localdate()
+	total = MaterializeResult()
+	while True:
+		result = materialize_batch(today=today, batch_size=batch_size)
+		if not result.rules:
+			return total
+		total.rules += result.rules
+		total.expenses += result.expenses
+		total.incomes += result.incomes
@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from budgets.models import Income
+from expenses.models import Expense
+from recurring.models import Frequency, Occurrence, Recurrence, RecurrenceKind
+from recurring.services import materialize_batch, materialize_due, reschedule
+from reports.models import DailySpendingRollup
+
+User = get_user_model()
+
+
+class MaterializeTests(TestCase):
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create_user("scheduler", password="x")
+
+	def rule(self, **fields):
+		defaults = {
+			"kind": RecurrenceKind.EXPENSE,
+			"frequency": Frequency.DAILY,
+			"start_date": date(2026, 3, 1),
+			"amount": Decimal("3.00"),
+			"description": "Coffee",
+		}
+		rule = Recurrence(created_by=self.user, **{**defaults, **fields})
+		reschedule(rule)
+		rule.save()
+		return rule
+
+	def test_catches_up_to_today(self):
+		rule = self.rule()
+		result = materialize_due(today=date(2026, 3, 4))
+		self.assertEqual((result.rules, result.expenses), (1, 4))
+		rule.refresh_from_db()
+		self.assertEqual((rule.occurrence_count, rule.next_date), (4, date(2026, 3, 5)))
+		# Expenses are announced like any other write, so rollups follow.
+		self.assertEqual(DailySpendingRollup.objects.get(user=self.user, date=date(2026, 3, 2)).total, Decimal("3.00"))
+		self.assertEqual(materialize_due(today=date(2026, 3, 4)).expenses, 0)
+
+	def test_stops_at_max_occurrences(self):
+		rule = self.rule(max_occurrences=3)
+		materialize_due(today=date(2026, 3, 31))
+		rule.refresh_from_db()
+		self.assertEqual((rule.occurrence_count, rule.next_date), (3, None))
+		self.assertEqual(Expense.objects.filter(created_by=self.user).count(), 3)
+
+	def test_existing_occurrences_are_not_counted_again(self):
+		rule = self.rule(max_occurrences=10)
+		materialize_batch(today=date(2026, 3, 3))
+		# Rewind as a racing edit could; the dates already materialized are skipped.
+		Recurrence.objects.filter(pk=rule.pk).update(next_date=date(2026, 3, 2))
+		materialize_batch(today=date(2026, 3, 4))
+		rule.refresh_from_db()
+		self.assertEqual(rule.occurrence_count, 4)
+		self.assertEqual(Occurrence.objects.filter(recurrence=rule).count(), 4)
+
+	def test_monthly_income_on_the_last_day(self):
+		rule = self.rule(
+			kind=RecurrenceKind.INCOME, frequency=Frequency.MONTHLY, month_day=-1, start_date=date(2026, 1, 1)
+		)
+		materialize_due(today=date(2026, 3, 31))
+		days = list(Occurrence.objects.filter(recurrence=rule).order_by("date").values_list("date", flat=True))
+		self.assertEqual(days, [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31)])
+		self.assertEqual(Income.objects.filter(created_by=self.user).count(), 3)
@@ -0,0 +1,8 @@
+from rest_framework.routers import SimpleRouter
+
+from recurring.views import RecurrenceViewSet
+
+router = SimpleRouter()
+router.register(r"", RecurrenceViewSet, basename="recurrence")
+
+urlpatterns = router.urls
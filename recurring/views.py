@@ -0,0 +1,39 @@
+from datetime import date
+
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.permissions import IsUserOrAdminRole
+from recurring.models import Recurrence
+from recurring.serializers import RecurrenceSerializer
+from recurring.services import due_dates
+
+
+class RecurrenceViewSet(viewsets.ModelViewSet):
+	"""CRUD for the caller's recurring expense and income rules.
+
+	Occurrences are created by the `materialize_recurring` command, not by
+	these endpoints.
+	"""
+	serializer_class = RecurrenceSerializer
+	permission_classes = [IsUserOrAdminRole]
+	filterset_fields = ["kind", "frequency", "active"]
+	ordering_fields = ["next_date", "start_date", "amount", "created_at"]
+	ordering = ["next_date", "id"]
+
+	def get_queryset(self):
+		return Recurrence.objects.filter(created_by=self.request.user)
+
+	@action(detail=True, methods=["get"])
+	def upcoming(self, request, pk=None):
+		"""The next `?count=` dates (default 5, at most 50) this rule will create."""
+		rule = self.get_object()
+		try:
+			count = min(max(int(request.query_params.get("count", 5)), 1), 50)
+		except ValueError:
+			count = 5
+		dates = []
+		if rule.active and rule.next_date:
+			dates, _ = due_dates(rule, through=date.max, limit=count)
+		return Response({"id": rule.id, "dates": dates})
@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from reports.models import DailySpendingRollup
+
+
+@admin.register(DailySpendingRollup)
+class DailySpendingRollupAdmin(admin.ModelAdmin):
+	list_display = ("date", "user", "category", "currency", "total", "total_base", "count")
+	list_filter = ("currency",)
+	date_hierarchy = "date"
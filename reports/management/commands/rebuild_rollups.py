@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reports.services import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily spending rollups from raw expenses, archived ones included (backfill or repair)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only rebuild rollups for this user id (repeatable). Defaults to all users.",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(user_ids=options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows"))
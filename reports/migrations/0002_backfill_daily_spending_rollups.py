@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    DailySpendingRollup = apps.get_model("reports", "DailySpendingRollup")
+
+    grouped = (
+        Expense.objects.order_by()
+        .values("created_by_id", "date", "category_id", "currency")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+    batch = []
+    for row in grouped.iterator(chunk_size=5000):
+        batch.append(
+            DailySpendingRollup(
+                user_id=row["created_by_id"],
+                date=row["date"],
+                category_id=row["category_id"],
+                currency=row["currency"],
+                total=row["total"],
+                count=row["count"],
+            )
+        )
+        if len(batch) >= 5000:
+            DailySpendingRollup.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DailySpendingRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_alter_expense_currency'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
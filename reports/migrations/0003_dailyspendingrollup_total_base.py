@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_base_totals(apps, schema_editor):
+    # Each rollup's base total is the sum of its expenses' base amounts from
+    # expenses 0008. Expenses left without a rate add nothing until
+    # `load_fx_rates` converts them, which updates the rollups as well.
+    Expense = apps.get_model("expenses", "Expense")
+    DailySpendingRollup = apps.get_model("reports", "DailySpendingRollup")
+    base = getattr(settings, "BASE_CURRENCY", "BDT")
+    DailySpendingRollup.objects.filter(currency__iexact=base).update(total_base=models.F("total"))
+
+    foreign = DailySpendingRollup.objects.exclude(currency__iexact=base)
+    expenses = Expense.objects.filter(
+        created_by=OuterRef("user"), date=OuterRef("date"), currency=OuterRef("currency")
+    ).order_by()
+    for rollups, matching in (
+        (foreign.filter(category__isnull=False), expenses.filter(category=OuterRef("category"))),
+        (foreign.filter(category__isnull=True), expenses.filter(category__isnull=True)),
+    ):
+        total_base = matching.values("created_by").annotate(total=Sum("amount_base")).values("total")
+        rollups.update(total_base=Coalesce(Subquery(total_base), models.Value(0), output_field=models.DecimalField()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0008_fxrate_expense_amount_base'),
+        ('reports', '0002_backfill_daily_spending_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyspendingrollup',
+            name='total_base',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=16),
+        ),
+        migrations.RunPython(backfill_base_totals, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,53 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+from categories.models import Category
+
+
+class DailySpendingRollup(models.Model):
+	"""Per-day spending totals, kept in step with Expense writes.
+
+	One row per (user, date, category, currency). Reports and budget services
+	aggregate these instead of raw expenses, so their cost follows the number
+	of distinct days rather than the number of expenses.
+	"""
+	user = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		related_name="spending_rollups",
+	)
+	date = models.DateField()
+	category = models.ForeignKey(
+		Category,
+		on_delete=models.CASCADE,
+		null=True,
+		blank=True,
+		related_name="spending_rollups",
+	)
+	currency = models.CharField(max_length=8)
+	total = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+	# Sum of the expenses' `amount_base`; what reports and budgets add up across currencies.
+	total_base = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+	count = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(
+				fields=["user", "date", "category", "currency"],
+				condition=Q(category__isnull=False),
+				name="uniq_rollup_user_date_cat_cur",
+			),
+			models.UniqueConstraint(
+				fields=["user", "date", "currency"],
+				condition=Q(category__isnull=True),
+				name="uniq_rollup_user_date_nocat_cur",
+			),
+		]
+		indexes = [
+			models.Index(fields=["user", "date"], name="idx_rollup_user_date"),
+		]
+		ordering = ["date"]
+
+	def __str__(self) -> str:
+		return f"{self.user_id} {self.date} {self.category_id} {self.total} {self.currency}"
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterable
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+
+from categories.models import Category
+from expenses.archive import archived_records
+from expenses.models import Expense
+from reports.models import DailySpendingRollup
+
+RollupKey = tuple[int, object, int | None, str]
+
+
+def _rollup_key(expense) -> RollupKey:
+	return (expense.created_by_id, expense.date, expense.category_id, expense.currency)
+
+
+def compute_rollup_deltas(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> dict[RollupKey, list]:
+	"""Net (amount, base amount, count) change per rollup key for a set of expense writes."""
+	deltas: dict[RollupKey, list] = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+	for expense in removed:
+		delta = deltas[_rollup_key(expense)]
+		delta[0] -= expense.amount
+		delta[1] -= expense.amount_base or 0
+		delta[2] -= 1
+	for expense in added:
+		delta = deltas[_rollup_key(expense)]
+		delta[0] += expense.amount
+		delta[1] += expense.amount_base or 0
+		delta[2] += 1
+	return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+@transaction.atomic
+def apply_rollup_deltas(deltas: dict[RollupKey, list]) -> None:
+	"""Fold deltas into the rollup table with a fixed number of queries.
+
+	Existing rows are locked and updated in bulk, missing keys are inserted in
+	bulk and rows whose count drops to zero are removed.
+	"""
+	if not deltas:
+		return
+
+	user_ids = {key[0] for key in deltas}
+	days = {key[1] for key in deltas}
+	existing = {
+		(row.user_id, row.date, row.category_id, row.currency): row
+		for row in DailySpendingRollup.objects.select_for_update().filter(user_id__in=user_ids, date__in=days)
+		if (row.user_id, row.date, row.category_id, row.currency) in deltas
+	}
+
+	to_update, to_delete, to_create = [], [], []
+	for key, (amount, amount_base, count) in deltas.items():
+		row = existing.get(key)
+		if row is None:
+			if count > 0:
+				user_id, day, category_id, currency = key
+				to_create.append(
+					DailySpendingRollup(
+						user_id=user_id,
+						date=day,
+						category_id=category_id,
+						currency=currency,
+						total=amount,
+						total_base=amount_base,
+						count=count,
+					)
+				)
+			continue
+		row.total += amount
+		row.total_base += amount_base
+		row.count += count
+		if row.count <= 0:
+			to_delete.append(row.pk)
+		else:
+			to_update.append(row)
+
+	if to_update:
+		DailySpendingRollup.objects.bulk_update(to_update, ["total", "total_base", "count"])
+	if to_delete:
+		DailySpendingRollup.objects.filter(pk__in=to_delete).delete()
+	if to_create:
+		try:
+			with transaction.atomic():
+				DailySpendingRollup.objects.bulk_create(to_create)
+		except IntegrityError:
+			# A concurrent writer created some of the keys first; add into them one by one.
+			for row in to_create:
+				_upsert_row(row)
+
+
+def _upsert_row(row: DailySpendingRollup) -> None:
+	lookup = {"user_id": row.user_id, "date": row.date, "category_id": row.category_id, "currency": row.currency}
+	updated = DailySpendingRollup.objects.filter(**lookup).update(
+		total=F("total") + row.total, total_base=F("total_base") + row.total_base, count=F("count") + row.count
+	)
+	if not updated:
+		DailySpendingRollup.objects.create(**lookup, total=row.total, total_base=row.total_base, count=row.count)
+
+
+def apply_expense_changes(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> None:
+	apply_rollup_deltas(compute_rollup_deltas(removed=removed, added=added))
+
+
+@transaction.atomic
+def rebuild_rollups(*, user_ids: Iterable[int] | None = None) -> int:
+	"""Recompute rollups from raw expenses, archived ones included (backfill / repair). Returns rows written."""
+	rollups = DailySpendingRollup.objects.all()
+	expenses = Expense.objects.all()
+	if user_ids is not None:
+		user_ids = list(user_ids)
+		rollups = rollups.filter(user_id__in=user_ids)
+		expenses = expenses.filter(created_by_id__in=user_ids)
+
+	rollups.delete()
+
+	# Archived expenses left the table but still count (see expenses/archive.py).
+	# They are old years only, so their keys are held while the live rows stream.
+	archived = _archived_totals(user_ids)
+	grouped = (
+		expenses.order_by()
+		.values("created_by_id", "date", "category_id", "currency")
+		.annotate(
+			total=Sum("amount"), total_base=Coalesce(Sum("amount_base"), Value(Decimal("0"))), count=Count("id")
+		)
+	)
+
+	def live_rows():
+		for row in grouped.iterator(chunk_size=5000):
+			key = (row["created_by_id"], row["date"], row["category_id"], row["currency"])
+			total, total_base, count = archived.pop(key, (0, 0, 0))
+			yield key, row["total"] + total, row["total_base"] + total_base, row["count"] + count
+
+	def archived_rows():
+		for key, (total, total_base, count) in archived.items():
+			yield key, total, total_base, count
+
+	batch, written = [], 0
+	for rows in (live_rows(), archived_rows()):
+		for (user_id, day, category_id, currency), total, total_base, count in rows:
+			batch.append(
+				DailySpendingRollup(
+					user_id=user_id,
+					date=day,
+					category_id=category_id,
+					currency=currency,
+					total=total,
+					total_base=total_base,
+					count=count,
+				)
+			)
+			if len(batch) >= 5000:
+				DailySpendingRollup.objects.bulk_create(batch)
+				written += len(batch)
+				batch = []
+	if batch:
+		DailySpendingRollup.objects.bulk_create(batch)
+		written += len(batch)
+	return written
+
+
+def _archived_totals(user_ids: list[int] | None) -> dict[RollupKey, list]:
+	totals: dict[RollupKey, list] = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+	for record in archived_records(owner_ids=user_ids):
+		total = totals[(record["created_by_id"], record["date"], record["category_id"], record["currency"])]
+		total[0] += record["amount"]
+		total[1] += record["amount_base"] or 0
+		total[2] += 1
+	# Archives keep the category id an expense had; a deleted category counts as
+	# uncategorized, as Expense.category's SET_NULL does for live rows.
+	category_ids = {key[2] for key in totals if key[2] is not None}
+	existing = set(Category.objects.filter(pk__in=category_ids).values_list("pk", flat=True))
+	merged: dict[RollupKey, list] = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+	for (user_id, day, category_id, currency), (total, total_base, count) in totals.items():
+		merged_total = merged[(user_id, day, category_id if category_id in existing else None, currency)]
+		merged_total[0] += total
+		merged_total[1] += total_base
+		merged_total[2] += count
+	return dict(merged)
+
+
+def spending_rollups(*, owner=None, start=None, end=None):
+	"""Rollup rows scoped like the expense queries they replace (owner=None means all users)."""
+	qs = DailySpendingRollup.objects.order_by()
+	if owner is not None:
+		qs = qs.filter(user=owner)
+	if start is not None:
+		qs = qs.filter(date__gte=start)
+	if end is not None:
+		qs = qs.filter(date__lte=end)
+	return qs
+
+
+# Truncation applied in SQL per bucket; daily rows are already one per date.
+TIMESERIES_BUCKETS = {
+	"daily": None,
+	"weekly": TruncWeek,
+	"monthly": TruncMonth,
+	"quarterly": TruncQuarter,
+	"yearly": TruncYear,
+}
+
+# Months between consecutive bucket starts (0 = fixed number of days, see _next_bucket).
+_BUCKET_MONTHS = {"daily": 0, "weekly": 0, "monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+def bucket_start(bucket: str, day: date) -> date:
+	"""First day of the bucket containing `day` (weeks start on Monday, like TruncWeek)."""
+	if bucket == "daily":
+		return day
+	if bucket == "weekly":
+		return day - timedelta(days=day.weekday())
+	if bucket == "monthly":
+		return day.replace(day=1)
+	if bucket == "quarterly":
+		return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+	return date(day.year, 1, 1)
+
+
+def _next_bucket(bucket: str, start: date) -> date:
+	months = _BUCKET_MONTHS[bucket]
+	if not months:
+		return start + timedelta(days=7 if bucket == "weekly" else 1)
+	index = start.month - 1 + months
+	return date(start.year + index // 12, index % 12 + 1, 1)
+
+
+def bucket_starts(bucket: str, start: date, end: date) -> list[date]:
+	"""Every bucket start covering [start, end], in order."""
+	starts = []
+	current = bucket_start(bucket, start)
+	while current <= end:
+		starts.append(current)
+		current = _next_bucket(bucket, current)
+	return starts
+
+
+def spending_timeseries(*, owner=None, start: date, end: date, bucket: str, by_category: bool = False) -> dict[str, Any]:
+	"""
+	Zero-filled spending totals per bucket over [start, end] from one grouped rollup query.
+	With `by_category`, also a dense matrix: one `totals` list per category aligned with `buckets`.
+	"""
+	trunc = TIMESERIES_BUCKETS[bucket]
+	qs = spending_rollups(owner=owner, start=start, end=end).annotate(
+		bucket=trunc("date") if trunc else F("date")
+	)
+	group = ("bucket", "category_id", "category__name") if by_category else ("bucket",)
+	rows = qs.values(*group).annotate(spent=Sum("total_base"))
+
+	buckets = bucket_starts(bucket, start, end)
+	position = {day: i for i, day in enumerate(buckets)}
+	totals = [Decimal("0")] * len(buckets)
+	categories: dict[int | None, dict[str, Any]] = {}
+	for row in rows:
+		day = row["bucket"]
+		i = position[day.date() if isinstance(day, datetime) else day]
+		spent = row["spent"] or Decimal("0")
+		totals[i] += spent
+		if by_category:
+			category = categories.setdefault(
+				row["category_id"],
+				{
+					"category_id": row["category_id"],
+					"category_name": row["category__name"],
+					"totals": [Decimal("0")] * len(buckets),
+				},
+			)
+			category["totals"][i] += spent
+
+	result: dict[str, Any] = {"buckets": buckets, "totals": totals}
+	if by_category:
+		# Uncategorized spend (category_id None) sorts last.
+		result["categories"] = [
+			categories[key] for key in sorted(categories, key=lambda pk: (pk is None, pk or 0))
+		]
+	return result
@@ -0,0 +1,9 @@
+from django.dispatch import receiver
+
+from expenses.signals import expenses_changed
+from reports.services import apply_expense_changes
+
+
+@receiver(expenses_changed)
+def _update_spending_rollups(sender, removed, added, **kwargs):
+	apply_expense_changes(removed=removed, added=added)
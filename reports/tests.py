@@ -1,3 +1,117 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from expenses.archive import archive_expenses, restore_archive
+from expenses.models import Expense, ExpenseArchive
+from reports.models import DailySpendingRollup
+from reports.services import rebuild_rollups
+from users.roles import ROLE_USER
+
+User = get_user_model()
+
+
+def rollup_rows(user):
+	return sorted(
+		DailySpendingRollup.objects.filter(user=user).values_list(
+			"date", "category_id", "currency", "total", "total_base", "count"
+		),
+		key=str,
+	)
+
+
+class RollupConsistencyTests(TestCase):
+	"""Incremental rollups must equal a rebuild from the expenses after every kind of write."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.user = User.objects.create_user("rollups", password="x")
+		cls.user.groups.add(Group.objects.get_or_create(name=ROLE_USER)[0])
+		cls.food = Category.objects.create(name="Food", created_by=cls.user)
+		cls.rent = Category.objects.create(name="Rent", created_by=cls.user)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def assertRollupsMatchExpenses(self):
+		incremental = rollup_rows(self.user)
+		rebuild_rollups(user_ids=[self.user.pk])
+		self.assertEqual(incremental, rollup_rows(self.user))
+
+	def create(self, **data):
+		payload = {"amount": "10.00", "date": "2026-03-05", "description": "Lunch", "category": self.food.pk, **data}
+		response = self.client.post("/api/v1/expenses/", payload, format="json")
+		self.assertEqual(response.status_code, 201, response.data)
+		return response.data["id"]
+
+	def test_create(self):
+		self.create()
+		self.create(amount="2.50")
+		self.create(category=None)
+		self.assertRollupsMatchExpenses()
+		row = DailySpendingRollup.objects.get(user=self.user, category=self.food)
+		self.assertEqual((row.total, row.count), (Decimal("12.50"), 2))
+
+	def test_update_moves_between_keys(self):
+		expense_id = self.create()
+		self.create()
+		response = self.client.patch(
+			f"/api/v1/expenses/{expense_id}/",
+			{"amount": "40.00", "date": "2026-03-06", "category": self.rent.pk},
+			format="json",
+		)
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertRollupsMatchExpenses()
+
+	def test_delete_removes_empty_rows(self):
+		expense_id = self.create()
+		self.assertEqual(self.client.delete(f"/api/v1/expenses/{expense_id}/").status_code, 204)
+		self.assertRollupsMatchExpenses()
+		self.assertFalse(DailySpendingRollup.objects.filter(user=self.user).exists())
+
+	def test_bulk(self):
+		keep, change, drop = self.create(), self.create(amount="5.00"), self.create(category=None)
+		response = self.client.post(
+			"/api/v1/expenses/bulk/",
+			{
+				"create": [
+					{"amount": "7.00", "date": "2026-03-07", "description": "Taxi"},
+					{"amount": "8.00", "date": "2026-03-05", "description": "Dinner", "category": self.food.pk},
+				],
+				"update": [{"id": change, "amount": "6.00", "category": self.rent.pk}],
+				"delete": [drop],
+			},
+			format="json",
+		)
+		self.assertEqual(response.status_code, 200, response.data)
+		self.assertTrue(Expense.objects.filter(pk=keep).exists())
+		self.assertRollupsMatchExpenses()
+
+	def test_archive_and_restore_keep_totals(self):
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		with override_settings(MEDIA_ROOT=media):
+			self.create(date="2023-02-01")
+			self.create(date="2023-02-01", category=None)
+			self.create(date="2026-03-05")
+			before = rollup_rows(self.user)
+
+			with self.captureOnCommitCallbacks(execute=True):
+				moved = archive_expenses(before=date(2024, 1, 1), user_ids=[self.user.pk])
+			self.assertEqual(moved, {(self.user.pk, 2023): 2})
+			self.assertEqual(rollup_rows(self.user), before)
+			# A rebuild reads the archived rows back out of their blob.
+			self.assertRollupsMatchExpenses()
+
+			with self.captureOnCommitCallbacks(execute=True):
+				restore_archive(ExpenseArchive.objects.get(created_by=self.user, year=2023))
+			self.assertEqual(rollup_rows(self.user), before)
+			self.assertRollupsMatchExpenses()
@@ -8,9 +8,11 @@ from rest_framework import generics
 from rest_framework.response import Response
 
 from budgets.models import normalize_month
+from core.conditional import ConditionalGetMixin
 from core.permissions import IsUserOrAdminRole
+from core.reportcache import ReportCacheMixin
 from core.rbac import is_admin
-from expenses.models import Expense
+from reports.services import TIMESERIES_BUCKETS, bucket_starts, spending_rollups, spending_timeseries
 
 
 def _require_date(param: str | None, *, field: str) -> date:
@@ -26,11 +28,7 @@ def _month_range(month: date) -> tuple[date, date]:
 	return month, date(month.year, month.month, last_day)
 
 
-def _week_start(d: date) -> date:
-	return d - timedelta(days=d.weekday())
-
-
-class SummaryReportView(generics.GenericAPIView):
+class SummaryReportView(ReportCacheMixin, ConditionalGetMixin, generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
 
 	def get(self, request, *args, **kwargs):
@@ -40,16 +38,15 @@ class SummaryReportView(generics.GenericAPIView):
 		except ValueError as e:
 			return Response({"detail": str(e)}, status=400)
 
-		qs = Expense.objects.filter(date__gte=start, date__lte=end)
-		if not is_admin(request.user):
-			qs = qs.filter(created_by=request.user)
+		owner = None if is_admin(request.user) else request.user
+		qs = spending_rollups(owner=owner, start=start, end=end)
 
-		totals = qs.aggregate(total=Sum("amount"))
+		totals = qs.aggregate(total=Sum("total_base"))
 		total_amount = totals["total"] or Decimal("0")
 
 		by_category = (
 			qs.values("category_id", "category__name")
-			.annotate(total=Sum("amount"))
+			.annotate(total=Sum("total_base"))
 			.order_by("-total")
 		)
 
@@ -80,7 +77,7 @@ class SummaryReportView(generics.GenericAPIView):
 		)
 
 
-class TrendsReportView(generics.GenericAPIView):
+class TrendsReportView(ReportCacheMixin, ConditionalGetMixin, generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
 
 	def get(self, request, *args, **kwargs):
@@ -93,16 +90,15 @@ class TrendsReportView(generics.GenericAPIView):
 		prev_month_last_day = current_start - timedelta(days=1)
 		prev_start, prev_end = _month_range(prev_month_last_day)
 
-		qs = Expense.objects.all()
-		if not is_admin(request.user):
-			qs = qs.filter(created_by=request.user)
+		owner = None if is_admin(request.user) else request.user
+		qs = spending_rollups(owner=owner)
 
 		current_total = (
-			qs.filter(date__gte=current_start, date__lte=current_end).aggregate(total=Sum("amount"))["total"]
+			qs.filter(date__gte=current_start, date__lte=current_end).aggregate(total=Sum("total_base"))["total"]
 			or Decimal("0")
 		)
 		prev_total = (
-			qs.filter(date__gte=prev_start, date__lte=prev_end).aggregate(total=Sum("amount"))["total"]
+			qs.filter(date__gte=prev_start, date__lte=prev_end).aggregate(total=Sum("total_base"))["total"]
 			or Decimal("0")
 		)
 
@@ -120,8 +116,16 @@ class TrendsReportView(generics.GenericAPIView):
 		)
 
 
-class TimeSeriesReportView(generics.GenericAPIView):
+class TimeSeriesReportView(ReportCacheMixin, ConditionalGetMixin, generics.GenericAPIView):
 	permission_classes = [IsUserOrAdminRole]
+	max_buckets = 3660
+	bucket_keys = {
+		"daily": "date",
+		"weekly": "week_start",
+		"monthly": "month_start",
+		"quarterly": "quarter_start",
+		"yearly": "year_start",
+	}
 
 	def get(self, request, *args, **kwargs):
 		try:
@@ -131,33 +135,33 @@ class TimeSeriesReportView(generics.GenericAPIView):
 			return Response({"detail": str(e)}, status=400)
 
 		bucket = (request.query_params.get("bucket") or "daily").lower()
-		if bucket not in ("daily", "weekly"):
-			return Response({"detail": "bucket must be daily or weekly"}, status=400)
-
-		qs = Expense.objects.filter(date__gte=start, date__lte=end)
-		if not is_admin(request.user):
-			qs = qs.filter(created_by=request.user)
-
-		rows = qs.values("date").annotate(total=Sum("amount")).order_by("date")
-
-		if bucket == "daily":
-			series = [{"date": r["date"], "total": r["total"] or Decimal("0")} for r in rows]
-			return Response({"start": start, "end": end, "bucket": bucket, "series": series})
-
-		# weekly bucket (week starts Monday)
-		weekly: dict[date, Decimal] = {}
-		for r in rows:
-			d = r["date"]
-			wk = _week_start(d)
-			weekly[wk] = weekly.get(wk, Decimal("0")) + (r["total"] or Decimal("0"))
-
-		series = [{"week_start": wk, "total": total} for wk, total in sorted(weekly.items())]
-		return Response({"start": start, "end": end, "bucket": bucket, "series": series})
-
-
-class SpendingTrendsView(generics.GenericAPIView):
+		if bucket not in TIMESERIES_BUCKETS:
+			return Response({"detail": f"bucket must be one of: {', '.join(TIMESERIES_BUCKETS)}"}, status=400)
+		if start > end:
+			return Response({"detail": "start must not be after end"}, status=400)
+		if len(bucket_starts(bucket, start, end)) > self.max_buckets:
+			return Response({"detail": f"Range has more than {self.max_buckets} {bucket} buckets; use a coarser bucket"}, status=400)
+
+		split = request.query_params.get("split")
+		if split not in (None, "", "category"):
+			return Response({"detail": "split must be category"}, status=400)
+
+		owner = None if is_admin(request.user) else request.user
+		data = spending_timeseries(owner=owner, start=start, end=end, bucket=bucket, by_category=split == "category")
+
+		key = self.bucket_keys[bucket]
+		series = [{key: day, "total": total} for day, total in zip(data["buckets"], data["totals"])]
+		payload = {"start": start, "end": end, "bucket": bucket, "series": series}
+		if split == "category":
+			payload["buckets"] = data["buckets"]
+			payload["categories"] = data["categories"]
+		return Response(payload)
+
+
+class SpendingTrendsView(ReportCacheMixin, ConditionalGetMixin, generics.GenericAPIView):
 	"""Get spending trends and velocity analysis"""
 	permission_classes = [IsUserOrAdminRole]
+	conditional_for_admins = True
 
 	def get(self, request, *args, **kwargs):
 		from budgets.services import get_spending_trends
@@ -172,12 +176,13 @@ class SpendingTrendsView(generics.GenericAPIView):
 		return Response(trends)
 
 
-class MonthEndSummaryView(generics.GenericAPIView):
+class MonthEndSummaryView(ReportCacheMixin, ConditionalGetMixin, generics.GenericAPIView):
 	"""Get comprehensive month-end summary report"""
 	permission_classes = [IsUserOrAdminRole]
+	conditional_for_admins = True
 
 	def get(self, request, *args, **kwargs):
-		from budgets.services import generate_month_end_summary
+		from budgets.services import get_month_end_summary
 		
 		month_param = request.query_params.get("month")
 		if not month_param:
@@ -187,5 +192,6 @@ class MonthEndSummaryView(generics.GenericAPIView):
 		if not month:
 			return Response({"detail": "Invalid month format"}, status=400)
 		
-		summary = generate_month_end_summary(owner=request.user, month=month)
+		# Closed months come from their frozen snapshot; the current month is computed live.
+		summary = get_month_end_summary(owner=request.user, month=month)
 		return Response(summary)
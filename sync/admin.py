@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from sync.models import ChangeLogEntry
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+	list_display = ("id", "user", "model", "object_id", "op", "created_at")
+	list_filter = ("model", "op")
+	raw_id_fields = ("user",)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.services import prune_change_log
+
+
+class Command(BaseCommand):
+    help = "Delete sync change log entries (and tombstones) older than SYNC_LOG_RETENTION_DAYS"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "SYNC_LOG_RETENTION_DAYS", 30),
+            help="Keep this many days of history. Clients whose cursors are behind the pruned entries are told to reset.",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days < getattr(settings, "SYNC_LOG_RETENTION_DAYS", 30):
+            self.stderr.write(
+                self.style.WARNING("Pruning below SYNC_LOG_RETENTION_DAYS makes more clients reset")
+            )
+        cutoff = timezone.now() - timedelta(days=days)
+        deleted = prune_change_log(cutoff)
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} change log entries"))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_horizons(apps, schema_editor):
+    # Cursors used to expire by age. History pruned before this migration left
+    # no horizon, so treat everything below the oldest retained entry as pruned.
+    ChangeLogEntry = apps.get_model("sync", "ChangeLogEntry")
+    ChangeLogHorizon = apps.get_model("sync", "ChangeLogHorizon")
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    oldest = ChangeLogEntry.objects.order_by("id").values_list("id", flat=True).first()
+    if not oldest or oldest == 1:
+        return
+    stream_ids = [0, *User.objects.values_list("pk", flat=True)]
+    ChangeLogHorizon.objects.bulk_create(
+        [ChangeLogHorizon(stream_id=stream_id, pruned_through=oldest - 1) for stream_id in stream_ids],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogHorizon',
+            fields=[
+                ('stream_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('pruned_through', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_horizons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import models
+
+
+class ChangeOp(models.TextChoices):
+	UPSERT = "upsert", "Created or updated"
+	DELETE = "delete", "Deleted"
+
+
+class ChangeLogEntry(models.Model):
+	"""One write to a synced row, in commit order per stream.
+
+	Each user has a stream (`user` set) and shared rows such as system
+	categories go to the global stream (`user` null). The id is the sync
+	sequence number; deletes are kept as tombstones until pruned.
+	"""
+	user = models.ForeignKey(
+		settings.AUTH_USER_MODEL,
+		on_delete=models.CASCADE,
+		null=True,
+		blank=True,
+		related_name="sync_changes",
+	)
+	model = models.CharField(max_length=16)
+	object_id = models.BigIntegerField()
+	op = models.CharField(max_length=8, choices=ChangeOp.choices)
+	created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=["user", "id"], name="idx_changelog_user_seq"),
+		]
+		ordering = ["id"]
+
+	def __str__(self) -> str:
+		return f"#{self.pk} {self.op} {self.model}:{self.object_id} (user {self.user_id})"
+
+
+class ChangeLogHorizon(models.Model):
+	"""Highest change log id pruned from one stream.
+
+	A cursor behind its stream's horizon may have missed pruned entries and
+	must reset. `stream_id` is the user id, or 0 for the global stream.
+	"""
+	stream_id = models.BigIntegerField(primary_key=True)
+	pruned_through = models.BigIntegerField(default=0)
+
+	def __str__(self) -> str:
+		return f"stream {self.stream_id} pruned through #{self.pruned_through}"
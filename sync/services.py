@@ -0,0 +1,249 @@
+"""
+Delta sync for the mobile client.
+
+Writes to synced models append `ChangeLogEntry` rows (see sync/signals.py);
+`changes_since()` turns a client cursor into the rows changed after it. A
+cursor holds one position per stream (the user's own and the global one), so
+an idle sync is two index probes that return nothing, plus one lookup of the
+streams' prune horizons.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from budgets.models import Budget, Income
+from budgets.serializers import BudgetSerializer, IncomeSerializer
+from categories.models import Category
+from categories.serializers import CategorySerializer
+from core.models import Notification
+from core.serializers import NotificationSerializer
+from expenses.models import Expense
+from expenses.serializers import ExpenseSerializer
+from sync.models import ChangeLogEntry, ChangeLogHorizon, ChangeOp
+
+# Namespace for the advisory locks that keep each stream's sequence in commit order.
+SYNC_LOCK_NAMESPACE = 7301
+GLOBAL_STREAM = 0
+
+# Response key -> how to load and render rows visible to `user`.
+SYNCED_MODELS = {
+	"expenses": (
+		lambda user: Expense.objects.filter(created_by=user).select_related("created_by").defer("search_vector"),
+		ExpenseSerializer,
+	),
+	"categories": (
+		lambda user: Category.objects.filter(Q(is_system=True) | Q(created_by=user)),
+		CategorySerializer,
+	),
+	"budgets": (
+		lambda user: Budget.objects.filter(created_by=user).select_related("category", "created_by"),
+		BudgetSerializer,
+	),
+	"incomes": (
+		lambda user: Income.objects.filter(created_by=user).select_related("source"),
+		IncomeSerializer,
+	),
+	"notifications": (
+		lambda user: Notification.objects.filter(user=user),
+		NotificationSerializer,
+	),
+}
+
+
+class InvalidCursor(ValueError):
+	pass
+
+
+@dataclass(frozen=True)
+class Change:
+	user_id: int | None
+	model: str
+	object_id: int
+	op: str
+
+
+def record_changes(changes: Iterable[Change]) -> None:
+	"""Append change log entries for rows written in the current transaction."""
+	changes = list(changes)
+	if not changes:
+		return
+	with transaction.atomic():
+		_lock_streams({change.user_id for change in changes})
+		ChangeLogEntry.objects.bulk_create(
+			[
+				ChangeLogEntry(user_id=change.user_id, model=change.model, object_id=change.object_id, op=change.op)
+				for change in changes
+			],
+			batch_size=2000,
+		)
+
+
+def _lock_streams(user_ids: set[int | None]) -> None:
+	# Entries of one stream must become visible in id order, or a client could
+	# advance its cursor past an id that commits later. Holding a per-stream
+	# lock from id allocation until commit serializes writers per stream.
+	if connection.vendor != "postgresql":
+		return
+	stream_ids = sorted(GLOBAL_STREAM if user_id is None else user_id for user_id in user_ids)
+	with connection.cursor() as cursor:
+		cursor.execute(
+			"SELECT pg_advisory_xact_lock(%s, stream_id) FROM unnest(%s::int[]) AS stream_id",
+			[SYNC_LOCK_NAMESPACE, stream_ids],
+		)
+
+
+def expense_changes(*, removed: Iterable[Expense] = (), added: Iterable[Expense] = ()) -> list[Change]:
+	changes = {}
+	for expense in removed:
+		changes[expense.pk] = Change(expense.created_by_id, "expenses", expense.pk, ChangeOp.DELETE)
+	for expense in added:
+		changes[expense.pk] = Change(expense.created_by_id, "expenses", expense.pk, ChangeOp.UPSERT)
+	return list(changes.values())
+
+
+def notification_changes(notifications: Iterable[tuple[int, int]], op: str = ChangeOp.UPSERT) -> list[Change]:
+	"""Changes for `(notification id, user id)` pairs written in bulk."""
+	return [Change(user_id, "notifications", pk, op) for pk, user_id in notifications]
+
+
+# ---- reading ----
+
+
+@dataclass(frozen=True)
+class SyncCursor:
+	user_seq: int = 0
+	global_seq: int = 0
+
+	def encode(self) -> str:
+		payload = {"u": self.user_seq, "g": self.global_seq}
+		return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+	@classmethod
+	def decode(cls, raw: str) -> "SyncCursor":
+		try:
+			payload = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")).decode("utf-8"))
+			return cls(user_seq=int(payload["u"]), global_seq=int(payload["g"]))
+		except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+			raise InvalidCursor("Invalid sync cursor")
+
+
+@dataclass
+class SyncPage:
+	cursor: SyncCursor
+	reset: bool = False
+	has_more: bool = False
+	changes: dict[str, dict[str, list]] = field(default_factory=dict)
+
+
+def _stream(user_id: int | None):
+	if user_id is None:
+		return ChangeLogEntry.objects.filter(user__isnull=True)
+	return ChangeLogEntry.objects.filter(user_id=user_id)
+
+
+def _stream_id(user_id: int | None) -> int:
+	return GLOBAL_STREAM if user_id is None else user_id
+
+
+def prune_horizons(user) -> dict[int | None, int]:
+	"""Highest pruned id of the user's stream and of the global stream (0 if never pruned)."""
+	horizons = dict(
+		ChangeLogHorizon.objects.filter(stream_id__in=[user.pk, GLOBAL_STREAM]).values_list("stream_id", "pruned_through")
+	)
+	return {user.pk: horizons.get(user.pk, 0), None: horizons.get(GLOBAL_STREAM, 0)}
+
+
+@transaction.atomic
+def prune_change_log(before) -> int:
+	"""Delete entries created before `before`, first raising each stream's horizon past them."""
+	pruned = (
+		ChangeLogEntry.objects.filter(created_at__lt=before)
+		.values("user_id")
+		.annotate(last_id=Max("id"))
+		.values_list("user_id", "last_id")
+	)
+	ChangeLogHorizon.objects.bulk_create(
+		[ChangeLogHorizon(stream_id=_stream_id(user_id), pruned_through=last_id) for user_id, last_id in pruned],
+		update_conflicts=True,
+		unique_fields=["stream_id"],
+		update_fields=["pruned_through"],
+	)
+	deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=before).delete()
+	return deleted
+
+
+def head_cursor(user, horizons: dict[int | None, int] | None = None) -> SyncCursor:
+	if horizons is None:
+		horizons = prune_horizons(user)
+
+	def last_id(user_id):
+		# A stream whose entries were all pruned starts at its horizon, not 0.
+		last = _stream(user_id).order_by("-id").values_list("id", flat=True).first() or 0
+		return max(last, horizons[user_id])
+
+	return SyncCursor(user_seq=last_id(user.pk), global_seq=last_id(None))
+
+
+def changes_since(*, user, cursor: SyncCursor | None, limit: int | None = None, context=None) -> SyncPage:
+	"""Rows changed after `cursor`, at most `limit` log entries per stream.
+
+	Without a (still valid) cursor the client must reload everything: the
+	page has `reset` set and a cursor at the current head. A cursor is stale
+	once a position is behind its stream's prune horizon, whatever its age:
+	entries after it may have been deleted.
+	"""
+	horizons = prune_horizons(user)
+	if cursor is None or cursor.user_seq < horizons[user.pk] or cursor.global_seq < horizons[None]:
+		return SyncPage(cursor=head_cursor(user, horizons), reset=True, changes=_empty_changes())
+
+	limit = limit or getattr(settings, "SYNC_PAGE_SIZE", 500)
+	has_more = False
+	latest: dict[tuple[str, int], str] = {}
+	positions = {}
+	for user_id, position in ((user.pk, cursor.user_seq), (None, cursor.global_seq)):
+		entries = list(
+			_stream(user_id)
+			.filter(id__gt=position)
+			.order_by("id")
+			.values_list("id", "model", "object_id", "op")[: limit + 1]
+		)
+		if len(entries) > limit:
+			has_more = True
+			entries = entries[:limit]
+		for _, model, object_id, op in entries:
+			latest[(model, object_id)] = op
+		positions[user_id] = entries[-1][0] if entries else position
+
+	page = SyncPage(
+		cursor=SyncCursor(user_seq=positions[user.pk], global_seq=positions[None]),
+		has_more=has_more,
+		changes=_empty_changes(),
+	)
+	upserts: dict[str, set[int]] = {}
+	for (model, object_id), op in latest.items():
+		if model not in SYNCED_MODELS:
+			continue
+		if op == ChangeOp.DELETE:
+			page.changes[model]["deleted"].append(object_id)
+		else:
+			upserts.setdefault(model, set()).add(object_id)
+
+	for model, ids in upserts.items():
+		scope, serializer_class = SYNCED_MODELS[model]
+		rows = list(scope(user).filter(pk__in=ids))
+		page.changes[model]["updated"] = serializer_class(rows, many=True, context=context or {}).data
+		# Logged as changed but gone (or no longer visible) by now.
+		page.changes[model]["deleted"].extend(sorted(ids - {row.pk for row in rows}))
+	return page
+
+
+def _empty_changes() -> dict[str, dict[str, list]]:
+	return {model: {"updated": [], "deleted": []} for model in SYNCED_MODELS}
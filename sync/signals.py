@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from budgets.models import Budget, Income
+from categories.models import Category
+from core.models import Notification
+from expenses.signals import expenses_changed, expenses_moved
+from sync.models import ChangeOp
+from sync.services import Change, expense_changes, record_changes
+
+_MODEL_KEYS = {
+	Category: "categories",
+	Budget: "budgets",
+	Income: "incomes",
+	Notification: "notifications",
+}
+
+
+def _stream_owner(instance):
+	if isinstance(instance, Notification):
+		return instance.user_id
+	if getattr(instance, "is_system", False):
+		return None
+	return instance.created_by_id
+
+
+@receiver(expenses_changed)
+@receiver(expenses_moved)
+def _log_expense_changes(sender, removed, added, **kwargs):
+	record_changes(expense_changes(removed=removed, added=added))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Budget)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Notification)
+def _log_saved(sender, instance, **kwargs):
+	record_changes([Change(_stream_owner(instance), _MODEL_KEYS[sender], instance.pk, ChangeOp.UPSERT)])
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Notification)
+def _log_deleted(sender, instance, **kwargs):
+	record_changes([Change(_stream_owner(instance), _MODEL_KEYS[sender], instance.pk, ChangeOp.DELETE)])
@@ -0,0 +1,129 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from categories.models import Category
+from expenses.archive import archive_expenses
+from expenses.models import Expense
+from sync.services import SyncCursor, prune_change_log
+from users.roles import ROLE_USER
+
+User = get_user_model()
+
+
+class ChangeFeedTests(TestCase):
+	"""`GET /sync/` returns what changed after the client's cursor, tombstones included."""
+
+	@classmethod
+	def setUpTestData(cls):
+		group = Group.objects.get_or_create(name=ROLE_USER)[0]
+		cls.user = User.objects.create_user("syncer", password="x")
+		cls.other = User.objects.create_user("bystander", password="x")
+		cls.user.groups.add(group)
+		cls.other.groups.add(group)
+
+	def setUp(self):
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def sync(self, cursor=None, **params):
+		if cursor is not None:
+			params["cursor"] = cursor
+		response = self.client.get("/api/v1/sync/", params)
+		self.assertEqual(response.status_code, 200, response.data)
+		return response.data
+
+	def head(self):
+		page = self.sync()
+		self.assertTrue(page["reset"])
+		return page["cursor"]
+
+	def expense(self, owner=None, **data):
+		fields = {"amount": 4, "date": date(2026, 5, 1), "description": "Tea", **data}
+		return Expense.objects.create(created_by=owner or self.user, **fields)
+
+	def test_first_sync_resets_and_idle_sync_is_empty(self):
+		self.expense()
+		cursor = self.head()
+		page = self.sync(cursor)
+		self.assertFalse(page["reset"])
+		self.assertFalse(page["has_more"])
+		self.assertEqual(page["cursor"], cursor)
+		self.assertTrue(all(not change["updated"] and not change["deleted"] for change in page["changes"].values()))
+
+	def test_upserts_and_tombstones(self):
+		kept, edited, deleted = self.expense(), self.expense(), self.expense()
+		cursor = self.head()
+
+		created = self.expense(description="Coffee")
+		edited.amount = 9
+		edited.save()
+		deleted_id = deleted.pk
+		deleted.delete()
+		self.expense(owner=self.other)
+
+		page = self.sync(cursor)
+		expenses = page["changes"]["expenses"]
+		self.assertEqual(sorted(row["id"] for row in expenses["updated"]), sorted([created.pk, edited.pk]))
+		self.assertEqual(expenses["deleted"], [deleted_id])
+		self.assertEqual(next(row for row in expenses["updated"] if row["id"] == edited.pk)["amount"], "9.00")
+		self.assertNotIn(kept.pk, [row["id"] for row in expenses["updated"]])
+		self.assertEqual(self.sync(page["cursor"])["changes"]["expenses"], {"updated": [], "deleted": []})
+
+	def test_created_then_deleted_is_only_a_tombstone(self):
+		cursor = self.head()
+		expense = self.expense()
+		expense_id = expense.pk
+		expense.delete()
+		expenses = self.sync(cursor)["changes"]["expenses"]
+		self.assertEqual(expenses, {"updated": [], "deleted": [expense_id]})
+
+	def test_shared_rows_come_from_the_global_stream(self):
+		cursor = self.head()
+		system = Category.objects.create(name="Utilities", is_system=True, created_by=self.other)
+		own = Category.objects.create(name="Hobbies", created_by=self.user)
+		Category.objects.create(name="Theirs", created_by=self.other)
+		updated = self.sync(cursor)["changes"]["categories"]["updated"]
+		self.assertEqual(sorted(row["id"] for row in updated), sorted([system.pk, own.pk]))
+
+	def test_pages_with_limit(self):
+		cursor = self.head()
+		ids = {self.expense(description=f"Tea {index}").pk for index in range(5)}
+		seen, pages = set(), 0
+		while True:
+			page = self.sync(cursor, limit=2)
+			seen |= {row["id"] for row in page["changes"]["expenses"]["updated"]}
+			cursor, pages = page["cursor"], pages + 1
+			if not page["has_more"]:
+				break
+		self.assertEqual(seen, ids)
+		self.assertEqual(pages, 3)
+
+	def test_pruned_history_forces_a_reset(self):
+		cursor = self.head()
+		self.expense()
+		prune_change_log(timezone.now() + timedelta(seconds=1))
+		page = self.sync(cursor)
+		self.assertTrue(page["reset"])
+		# The new head sits at the horizon, so it stays valid.
+		self.assertFalse(self.sync(page["cursor"])["reset"])
+		self.assertGreater(SyncCursor.decode(page["cursor"]).user_seq, SyncCursor.decode(cursor).user_seq)
+
+	def test_invalid_cursor(self):
+		response = self.client.get("/api/v1/sync/", {"cursor": "nonsense"})
+		self.assertEqual(response.status_code, 400)
+
+	def test_archived_expenses_sync_as_deleted(self):
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		old = self.expense(date=date(2023, 3, 1))
+		cursor = self.head()
+		with override_settings(MEDIA_ROOT=media), self.captureOnCommitCallbacks(execute=True):
+			archive_expenses(before=date(2024, 1, 1), user_ids=[self.user.pk])
+		self.assertEqual(self.sync(cursor)["changes"]["expenses"]["deleted"], [old.pk])
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from sync.views import SyncView
+
+urlpatterns = [
+    path("", SyncView.as_view(), name="sync"),
+]
@@ -0,0 +1,43 @@
+from django.conf import settings
+from rest_framework import generics
+from rest_framework.response import Response
+
+from core.permissions import IsUserOrAdminRole
+from sync.services import InvalidCursor, SyncCursor, changes_since
+
+
+class SyncView(generics.GenericAPIView):
+	"""Everything changed since `?cursor=` for the caller's own data.
+
+	Returns `{cursor, reset, has_more, changes: {model: {updated, deleted}}}`.
+	Without a cursor (or with one behind pruned history) `reset` is true and the client
+	reloads its lists, then syncs from the returned cursor. While `has_more`
+	is true the client should sync again straight away.
+	"""
+	permission_classes = [IsUserOrAdminRole]
+
+	def get(self, request, *args, **kwargs):
+		raw = request.query_params.get("cursor")
+		try:
+			cursor = SyncCursor.decode(raw) if raw else None
+		except InvalidCursor as exc:
+			return Response({"detail": str(exc)}, status=400)
+
+		try:
+			limit = int(request.query_params.get("limit", 0))
+		except ValueError:
+			limit = 0
+		max_limit = getattr(settings, "SYNC_PAGE_SIZE", 500)
+		limit = min(limit, max_limit) if limit > 0 else max_limit
+
+		page = changes_since(
+			user=request.user, cursor=cursor, limit=limit, context=self.get_serializer_context()
+		)
+		return Response(
+			{
+				"cursor": page.cursor.encode(),
+				"reset": page.reset,
+				"has_more": page.has_more,
+				"changes": page.changes,
+			}
+		)